@@ -0,0 +1,42 @@
+"""Composite indexes for keyset pagination and list filters
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pagination (created_at, id) scoped to the parent
+    op.create_index('idx_customers_company_created', 'customers', ['company_id', 'created_at', 'id'], unique=False)
+    op.create_index('idx_projects_company_created', 'projects', ['company_id', 'created_at', 'id'], unique=False)
+    op.create_index('idx_facades_project_created', 'facades', ['project_id', 'created_at', 'id'], unique=False)
+    op.create_index('idx_photos_facade_created', 'photos', ['facade_id', 'created_at', 'id'], unique=False)
+
+    # Filters
+    op.create_index('idx_customers_company_city', 'customers', ['company_id', 'city'], unique=False)
+    op.create_index('idx_projects_company_status_created', 'projects', ['company_id', 'status', 'created_at', 'id'], unique=False)
+
+    # Case-insensitive name prefix search (lower(name) LIKE 'prefix%')
+    op.create_index('idx_customers_company_lower_name', 'customers', ['company_id', sa.text('lower(name) text_pattern_ops')], unique=False)
+    op.create_index('idx_projects_company_lower_name', 'projects', ['company_id', sa.text('lower(name) text_pattern_ops')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_projects_company_lower_name', table_name='projects')
+    op.drop_index('idx_customers_company_lower_name', table_name='customers')
+    op.drop_index('idx_projects_company_status_created', table_name='projects')
+    op.drop_index('idx_customers_company_city', table_name='customers')
+    op.drop_index('idx_photos_facade_created', table_name='photos')
+    op.drop_index('idx_facades_project_created', table_name='facades')
+    op.drop_index('idx_projects_company_created', table_name='projects')
+    op.drop_index('idx_customers_company_created', table_name='customers')
@@ -0,0 +1,25 @@
+"""Display and thumbnail renditions on photos
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('photos', sa.Column('display_path', sa.String(), nullable=True))
+    op.add_column('photos', sa.Column('thumbnail_path', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('photos', 'thumbnail_path')
+    op.drop_column('photos', 'display_path')
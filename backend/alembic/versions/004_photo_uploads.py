@@ -0,0 +1,37 @@
+"""Resumable photo upload sessions
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('photo_uploads',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('facade_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('content_type', sa.String(), nullable=False),
+        sa.Column('total_size', sa.BigInteger(), nullable=False),
+        sa.Column('received_bytes', sa.BigInteger(), nullable=False, server_default=sa.text('0')),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['facade_id'], ['facades.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_photo_uploads_expires_at', 'photo_uploads', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_photo_uploads_expires_at', table_name='photo_uploads')
+    op.drop_table('photo_uploads')
@@ -0,0 +1,25 @@
+"""Stored PDF fingerprint and size on quote versions
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('quote_versions', sa.Column('pdf_sha256', sa.String(), nullable=True))
+    op.add_column('quote_versions', sa.Column('pdf_size', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('quote_versions', 'pdf_size')
+    op.drop_column('quote_versions', 'pdf_sha256')
@@ -0,0 +1,35 @@
+"""PDF verification hash registry
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('pdf_verifications',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('quote_version_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['quote_version_id'], ['quote_versions.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_pdf_verifications_hash', 'pdf_verifications', ['hash'], unique=True)
+    op.create_index('idx_pdf_verifications_quote_version_id', 'pdf_verifications', ['quote_version_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_pdf_verifications_quote_version_id', table_name='pdf_verifications')
+    op.drop_index('idx_pdf_verifications_hash', table_name='pdf_verifications')
+    op.drop_table('pdf_verifications')
@@ -0,0 +1,58 @@
+"""Persisted metrage results and project totals
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('photo_metrages',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('photo_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('facade_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('surface_m2', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('width_m', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('height_m', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('openings_m2', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('net_surface_m2', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['photo_id'], ['photos.id'], ),
+        sa.ForeignKeyConstraint(['facade_id'], ['facades.id'], ),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_photo_metrages_photo_id', 'photo_metrages', ['photo_id'], unique=True)
+    op.create_index('idx_photo_metrages_facade_id', 'photo_metrages', ['facade_id'], unique=False)
+    op.create_index('idx_photo_metrages_project_id', 'photo_metrages', ['project_id'], unique=False)
+
+    op.create_table('project_metrage_totals',
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('photos', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('surface_m2', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('openings_m2', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('net_surface_m2', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+        sa.PrimaryKeyConstraint('project_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('project_metrage_totals')
+    op.drop_index('idx_photo_metrages_project_id', table_name='photo_metrages')
+    op.drop_index('idx_photo_metrages_facade_id', table_name='photo_metrages')
+    op.drop_index('idx_photo_metrages_photo_id', table_name='photo_metrages')
+    op.drop_table('photo_metrages')
@@ -0,0 +1,24 @@
+"""Creation date on metrage refs (default reference = oldest)
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Références existantes : même date, départagées par id
+    op.add_column('metrage_refs', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('metrage_refs', 'created_at')
@@ -0,0 +1,38 @@
+"""Cascade deletes from photos, facades and projects to persisted metrages
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+# Contraintes créées sans nom en 007 : noms par défaut de PostgreSQL
+FOREIGN_KEYS = [
+    ('photo_metrages', 'photo_id', 'photos'),
+    ('photo_metrages', 'facade_id', 'facades'),
+    ('photo_metrages', 'project_id', 'projects'),
+    ('project_metrage_totals', 'project_id', 'projects'),
+]
+
+
+def _recreate_foreign_keys(ondelete) -> None:
+    for table, column, referred in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    # Suppression d'un chantier, d'une façade ou d'une photo : métrages et totaux suivent
+    _recreate_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    _recreate_foreign_keys(None)
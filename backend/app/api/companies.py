@@ -1,11 +1,12 @@
 """API endpoints pour les sociétés."""
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from pydantic import BaseModel
 from uuid import UUID
 
-from ..db.database import get_db
+from ..db.database import get_async_db
 from ..db.models import Company, Subscription
 from ..security.auth import get_current_user, require_owner, AuthUser
 
@@ -28,12 +29,13 @@ class CompanyUpdate(BaseModel):
 @router.get("/me", response_model=CompanyResponse)
 async def get_my_company(
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Récupère les informations de la société de l'utilisateur."""
-    company = db.query(Company).filter(
-        Company.id == current_user.company_id
-    ).first()
+    result = await db.execute(
+        select(Company).where(Company.id == current_user.company_id)
+    )
+    company = result.scalar_one_or_none()
     
     if not company:
         raise HTTPException(
@@ -52,12 +54,13 @@ async def get_my_company(
 async def update_my_company(
     company_data: CompanyUpdate,
     current_user: AuthUser = Depends(require_owner),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Met à jour les informations de la société (OWNER uniquement)."""
-    company = db.query(Company).filter(
-        Company.id == current_user.company_id
-    ).first()
+    result = await db.execute(
+        select(Company).where(Company.id == current_user.company_id)
+    )
+    company = result.scalar_one_or_none()
     
     if not company:
         raise HTTPException(
@@ -66,8 +69,8 @@ async def update_my_company(
         )
     
     company.name = company_data.name
-    db.commit()
-    db.refresh(company)
+    await db.commit()
+    await db.refresh(company)
     
     return CompanyResponse(
         id=str(company.id),
@@ -79,12 +82,13 @@ async def update_my_company(
 @router.get("/subscription")
 async def get_subscription(
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Récupère l'abonnement de la société."""
-    subscription = db.query(Subscription).filter(
-        Subscription.company_id == current_user.company_id
-    ).first()
+    result = await db.execute(
+        select(Subscription).where(Subscription.company_id == current_user.company_id)
+    )
+    subscription = result.scalar_one_or_none()
     
     if not subscription:
         return {
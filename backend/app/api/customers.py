@@ -1,13 +1,17 @@
 """Routes de gestion des clients - CRUD complet."""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 from uuid import UUID
 
-from ..db.database import get_db
+from ..db.database import get_async_db
 from ..db.models import Customer, AuditLog
-from ..security.auth import get_current_user, AuthUser, check_company_access
+from ..security.auth import get_current_user, AuthUser, get_owned_resource
+from ..utils.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, page_rows, name_prefix_filter
+)
 
 router = APIRouter()
 
@@ -42,7 +46,7 @@ class CustomerResponse(BaseModel):
         from_attributes = True
 
 
-def log_audit(db: Session, company_id: str, user_id: str, action: str):
+async def log_audit(db: AsyncSession, company_id: str, user_id: str, action: str):
     """Enregistre une action dans les logs d'audit."""
     audit_log = AuditLog(
         company_id=company_id,
@@ -50,14 +54,14 @@ def log_audit(db: Session, company_id: str, user_id: str, action: str):
         action=action
     )
     db.add(audit_log)
-    db.commit()
+    await db.commit()
 
 
 @router.post("", response_model=CustomerResponse, status_code=status.HTTP_201_CREATED)
 async def create_customer(
     customer: CustomerCreate,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Crée un nouveau client."""
     new_customer = Customer(
@@ -68,11 +72,11 @@ async def create_customer(
         city=customer.city
     )
     db.add(new_customer)
-    db.commit()
-    db.refresh(new_customer)
+    await db.commit()
+    await db.refresh(new_customer)
     
     # Log audit
-    log_audit(db, current_user.company_id, current_user.user_id, f"Created customer: {customer.name}")
+    await log_audit(db, current_user.company_id, current_user.user_id, f"Created customer: {customer.name}")
     
     return CustomerResponse(
         id=str(new_customer.id),
@@ -87,13 +91,26 @@ async def create_customer(
 
 @router.get("", response_model=List[CustomerResponse])
 async def list_customers(
+    response: Response,
+    city: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Liste tous les clients de l'entreprise."""
-    customers = db.query(Customer).filter(
-        Customer.company_id == current_user.company_id
-    ).all()
+    """Liste les clients de l'entreprise, paginés par curseur (en-tête X-Next-Cursor)."""
+    query = select(
+        Customer.id, Customer.company_id, Customer.name, Customer.email,
+        Customer.phone, Customer.city, Customer.created_at
+    ).where(Customer.company_id == current_user.company_id)
+    if city:
+        query = query.where(Customer.city == city)
+    if name_prefix:
+        query = query.where(name_prefix_filter(Customer.name, name_prefix))
+    
+    result = await db.execute(paginate(query, Customer, cursor, limit))
+    customers = page_rows(result.all(), limit, response)
     
     return [
         CustomerResponse(
@@ -113,15 +130,10 @@ async def list_customers(
 async def get_customer(
     customer_id: UUID,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Récupère un client par ID."""
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
-    
-    if not customer:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client non trouvé")
-    
-    check_company_access(str(customer.company_id), current_user.company_id)
+    customer = await get_owned_resource(db, Customer, customer_id, current_user, "Client non trouvé")
     
     return CustomerResponse(
         id=str(customer.id),
@@ -139,15 +151,10 @@ async def update_customer(
     customer_id: UUID,
     customer_data: CustomerUpdate,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Met à jour un client."""
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
-    
-    if not customer:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client non trouvé")
-    
-    check_company_access(str(customer.company_id), current_user.company_id)
+    customer = await get_owned_resource(db, Customer, customer_id, current_user, "Client non trouvé")
     
     if customer_data.name is not None:
         customer.name = customer_data.name
@@ -158,11 +165,11 @@ async def update_customer(
     if customer_data.city is not None:
         customer.city = customer_data.city
     
-    db.commit()
-    db.refresh(customer)
+    await db.commit()
+    await db.refresh(customer)
     
     # Log audit
-    log_audit(db, current_user.company_id, current_user.user_id, f"Updated customer: {customer.name}")
+    await log_audit(db, current_user.company_id, current_user.user_id, f"Updated customer: {customer.name}")
     
     return CustomerResponse(
         id=str(customer.id),
@@ -179,21 +186,16 @@ async def update_customer(
 async def delete_customer(
     customer_id: UUID,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Supprime un client."""
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
-    
-    if not customer:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client non trouvé")
-    
-    check_company_access(str(customer.company_id), current_user.company_id)
+    customer = await get_owned_resource(db, Customer, customer_id, current_user, "Client non trouvé")
     
     customer_name = customer.name
-    db.delete(customer)
-    db.commit()
+    await db.delete(customer)
+    await db.commit()
     
     # Log audit
-    log_audit(db, current_user.company_id, current_user.user_id, f"Deleted customer: {customer_name}")
+    await log_audit(db, current_user.company_id, current_user.user_id, f"Deleted customer: {customer_name}")
     
     return None
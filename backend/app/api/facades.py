@@ -1,13 +1,15 @@
 """Routes de gestion des façades."""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 from uuid import UUID
 
-from ..db.database import get_db
+from ..db.database import get_async_db
 from ..db.models import Facade, Project
-from ..security.auth import get_current_user, AuthUser, check_company_access
+from ..security.auth import get_current_user, AuthUser, get_owned_resource
+from ..utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, page_rows
 
 router = APIRouter()
 
@@ -36,23 +38,19 @@ class FacadeResponse(BaseModel):
 async def create_facade(
     facade: FacadeCreate,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Crée une nouvelle façade."""
     # Vérifier que le projet appartient bien à l'entreprise
-    project = db.query(Project).filter(Project.id == facade.project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Chantier non trouvé")
-    
-    check_company_access(str(project.company_id), current_user.company_id)
+    await get_owned_resource(db, Project, facade.project_id, current_user, "Chantier non trouvé")
     
     new_facade = Facade(
         project_id=facade.project_id,
         code=facade.code
     )
     db.add(new_facade)
-    db.commit()
-    db.refresh(new_facade)
+    await db.commit()
+    await db.refresh(new_facade)
     
     return FacadeResponse(
         id=str(new_facade.id),
@@ -66,16 +64,12 @@ async def create_facade(
 async def duplicate_facade(
     request: FacadeDuplicate,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Duplique une façade (opposée)."""
-    source = db.query(Facade).filter(Facade.id == request.source_facade_id).first()
-    if not source:
-        raise HTTPException(status_code=404, detail="Façade source non trouvée")
-    
-    # Vérifier accès
-    project = db.query(Project).filter(Project.id == source.project_id).first()
-    check_company_access(str(project.company_id), current_user.company_id)
+    source = await get_owned_resource(
+        db, Facade, request.source_facade_id, current_user, "Façade source non trouvée"
+    )
     
     # Créer la duplication
     duplicated = Facade(
@@ -84,8 +78,8 @@ async def duplicate_facade(
         duplicated_from=source.id
     )
     db.add(duplicated)
-    db.commit()
-    db.refresh(duplicated)
+    await db.commit()
+    await db.refresh(duplicated)
     
     return FacadeResponse(
         id=str(duplicated.id),
@@ -98,17 +92,20 @@ async def duplicate_facade(
 @router.get("/project/{project_id}", response_model=list[FacadeResponse])
 async def list_facades(
     project_id: UUID,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Liste les façades d'un chantier."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Chantier non trouvé")
-    
-    check_company_access(str(project.company_id), current_user.company_id)
+    """Liste les façades d'un chantier, paginées par curseur (en-tête X-Next-Cursor)."""
+    await get_owned_resource(db, Project, project_id, current_user, "Chantier non trouvé")
     
-    facades = db.query(Facade).filter(Facade.project_id == project_id).all()
+    query = select(
+        Facade.id, Facade.project_id, Facade.code, Facade.duplicated_from, Facade.created_at
+    ).where(Facade.project_id == project_id)
+    result = await db.execute(paginate(query, Facade, cursor, limit))
+    facades = page_rows(result.all(), limit, response)
     
     return [
         FacadeResponse(
@@ -1,13 +1,24 @@
 """Routes de métrage photo."""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Dict, Optional, List, Tuple
 from uuid import UUID
+import numpy as np
 
-from ..db.database import get_db
-from ..db.models import MetrageRef, Project, Photo
-from ..security.auth import get_current_user, AuthUser, check_company_access
+from ..db.database import get_async_db
+from ..db.models import MetrageRef, Project, Photo, Facade, PhotoMetrage, ProjectMetrageTotal
+from ..metrage.geometry import flatten_polygons, is_convex
+from ..metrage.homography import reference_homographies
+from ..metrage.refs import ProjectRef, invalidate_project_refs, load_project_refs, select_ref
+from ..metrage.surfaces import (
+    SurfaceArrays, compute_polygon_surfaces, compute_surfaces, flatten_openings, scale_transforms
+)
+from ..metrage.totals import save_metrages
+from ..security.auth import get_current_user, AuthUser, get_owned_resource
+from ..settings import settings
 
 router = APIRouter()
 
@@ -29,14 +40,53 @@ class MetrageRefResponse(BaseModel):
     height_cm: Optional[float]
 
 
+Point = Tuple[float, float]
+
+
+class MetrageOpening(BaseModel):
+    """Ouverture : rectangle (`width_px` x `height_px`) ou contour (`points`, ex: fenêtre cintrée)."""
+    width_px: float = 0
+    height_px: float = 0
+    points: Optional[List[Point]] = Field(None, min_length=3)
+
+
+class MetragePolygon(BaseModel):
+    """Contour en pixels de la photo (ex: pignon triangulaire ou trapézoïdal)."""
+    points: List[Point] = Field(..., min_length=3)
+
+
 class MetrageCalculation(BaseModel):
-    """Calcul de métrage."""
+    """Calcul de métrage.
+    
+    Échelle : dimensions en pixels de la référence, ou `ref_corners`
+    (haut-gauche, haut-droit, bas-droit, bas-gauche) pour redresser la photo
+    par homographie. `ref_id` : référence du chantier à utiliser (par défaut
+    la première).
+    
+    Façade : rectangle (`facade_width_px` x `facade_height_px`, ouvertures en
+    rectangles), ou contours (`facade_polygon` et/ou `gables`, ouvertures en
+    `points`). Avec des contours, seule la partie des ouvertures située sur la
+    façade ou un pignon est déduite.
+    """
     photo_id: str
-    ref_width_px: int
-    ref_height_px: int
-    facade_width_px: int
-    facade_height_px: int
-    openings: Optional[List[dict]] = []
+    ref_id: Optional[UUID] = None
+    ref_width_px: Optional[int] = Field(None, gt=0)
+    ref_height_px: Optional[int] = Field(None, gt=0)
+    facade_width_px: Optional[int] = None
+    facade_height_px: Optional[int] = None
+    openings: Optional[List[MetrageOpening]] = []
+    ref_corners: Optional[List[Point]] = None
+    facade_polygon: Optional[List[Point]] = Field(None, min_length=3)
+    gables: Optional[List[MetragePolygon]] = []
+    
+    def uses_polygons(self) -> bool:
+        """Vrai si la façade est décrite par des contours."""
+        return self.facade_polygon is not None or bool(self.gables)
+    
+    def wall_polygons(self) -> List[List[Point]]:
+        """Contours de la façade et des pignons."""
+        walls = [self.facade_polygon] if self.facade_polygon is not None else []
+        return walls + [gable.points for gable in self.gables or []]
 
 
 class MetrageResult(BaseModel):
@@ -48,18 +98,185 @@ class MetrageResult(BaseModel):
     net_surface_m2: float
 
 
+class PhotoMetrageResponse(MetrageResult):
+    """Métrage enregistré d'une photo."""
+    photo_id: str
+    facade_id: str
+    updated_at: Optional[datetime]
+
+
+class ProjectMetrageTotals(BaseModel):
+    """Totaux des métrages enregistrés d'un chantier."""
+    project_id: str
+    photos: int
+    surface_m2: float
+    openings_m2: float
+    net_surface_m2: float
+    updated_at: Optional[datetime]
+
+
+class MetrageBatchCalculation(BaseModel):
+    """Calcul de métrage de plusieurs photos (ex: toutes les façades d'un chantier)."""
+    measurements: List[MetrageCalculation] = Field(..., min_length=1)
+
+
+class MetrageBatchItem(BaseModel):
+    """Résultat d'une mesure dans un calcul par lot."""
+    photo_id: str
+    result: Optional[MetrageResult] = None
+    error: Optional[str] = None
+
+
+def check_ref_dimensions(metrage_ref: ProjectRef) -> Optional[str]:
+    """Message d'erreur si la référence n'a pas de dimensions exploitables."""
+    if not metrage_ref.width_cm or not metrage_ref.height_cm:
+        return "Référence de métrage sans dimensions"
+    return None
+
+
+def check_measurement(calc: MetrageCalculation) -> Optional[str]:
+    """Message d'erreur si la mesure est incomplète pour son mode de calcul."""
+    if calc.ref_corners is None:
+        if calc.ref_width_px is None or calc.ref_height_px is None:
+            return "Dimensions en pixels de la référence requises"
+    elif len(calc.ref_corners) != 4 or not is_convex(np.array(calc.ref_corners, dtype=np.float64)):
+        return "Coins de la référence invalides (4 points formant un quadrilatère convexe)"
+    
+    if not calc.uses_polygons():
+        if calc.ref_corners is not None:
+            return "Contour de la façade requis (3 points minimum)"
+        if calc.facade_width_px is None or calc.facade_height_px is None:
+            return "Dimensions en pixels ou contour de la façade requis"
+        if any(opening.points is not None for opening in calc.openings or []):
+            return "Ouvertures décrites par contour : contour de la façade requis"
+        return None
+    
+    if any(opening.points is None for opening in calc.openings or []):
+        return "Contour de chaque ouverture requis (3 points minimum)"
+    return None
+
+
+def edge_pair_count(calc: MetrageCalculation) -> int:
+    """Paires d'arêtes (ouverture, façade) à découper : borne le coût d'une mesure."""
+    if not calc.uses_polygons():
+        return 0
+    wall_points = sum(len(points) for points in calc.wall_polygons())
+    return wall_points * sum(len(opening.points or []) for opening in calc.openings or [])
+
+
+def check_edge_pairs(calcs: List[MetrageCalculation]):
+    """Refuse une requête dont les contours sont trop détaillés pour être découpés."""
+    if sum(edge_pair_count(calc) for calc in calcs) > settings.METRAGE_MAX_EDGE_PAIRS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Contours trop détaillés (réduire le nombre de points des ouvertures ou de la façade)"
+        )
+
+
+def build_results(surfaces: SurfaceArrays) -> List[MetrageResult]:
+    """Résultats arrondis au centimètre / centième de m²."""
+    return [
+        MetrageResult(
+            surface_m2=round(surface_m2, 2),
+            width_m=round(width_m, 2),
+            height_m=round(height_m, 2),
+            openings_m2=round(openings_m2, 2),
+            net_surface_m2=round(net_surface_m2, 2)
+        )
+        for width_m, height_m, surface_m2, openings_m2, net_surface_m2 in zip(
+            surfaces.width_m.tolist(),
+            surfaces.height_m.tolist(),
+            surfaces.surface_m2.tolist(),
+            surfaces.openings_m2.tolist(),
+            surfaces.net_surface_m2.tolist()
+        )
+    ]
+
+
+def compute_results(calcs: List[MetrageCalculation], refs: List[ProjectRef]) -> List[MetrageResult]:
+    """Métrage de chaque mesure avec sa référence, en une passe vectorisée par mode."""
+    rectangles = [index for index, calc in enumerate(calcs) if not calc.uses_polygons()]
+    polygons = [index for index, calc in enumerate(calcs) if calc.uses_polygons()]
+    results: Dict[int, MetrageResult] = {}
+    
+    if rectangles:
+        surfaces = compute_surfaces(
+            ref_width_cm=np.array([float(refs[index].width_cm) for index in rectangles]),
+            ref_height_cm=np.array([float(refs[index].height_cm) for index in rectangles]),
+            ref_width_px=np.array([calcs[index].ref_width_px for index in rectangles], dtype=np.float64),
+            ref_height_px=np.array([calcs[index].ref_height_px for index in rectangles], dtype=np.float64),
+            facade_width_px=np.array([calcs[index].facade_width_px for index in rectangles], dtype=np.float64),
+            facade_height_px=np.array([calcs[index].facade_height_px for index in rectangles], dtype=np.float64),
+            openings=flatten_openings([
+                [(opening.width_px, opening.height_px) for opening in calcs[index].openings or []]
+                for index in rectangles
+            ])
+        )
+        results.update(zip(rectangles, build_results(surfaces)))
+    
+    if polygons:
+        # Image -> cm : homographie si coins de référence, sinon échelle simple
+        transforms = np.zeros((len(polygons), 3, 3))
+        perspective = [row for row, index in enumerate(polygons) if calcs[index].ref_corners is not None]
+        simple = [row for row, index in enumerate(polygons) if calcs[index].ref_corners is None]
+        if perspective:
+            transforms[perspective] = reference_homographies(
+                np.array([calcs[polygons[row]].ref_corners for row in perspective], dtype=np.float64),
+                np.array([float(refs[polygons[row]].width_cm) for row in perspective]),
+                np.array([float(refs[polygons[row]].height_cm) for row in perspective])
+            )
+        if simple:
+            transforms[simple] = scale_transforms(
+                np.array([float(refs[polygons[row]].width_cm) for row in simple]),
+                np.array([float(refs[polygons[row]].height_cm) for row in simple]),
+                np.array([calcs[polygons[row]].ref_width_px for row in simple], dtype=np.float64),
+                np.array([calcs[polygons[row]].ref_height_px for row in simple], dtype=np.float64)
+            )
+        surfaces = compute_polygon_surfaces(
+            transforms,
+            walls=flatten_polygons([calcs[index].wall_polygons() for index in polygons]),
+            openings=flatten_polygons([
+                [opening.points for opening in calcs[index].openings or []] for index in polygons
+            ])
+        )
+        results.update(zip(polygons, build_results(surfaces)))
+    
+    return [results[index] for index in range(len(calcs))]
+
+
+async def resolve_refs(
+    db: AsyncSession,
+    calcs: List[MetrageCalculation],
+    project_ids: List[Optional[UUID]]
+) -> List[Optional[ProjectRef]]:
+    """Référence de chaque mesure (None si introuvable), sans requête si le cache est chaud."""
+    refs = await load_project_refs(db, {project_id for project_id in project_ids if project_id})
+    # Référence demandée absente du cache : créée depuis par un autre worker, ou d'un autre chantier
+    stale = {
+        project_id for calc, project_id in zip(calcs, project_ids)
+        if project_id and calc.ref_id and select_ref(refs.get(project_id, []), calc.ref_id) is None
+    }
+    if stale:
+        refs.update(await load_project_refs(db, stale, refresh=True))
+    return [
+        select_ref(refs.get(project_id, []), calc.ref_id) if project_id else None
+        for calc, project_id in zip(calcs, project_ids)
+    ]
+
+
+def metrage_record(photo_id: UUID, facade_id: UUID, project_id: UUID, result: MetrageResult) -> dict:
+    """Ligne de photo_metrages pour un résultat (valeurs arrondies, telles que renvoyées)."""
+    return {"photo_id": photo_id, "facade_id": facade_id, "project_id": project_id, **result.model_dump()}
+
+
 @router.post("/ref", response_model=MetrageRefResponse)
 async def create_metrage_ref(
     ref: MetrageRefCreate,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Crée une référence de métrage."""
-    project = db.query(Project).filter(Project.id == ref.project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Chantier non trouvé")
-    
-    check_company_access(str(project.company_id), current_user.company_id)
+    await get_owned_resource(db, Project, ref.project_id, current_user, "Chantier non trouvé")
     
     # Valeurs par défaut pour agglo 20x50
     if ref.type == "agglo":
@@ -73,8 +290,9 @@ async def create_metrage_ref(
         height_cm=ref.height_cm
     )
     db.add(new_ref)
-    db.commit()
-    db.refresh(new_ref)
+    await db.commit()
+    await db.refresh(new_ref)
+    await invalidate_project_refs(new_ref.project_id)
     
     return MetrageRefResponse(
         id=str(new_ref.id),
@@ -89,60 +307,162 @@ async def create_metrage_ref(
 async def calculate_metrage(
     calc: MetrageCalculation,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Calcule le métrage d'une façade."""
-    # Vérifier que la photo existe et appartient à l'entreprise
-    photo = db.query(Photo).filter(Photo.id == calc.photo_id).first()
-    if not photo:
-        raise HTTPException(status_code=404, detail="Photo non trouvée")
-    
-    # Vérifier accès (via façade -> projet)
-    from ..db.models import Facade
-    facade = db.query(Facade).filter(Facade.id == photo.facade_id).first()
-    project = db.query(Project).filter(Project.id == facade.project_id).first()
-    check_company_access(str(project.company_id), current_user.company_id)
-    
-    # Récupérer la référence de métrage
-    metrage_ref = db.query(MetrageRef).filter(
-        MetrageRef.project_id == project.id
-    ).first()
+    """Calcule le métrage d'une façade et l'enregistre (remplace le précédent de la photo)."""
+    error = check_measurement(calc)
+    if error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    check_edge_pairs([calc])
+    
+    # Vérifier que la photo existe et appartient à l'entreprise (via façade -> projet)
+    photo = await get_owned_resource(db, Photo, calc.photo_id, current_user, "Photo non trouvée")
+    project = photo.facade.project
+    
+    # Référence de métrage (cache par chantier)
+    metrage_ref = (await resolve_refs(db, [calc], [project.id]))[0]
     
     if not metrage_ref:
         raise HTTPException(status_code=404, detail="Référence de métrage non trouvée")
+    error = check_ref_dimensions(metrage_ref)
+    if error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
     
-    # Calcul du ratio pixels/cm
-    ref_width_cm = float(metrage_ref.width_cm)
-    ref_height_cm = float(metrage_ref.height_cm)
+    metrage = compute_results([calc], [metrage_ref])[0]
+    await save_metrages(db, [metrage_record(photo.id, photo.facade_id, project.id, metrage)])
+    await db.commit()
     
-    px_per_cm_width = calc.ref_width_px / ref_width_cm
-    px_per_cm_height = calc.ref_height_px / ref_height_cm
+    return metrage
+
+
+@router.post("/calculate/batch", response_model=List[MetrageBatchItem])
+async def calculate_metrage_batch(
+    batch: MetrageBatchCalculation,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Calcule et enregistre le métrage de plusieurs photos en une requête.
+    
+    Les photos sont chargées en une requête pour tout le lot, les références de
+    métrage depuis le cache (au plus une requête pour les chantiers absents). Chaque mesure est traitée
+    indépendamment : une photo inconnue n'empêche pas le calcul des autres (voir
+    `error` dans la réponse).
+    """
+    if len(batch.measurements) > settings.METRAGE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Trop de mesures (max {settings.METRAGE_BATCH_MAX_ITEMS})"
+        )
+    check_edge_pairs(batch.measurements)
+    
+    photo_ids: List[Optional[UUID]] = []
+    for calc in batch.measurements:
+        try:
+            photo_ids.append(UUID(calc.photo_id))
+        except ValueError:
+            photo_ids.append(None)
+    
+    # Façade et chantier de chaque photo, restreints aux chantiers de l'entreprise
+    result = await db.execute(
+        select(Photo.id, Photo.facade_id, Facade.project_id)
+        .join(Photo.facade)
+        .join(Facade.project)
+        .where(Photo.id.in_({photo_id for photo_id in photo_ids if photo_id}), Project.company_id == current_user.company_id)
+    )
+    photo_facades: Dict[UUID, UUID] = {}
+    photo_projects: Dict[UUID, UUID] = {}
+    for photo_id, facade_id, project_id in result.all():
+        photo_facades[photo_id] = facade_id
+        photo_projects[photo_id] = project_id
+    
+    # Référence de chaque mesure (`ref_id`, sinon la première du chantier, comme pour /calculate)
+    measurement_refs = await resolve_refs(
+        db, batch.measurements, [photo_projects.get(photo_id) for photo_id in photo_ids]
+    )
     
-    # Moyenne pour correction perspective simple
-    px_per_cm = (px_per_cm_width + px_per_cm_height) / 2
+    errors: Dict[int, str] = {}
+    valid: List[int] = []
+    valid_refs: List[ProjectRef] = []
+    for index, photo_id in enumerate(photo_ids):
+        project_id = photo_projects.get(photo_id)
+        metrage_ref = measurement_refs[index]
+        if error := check_measurement(batch.measurements[index]):
+            errors[index] = error
+        elif project_id is None:
+            errors[index] = "Photo non trouvée"
+        elif metrage_ref is None:
+            errors[index] = "Référence de métrage non trouvée"
+        elif error := check_ref_dimensions(metrage_ref):
+            errors[index] = error
+        else:
+            valid.append(index)
+            valid_refs.append(metrage_ref)
     
-    # Dimensions de la façade en mètres
-    width_m = (calc.facade_width_px / px_per_cm) / 100
-    height_m = (calc.facade_height_px / px_per_cm) / 100
+    results: Dict[int, MetrageResult] = {}
+    if valid:
+        results = dict(zip(valid, compute_results([batch.measurements[index] for index in valid], valid_refs)))
+        await save_metrages(db, [
+            metrage_record(
+                photo_ids[index], photo_facades[photo_ids[index]], photo_projects[photo_ids[index]], results[index]
+            )
+            for index in valid
+        ])
+        await db.commit()
     
-    surface_m2 = width_m * height_m
+    return [
+        MetrageBatchItem(photo_id=calc.photo_id, result=results.get(index), error=errors.get(index))
+        for index, calc in enumerate(batch.measurements)
+    ]
+
+
+@router.get("/projects/{project_id}/totals", response_model=ProjectMetrageTotals)
+async def get_project_metrage_totals(
+    project_id: UUID,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Totaux des métrages enregistrés d'un chantier (tenus à jour à chaque calcul, sans agrégation)."""
+    await get_owned_resource(db, Project, project_id, current_user, "Chantier non trouvé")
     
-    # Calcul des ouvertures
-    openings_m2 = 0.0
-    if calc.openings:
-        for opening in calc.openings:
-            opening_width_px = opening.get("width_px", 0)
-            opening_height_px = opening.get("height_px", 0)
-            opening_width_m = (opening_width_px / px_per_cm) / 100
-            opening_height_m = (opening_height_px / px_per_cm) / 100
-            openings_m2 += opening_width_m * opening_height_m
+    totals = await db.get(ProjectMetrageTotal, project_id)
+    if totals is None:
+        # Aucun métrage enregistré
+        return ProjectMetrageTotals(
+            project_id=str(project_id), photos=0, surface_m2=0, openings_m2=0, net_surface_m2=0, updated_at=None
+        )
     
-    net_surface_m2 = surface_m2 - openings_m2
+    return ProjectMetrageTotals(
+        project_id=str(project_id),
+        photos=totals.photos,
+        surface_m2=float(totals.surface_m2),
+        openings_m2=float(totals.openings_m2),
+        net_surface_m2=float(totals.net_surface_m2),
+        updated_at=totals.updated_at
+    )
+
+
+@router.get("/projects/{project_id}/results", response_model=List[PhotoMetrageResponse])
+async def list_project_metrages(
+    project_id: UUID,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Métrages enregistrés des photos d'un chantier (sans recalcul)."""
+    await get_owned_resource(db, Project, project_id, current_user, "Chantier non trouvé")
     
-    return MetrageResult(
-        surface_m2=round(surface_m2, 2),
-        width_m=round(width_m, 2),
-        height_m=round(height_m, 2),
-        openings_m2=round(openings_m2, 2),
-        net_surface_m2=round(net_surface_m2, 2)
+    result = await db.execute(
+        select(PhotoMetrage).where(PhotoMetrage.project_id == project_id).order_by(PhotoMetrage.facade_id, PhotoMetrage.created_at)
     )
+    return [
+        PhotoMetrageResponse(
+            photo_id=str(metrage.photo_id),
+            facade_id=str(metrage.facade_id),
+            surface_m2=float(metrage.surface_m2),
+            width_m=float(metrage.width_m),
+            height_m=float(metrage.height_m),
+            openings_m2=float(metrage.openings_m2),
+            net_surface_m2=float(metrage.net_surface_m2),
+            updated_at=metrage.updated_at
+        )
+        for metrage in result.scalars()
+    ]
@@ -1,15 +1,20 @@
 """Routes de génération de PDF."""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import RedirectResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
+from typing import Optional
 from uuid import UUID
-import hashlib
-from datetime import datetime
 
-from ..db.database import get_db
-from ..db.models import Quote, QuoteVersion, QuoteLine, Project, Customer, Company, Subscription
-from ..security.auth import get_current_user, AuthUser, check_company_access
-from ..pdf.generator import generate_quote_pdf
+from ..db.database import get_async_db
+from ..db.models import QuoteVersion, QuoteLine, Customer, Company, Subscription, PdfVerification
+from ..security.auth import get_current_user, AuthUser, check_company_access, get_owned_resource
+from ..pdf.jobs import pdf_jobs, process_pdf_job
+from ..pdf.verification import HASH_PATTERN, verify_negative_cache
+from ..storage.client import StorageClient, get_storage_client
+from ..utils.jobs import DONE
 
 router = APIRouter()
 
@@ -22,77 +27,223 @@ class PDFGenerateRequest(BaseModel):
 class PDFGenerateResponse(BaseModel):
     """Réponse génération PDF."""
     pdf_path: str
+    download_url: str
     verification_hash: str
     verification_url: str
 
 
+class PDFJobResponse(BaseModel):
+    """État d'un job de génération PDF."""
+    job_id: str
+    status: str
+    result: Optional[PDFGenerateResponse] = None
+    error: Optional[str] = None
+
+
+async def build_pdf_payload(db: AsyncSession, quote_version_id: str, current_user: AuthUser) -> dict:
+    """Vérifie l'accès et rassemble les données du PDF (types JSON uniquement)."""
+    # Vérifier accès (version -> devis -> chantier en une requête)
+    version = await get_owned_resource(
+        db, QuoteVersion, quote_version_id, current_user, "Version de devis non trouvée"
+    )
+    quote = version.quote
+    project = quote.project
+    
+    # Récupérer toutes les données nécessaires
+    result = await db.execute(select(Customer).where(Customer.id == project.customer_id))
+    customer = result.scalar_one_or_none()
+    result = await db.execute(select(Company).where(Company.id == project.company_id))
+    company = result.scalar_one_or_none()
+    result = await db.execute(
+        select(Subscription).where(Subscription.company_id == project.company_id)
+    )
+    subscription = result.scalar_one_or_none()
+    result = await db.execute(
+        select(QuoteLine).where(QuoteLine.quote_version_id == version.id)
+    )
+    lines = result.scalars().all()
+    
+    # Déterminer si filigrane nécessaire
+    is_trial = subscription.plan_id == "TRIAL" if subscription else True
+    
+    return {
+        "quote_version_id": str(version.id),
+        "company_id": str(project.company_id),
+        "pdf_sha256": version.pdf_sha256,
+        "pdf_path": f"pdfs/{project.company_id}/{quote.id}/v{version.version}.pdf",
+        "render": {
+            "company_name": company.name,
+            "customer_name": customer.name,
+            "customer_city": customer.city,
+            "project_name": project.name,
+            "version": version.version,
+            "lines": [
+                [line.label, str(line.quantity), str(line.unit_price), str(line.total)]
+                for line in lines
+            ],
+            "total": float(version.total) if version.total else 0.0,
+            "is_trial": is_trial,
+        },
+    }
+
+
+async def get_owned_job(job_id: str, current_user: AuthUser) -> dict:
+    """Job PDF de la société de l'utilisateur."""
+    job = await pdf_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job PDF non trouvé ou expiré"
+        )
+    check_company_access(job["owner"], current_user.company_id)
+    return job
+
+
 @router.post("/generate", response_model=PDFGenerateResponse)
 async def generate_pdf(
     request: PDFGenerateRequest,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Génère un PDF pour une version de devis."""
-    version = db.query(QuoteVersion).filter(
-        QuoteVersion.id == request.quote_version_id
-    ).first()
+    """Génère un PDF pour une version de devis (attend la fin du rendu).
     
-    if not version:
-        raise HTTPException(status_code=404, detail="Version de devis non trouvée")
+    Le rendu s'exécute dans le pool de processus : la boucle d'événements reste
+    libre. Pour un traitement asynchrone, utiliser POST /jobs.
+    """
+    payload = await build_pdf_payload(db, request.quote_version_id, current_user)
+    result = await process_pdf_job(payload)
+    return PDFGenerateResponse(**result)
+
+
+@router.post("/jobs", response_model=PDFJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_pdf_job(
+    request: PDFGenerateRequest,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Met en file la génération d'un PDF ; suivre l'état via GET /jobs/{job_id}."""
+    payload = await build_pdf_payload(db, request.quote_version_id, current_user)
+    job = await pdf_jobs.enqueue(payload, owner=current_user.company_id)
+    return PDFJobResponse(job_id=job["id"], status=job["status"])
+
+
+@router.get("/jobs/{job_id}", response_model=PDFJobResponse)
+async def get_pdf_job(
+    job_id: str,
+    current_user: AuthUser = Depends(get_current_user)
+):
+    """État d'un job PDF (queued, running, done, failed)."""
+    job = await get_owned_job(job_id, current_user)
+    return PDFJobResponse(
+        job_id=job["id"],
+        status=job["status"],
+        result=job["result"],
+        error=job["error"]
+    )
+
+
+async def pdf_download_response(
+    request: Request,
+    version: QuoteVersion,
+    storage: StorageClient,
+    redirect: bool
+):
+    """Réponse de téléchargement d'un PDF stocké, avec ETag.
     
-    # Vérifier accès
-    quote = db.query(Quote).filter(Quote.id == version.quote_id).first()
-    project = db.query(Project).filter(Project.id == quote.project_id).first()
-    check_company_access(str(project.company_id), current_user.company_id)
+    304 si le client a déjà cette version (If-None-Match), sinon redirection
+    vers une URL signée ou flux depuis Storage (le PDF n'est jamais chargé en mémoire).
+    """
+    if not version.pdf_path or not version.pdf_sha256:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="PDF non généré pour cette version"
+        )
     
-    # Récupérer toutes les données nécessaires
-    customer = db.query(Customer).filter(Customer.id == project.customer_id).first()
-    company = db.query(Company).filter(Company.id == project.company_id).first()
-    subscription = db.query(Subscription).filter(
-        Subscription.company_id == project.company_id
-    ).first()
-    lines = db.query(QuoteLine).filter(
-        QuoteLine.quote_version_id == version.id
-    ).all()
+    # Le PDF d'une version peut changer (nom de société, plan) : cache privé revalidé par ETag
+    headers = {"ETag": f'"{version.pdf_sha256}"', "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") in (headers["ETag"], f'W/{headers["ETag"]}'):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    # Déterminer si filigrane nécessaire
-    is_trial = subscription.plan_id == "TRIAL" if subscription else True
+    if redirect:
+        signed_url = await storage.create_signed_url(version.pdf_path)
+        return RedirectResponse(signed_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT, headers=headers)
     
-    # Générer le PDF
-    pdf_data = generate_quote_pdf(
-        company_name=company.name,
-        customer_name=customer.name,
-        customer_city=customer.city,
-        project_name=project.name,
-        version=version.version,
-        lines=lines,
-        total=float(version.total) if version.total else 0.0,
-        is_trial=is_trial
+    download = await storage.open_download(version.pdf_path)
+    headers["Content-Disposition"] = f'attachment; filename="devis-v{version.version}.pdf"'
+    if version.pdf_size is not None:
+        headers["Content-Length"] = str(version.pdf_size)
+    return StreamingResponse(
+        download.aiter_bytes(),
+        media_type="application/pdf",
+        headers=headers,
+        background=BackgroundTask(download.aclose)
     )
+
+
+@router.get("/versions/{quote_version_id}/download")
+async def download_pdf(
+    quote_version_id: UUID,
+    request: Request,
+    redirect: bool = False,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    storage: StorageClient = Depends(get_storage_client)
+):
+    """Télécharge le PDF généré d'une version de devis.
     
-    # Générer le hash de vérification
-    hash_content = f"{version.id}-{datetime.utcnow().isoformat()}-{pdf_data[:100]}"
-    verification_hash = hashlib.sha256(hash_content.encode()).hexdigest()
-    
-    # TODO: Upload vers Supabase Storage
-    pdf_path = f"pdfs/{project.company_id}/{quote.id}/v{version.version}.pdf"
-    
-    # Enregistrer le chemin dans la version
-    version.pdf_path = pdf_path
-    db.commit()
-    
-    return PDFGenerateResponse(
-        pdf_path=pdf_path,
-        verification_hash=verification_hash,
-        verification_url=f"/public/verify/{verification_hash}"
+    `redirect=true` renvoie une redirection vers une URL signée Storage au lieu du flux.
+    """
+    version = await get_owned_resource(
+        db, QuoteVersion, quote_version_id, current_user, "Version de devis non trouvée"
     )
+    return await pdf_download_response(request, version, storage, redirect)
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_pdf_job_result(
+    job_id: str,
+    request: Request,
+    redirect: bool = False,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    storage: StorageClient = Depends(get_storage_client)
+):
+    """PDF produit par un job terminé (mêmes options que le téléchargement)."""
+    job = await get_owned_job(job_id, current_user)
+    if job["status"] != DONE:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"PDF pas encore disponible (statut: {job['status']})"
+        )
+    version = await get_owned_resource(
+        db, QuoteVersion, job["payload"]["quote_version_id"], current_user, "Version de devis non trouvée"
+    )
+    return await pdf_download_response(request, version, storage, redirect)
 
 
 @router.get("/verify/{hash}")
-async def verify_pdf(hash: str, db: Session = Depends(get_db)):
+async def verify_pdf(hash: str, db: AsyncSession = Depends(get_async_db)):
     """Page publique de vérification d'un PDF."""
-    # TODO: Implémenter la vérification du hash
+    hash = hash.lower()
+    
+    # Hash mal formé ou déjà reconnu comme inconnu : aucune requête SQL
+    known = False
+    if HASH_PATTERN.match(hash) and await verify_negative_cache.aget(hash) is None:
+        result = await db.execute(
+            select(PdfVerification.created_at).where(PdfVerification.hash == hash)
+        )
+        generated_at = result.scalar_one_or_none()
+        known = generated_at is not None
+        if not known:
+            await verify_negative_cache.aset(hash, True)
+    
+    if not known:
+        return {
+            "valid": False,
+            "message": "Aucun PDF Facade Suite ne correspond à ce code"
+        }
     return {
         "valid": True,
-        "message": "PDF authentique généré par Facade Suite"
+        "message": "PDF authentique généré par Facade Suite",
+        "generated_at": generated_at.isoformat()
     }
@@ -1,19 +1,41 @@
 """Routes de gestion des photos - Upload Supabase Storage."""
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional, List
-from uuid import UUID
-import httpx
-from datetime import datetime, timedelta
-
-from ..db.database import get_db
-from ..db.models import Photo, Facade, Project
-from ..security.auth import get_current_user, AuthUser, check_company_access
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
+from pathlib import Path
+from typing import AsyncIterator, Optional, List
+from uuid import UUID, uuid4
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+import os
+import tempfile
+
+from ..db.database import get_async_db
+from ..db.models import Photo, PhotoUpload, Facade
+from ..images.processing import (
+    InvalidImageError, RENDITION_CONTENT_TYPES, RENDITION_EXTENSIONS, process_photo
+)
+from ..metrage.totals import delete_metrages
+from ..security.auth import get_current_user, AuthUser, get_owned_resource
 from ..settings import settings
+from ..storage.client import (
+    StorageClient, get_storage_client, check_upload_size, iter_file, iter_upload_file
+)
+from ..storage.upload_sessions import SessionDataLost, discard_session, session_file, session_size, write_chunk
+from ..utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, page_rows
+from ..utils.workers import run_in_process
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+ALLOWED_CONTENT_TYPES = ["image/jpeg", "image/png", "image/jpg"]
+
+# En-tête portant l'offset attendu par le serveur (uploads reprenables)
+UPLOAD_OFFSET_HEADER = "Upload-Offset"
+
 
 class PhotoResponse(BaseModel):
     """Réponse photo."""
@@ -21,6 +43,8 @@ class PhotoResponse(BaseModel):
     facade_id: str
     storage_path: str
     signed_url: str
+    display_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
     quality: Optional[str]
     created_at: str
 
@@ -28,188 +52,484 @@ class PhotoResponse(BaseModel):
         from_attributes = True
 
 
-async def get_supabase_signed_url(storage_path: str, expires_in: int = 3600) -> str:
-    """Génère une URL signée Supabase Storage."""
-    # URL de l'API Supabase Storage pour signed URLs
-    url = f"{settings.SUPABASE_URL}/storage/v1/object/sign/{settings.STORAGE_BUCKET}/{storage_path}"
+class BatchUploadItem(BaseModel):
+    """Résultat d'un fichier dans un upload par lot."""
+    filename: str
+    photo: Optional[PhotoResponse] = None
+    error: Optional[str] = None
+
+
+class UploadSessionCreate(BaseModel):
+    """Démarrage d'un upload reprenable."""
+    filename: str
+    content_type: str
+    total_size: int = Field(..., gt=0)
+
+
+class UploadSessionResponse(BaseModel):
+    """État d'un upload reprenable."""
+    upload_id: str
+    facade_id: str
+    filename: str
+    total_size: int
+    offset: int
+    max_chunk_size: int
+    expires_at: str
+
+
+def photo_storage_paths(photo) -> List[str]:
+    """Chemins Storage d'une photo : original et déclinaisons éventuelles."""
+    return [path for path in (photo.storage_path, photo.display_path, photo.thumbnail_path) if path]
+
+
+def build_photo_response(photo, signed_urls: dict) -> PhotoResponse:
+    """Construit la réponse à partir des URLs signées de tous ses chemins."""
+    return PhotoResponse(
+        id=str(photo.id),
+        facade_id=str(photo.facade_id),
+        storage_path=photo.storage_path,
+        signed_url=signed_urls[photo.storage_path],
+        display_url=signed_urls.get(photo.display_path),
+        thumbnail_url=signed_urls.get(photo.thumbnail_path),
+        quality=photo.quality,
+        created_at=photo.created_at.isoformat()
+    )
+
+
+async def prepare_photo(
+    storage: StorageClient,
+    facade: Facade,
+    image_path: Path,
+    original: AsyncIterator[bytes],
+    size: Optional[int],
+    filename: str,
+    content_type: str
+) -> Photo:
+    """Traite une image et l'envoie sur Storage ; retourne la Photo à enregistrer.
     
-    headers = {
-        "Authorization": f"Bearer {settings.SUPABASE_SERVICE_KEY}",
-        "apikey": settings.SUPABASE_SERVICE_KEY
-    }
+    `image_path` : copie locale de l'image, lue par le worker (seul le chemin
+    transite par le pool de processus). `original` : flux de l'original envoyé
+    tel quel sur Storage, de taille `size` si connue. La qualité
+    (green/orange/red) est calculée côté serveur depuis l'image.
+    """
+    # Déclinaisons affichage + miniature et note de qualité, calculées hors de la boucle d'événements
+    rendition_format = settings.PHOTO_RENDITION_FORMAT
+    try:
+        processed = await run_in_process(
+            process_photo,
+            str(image_path),
+            settings.PHOTO_DISPLAY_MAX_SIZE,
+            settings.PHOTO_THUMBNAIL_SIZE,
+            rendition_format
+        )
+    except InvalidImageError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Image illisible"
+        )
     
-    payload = {"expiresIn": expires_in}
+    # Générer les chemins de stockage (suffixe unique : plusieurs photos par seconde en lot)
+    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    file_extension = filename.split(".")[-1] if "." in filename else "jpg"
+    base_path = f"{facade.project.company_id}/{facade.project_id}/{facade.id}/{timestamp}_{uuid4().hex[:8]}"
+    storage_path = f"{base_path}.{file_extension}"
+    display_path = f"{base_path}_display.{RENDITION_EXTENSIONS[rendition_format]}"
+    thumbnail_path = f"{base_path}_thumb.{RENDITION_EXTENSIONS[rendition_format]}"
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=payload, headers=headers)
-        
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to generate signed URL"
-            )
-        
-        data = response.json()
-        signed_path = data.get("signedURL")
-        
-        if not signed_path:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="No signed URL returned"
-            )
-        
-        # Construct full URL
-        return f"{settings.SUPABASE_URL}/storage/v1{signed_path}"
+    # Upload des trois fichiers en parallèle sur Supabase Storage (original en flux)
+    rendition_type = RENDITION_CONTENT_TYPES[rendition_format]
+    results = await asyncio.gather(
+        storage.upload(storage_path, original, content_type, content_length=size),
+        storage.upload(display_path, processed.display, rendition_type),
+        storage.upload(thumbnail_path, processed.thumbnail, rendition_type),
+        return_exceptions=True
+    )
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        # Pas d'objet orphelin si un des trois envois échoue
+        try:
+            await storage.delete_many([storage_path, display_path, thumbnail_path])
+        except Exception:
+            logger.warning("Nettoyage Storage impossible pour %s", base_path, exc_info=True)
+        raise errors[0]
+    
+    return Photo(
+        facade_id=facade.id,
+        storage_path=storage_path,
+        display_path=display_path,
+        thumbnail_path=thumbnail_path,
+        quality=processed.quality
+    )
+
+
+def check_content_type(content_type: Optional[str]):
+    """Valide le type de fichier."""
+    if content_type not in ALLOWED_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Type de fichier non supporté. Utilisez: {', '.join(ALLOWED_CONTENT_TYPES)}"
+        )
+
+
+async def spool_upload(file: UploadFile) -> Path:
+    """Copie un fichier uploadé dans un fichier temporaire, par blocs, avec plafond de taille.
+    
+    Le worker lit l'image depuis ce fichier : ni l'API ni le pipe du pool ne
+    portent le fichier entier. À supprimer par l'appelant.
+    """
+    check_upload_size(file.size, settings.PHOTO_MAX_UPLOAD_BYTES)
+    fd, path = await asyncio.to_thread(tempfile.mkstemp, prefix="facade-photo-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in iter_upload_file(file, settings.PHOTO_MAX_UPLOAD_BYTES):
+                await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return Path(path)
+
+
+async def prepare_uploaded_photo(storage: StorageClient, facade: Facade, file: UploadFile) -> Photo:
+    """Traite et envoie un fichier multipart ; l'original part en flux depuis l'UploadFile."""
+    check_content_type(file.content_type)
+    image_path = await spool_upload(file)
+    try:
+        return await prepare_photo(
+            storage,
+            facade,
+            image_path,
+            iter_upload_file(file, settings.PHOTO_MAX_UPLOAD_BYTES),
+            file.size,
+            file.filename,
+            file.content_type
+        )
+    finally:
+        await asyncio.to_thread(image_path.unlink, missing_ok=True)
 
 
 @router.post("/{facade_id}/upload", response_model=PhotoResponse, status_code=status.HTTP_201_CREATED)
 async def upload_photo(
     facade_id: UUID,
     file: UploadFile = File(...),
-    quality: Optional[str] = None,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    storage: StorageClient = Depends(get_storage_client)
 ):
     """Upload une photo de façade sur Supabase Storage."""
     # Vérifier que la façade existe et appartient à la bonne société
-    facade = db.query(Facade).filter(Facade.id == facade_id).first()
-    if not facade:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Façade non trouvée")
+    facade = await get_owned_resource(db, Facade, facade_id, current_user, "Façade non trouvée")
+    
+    # Créer l'enregistrement en base
+    photo = await prepare_uploaded_photo(storage, facade, file)
+    db.add(photo)
+    await db.commit()
     
-    project = db.query(Project).filter(Project.id == facade.project_id).first()
-    if not project:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chantier non trouvé")
+    # Générer les URLs signées (un seul appel Storage)
+    signed_urls = await storage.create_signed_urls(photo_storage_paths(photo))
     
-    check_company_access(str(project.company_id), current_user.company_id)
+    return build_photo_response(photo, signed_urls)
+
+
+@router.post("/{facade_id}/upload/batch", response_model=List[BatchUploadItem], status_code=status.HTTP_201_CREATED)
+async def upload_photos_batch(
+    facade_id: UUID,
+    files: List[UploadFile] = File(...),
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    storage: StorageClient = Depends(get_storage_client)
+):
+    """Upload plusieurs photos d'une façade en une seule requête multipart.
     
-    # Valider le type de fichier
-    allowed_types = ["image/jpeg", "image/png", "image/jpg"]
-    if file.content_type not in allowed_types:
+    Chaque fichier est traité indépendamment : un fichier refusé n'empêche pas
+    l'enregistrement des autres (voir `error` dans la réponse).
+    """
+    facade = await get_owned_resource(db, Facade, facade_id, current_user, "Façade non trouvée")
+    
+    if len(files) > settings.PHOTO_BATCH_MAX_FILES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Type de fichier non supporté. Utilisez: {', '.join(allowed_types)}"
+            detail=f"Trop de fichiers (max {settings.PHOTO_BATCH_MAX_FILES})"
         )
     
-    # Générer le chemin de stockage
-    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    file_extension = file.filename.split(".")[-1] if "." in file.filename else "jpg"
-    storage_path = f"{current_user.company_id}/{project.id}/{facade_id}/{timestamp}.{file_extension}"
+    # Traitement borné en parallèle (mémoire et pool de processus)
+    semaphore = asyncio.Semaphore(settings.PHOTO_BATCH_CONCURRENCY)
     
-    # Upload sur Supabase Storage
-    upload_url = f"{settings.SUPABASE_URL}/storage/v1/object/{settings.STORAGE_BUCKET}/{storage_path}"
+    async def prepare(file: UploadFile) -> Photo:
+        async with semaphore:
+            return await prepare_uploaded_photo(storage, facade, file)
     
-    headers = {
-        "Authorization": f"Bearer {settings.SUPABASE_SERVICE_KEY}",
-        "apikey": settings.SUPABASE_SERVICE_KEY
-    }
+    results = await asyncio.gather(*[prepare(file) for file in files], return_exceptions=True)
+    # Erreur inattendue sur un fichier : signalée sur ce fichier, les autres sont enregistrés
+    for index, result in enumerate(results):
+        if isinstance(result, Exception) and not isinstance(result, HTTPException):
+            logger.error("Upload de %s en échec", files[index].filename, exc_info=result)
+            results[index] = HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur lors de l'enregistrement du fichier"
+            )
+        elif isinstance(result, BaseException) and not isinstance(result, HTTPException):
+            raise result
     
-    file_content = await file.read()
+    # Un seul INSERT multi-lignes et un seul appel Storage pour les URLs signées
+    photos = [result for result in results if isinstance(result, Photo)]
+    db.add_all(photos)
+    await db.commit()
+    signed_urls = await storage.create_signed_urls(
+        [path for photo in photos for path in photo_storage_paths(photo)]
+    )
+    
+    return [
+        BatchUploadItem(filename=file.filename, error=result.detail)
+        if isinstance(result, HTTPException)
+        else BatchUploadItem(filename=file.filename, photo=build_photo_response(result, signed_urls))
+        for file, result in zip(files, results)
+    ]
+
+
+def build_upload_session_response(upload: PhotoUpload) -> UploadSessionResponse:
+    return UploadSessionResponse(
+        upload_id=str(upload.id),
+        facade_id=str(upload.facade_id),
+        filename=upload.filename,
+        total_size=upload.total_size,
+        offset=upload.received_bytes,
+        max_chunk_size=settings.PHOTO_UPLOAD_MAX_CHUNK_BYTES,
+        expires_at=upload.expires_at.isoformat()
+    )
+
+
+async def get_upload_session(
+    db: AsyncSession,
+    upload_id: UUID,
+    current_user: AuthUser,
+    lock: bool = False
+) -> PhotoUpload:
+    """Session d'upload de l'utilisateur, non expirée.
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            upload_url,
-            content=file_content,
-            headers={**headers, "Content-Type": file.content_type}
+    Avec `lock`, la session reste verrouillée jusqu'au commit : deux blocs au
+    même offset, ou un bloc et la finalisation, ne peuvent pas passer ensemble.
+    """
+    upload = await get_owned_resource(
+        db, PhotoUpload, upload_id, current_user, "Session d'upload non trouvée", lock=lock
+    )
+    if upload.expires_at <= datetime.now(timezone.utc):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session d'upload expirée"
         )
-        
-        if response.status_code not in [200, 201]:
+    return upload
+
+
+async def reset_upload_offset(db: AsyncSession, upload: PhotoUpload, size: int):
+    """Ramène la session aux octets réellement présents sur disque, puis lève 409.
+
+    Fichier temporaire perdu ou tronqué (redémarrage, bloc arrivé sur une autre
+    instance) : le client reprend à l'offset renvoyé au lieu de finaliser un
+    fichier corrompu.
+    """
+    upload.received_bytes = min(size, upload.received_bytes)
+    await db.commit()
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Données de l'upload perdues, reprendre à l'offset {upload.received_bytes}",
+        headers={UPLOAD_OFFSET_HEADER: str(upload.received_bytes)}
+    )
+
+
+@router.post("/{facade_id}/uploads", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    facade_id: UUID,
+    payload: UploadSessionCreate,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Démarre un upload reprenable : le fichier est ensuite envoyé par blocs."""
+    await get_owned_resource(db, Facade, facade_id, current_user, "Façade non trouvée")
+    check_content_type(payload.content_type)
+    check_upload_size(payload.total_size, settings.PHOTO_MAX_UPLOAD_BYTES)
+    
+    # Purge des sessions abandonnées
+    result = await db.execute(
+        delete(PhotoUpload)
+        .where(PhotoUpload.expires_at <= func.now())
+        .returning(PhotoUpload.id)
+    )
+    for expired_id in result.scalars().all():
+        await asyncio.to_thread(discard_session, expired_id)
+    
+    upload = PhotoUpload(
+        facade_id=facade_id,
+        filename=payload.filename,
+        content_type=payload.content_type,
+        total_size=payload.total_size,
+        received_bytes=0,
+        expires_at=datetime.now(timezone.utc) + timedelta(hours=settings.PHOTO_UPLOAD_SESSION_TTL_HOURS)
+    )
+    db.add(upload)
+    await db.commit()
+    
+    return build_upload_session_response(upload)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload_status(
+    upload_id: UUID,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """État d'un upload reprenable : `offset` indique où reprendre après une coupure."""
+    upload = await get_upload_session(db, upload_id, current_user)
+    return build_upload_session_response(upload)
+
+
+@router.put("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def append_upload_chunk(
+    upload_id: UUID,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Ajoute un bloc (corps brut de la requête) à l'offset donné.
+    
+    L'offset doit être celui attendu par le serveur (409 sinon, avec l'offset
+    courant) : un bloc interrompu n'est pas comptabilisé et se renvoie tel quel.
+    """
+    # Corps lu avant toute requête SQL : aucune connexion n'est retenue pendant
+    # un transfert lent (4G)
+    chunk = bytearray()
+    async for data in request.stream():
+        chunk.extend(data)
+        if len(chunk) > settings.PHOTO_UPLOAD_MAX_CHUNK_BYTES:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to upload file: {response.text}"
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Bloc trop volumineux (max {settings.PHOTO_UPLOAD_MAX_CHUNK_BYTES} octets)"
             )
     
-    # Créer l'enregistrement en base
-    photo = Photo(
-        facade_id=facade_id,
-        storage_path=storage_path,
-        quality=quality
+    # Verrou tenu pendant la vérification de l'offset et l'écriture du bloc
+    upload = await get_upload_session(db, upload_id, current_user, lock=True)
+    if offset != upload.received_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Offset attendu: {upload.received_bytes}",
+            headers={UPLOAD_OFFSET_HEADER: str(upload.received_bytes)}
+        )
+    if offset + len(chunk) > upload.total_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Le bloc dépasse la taille annoncée du fichier"
+        )
+    
+    try:
+        await asyncio.to_thread(write_chunk, upload.id, offset, bytes(chunk))
+    except SessionDataLost as e:
+        await reset_upload_offset(db, upload, e.size)
+    upload.received_bytes = offset + len(chunk)
+    await db.commit()
+    
+    return build_upload_session_response(upload)
+
+
+@router.post("/uploads/{upload_id}/finalize", response_model=PhotoResponse, status_code=status.HTTP_201_CREATED)
+async def finalize_upload(
+    upload_id: UUID,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    storage: StorageClient = Depends(get_storage_client)
+):
+    """Termine un upload reprenable et crée la photo."""
+    upload = await get_upload_session(db, upload_id, current_user, lock=True)
+    if upload.received_bytes != upload.total_size:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload incomplet ({upload.received_bytes}/{upload.total_size} octets)",
+            headers={UPLOAD_OFFSET_HEADER: str(upload.received_bytes)}
+        )
+    size = await asyncio.to_thread(session_size, upload.id)
+    if size < upload.total_size:
+        await reset_upload_offset(db, upload, size)
+    
+    part_file = session_file(upload.id)
+    photo = await prepare_photo(
+        storage,
+        upload.facade,
+        part_file,
+        iter_file(part_file),
+        upload.total_size,
+        upload.filename,
+        upload.content_type
     )
     db.add(photo)
-    db.commit()
-    db.refresh(photo)
+    await db.delete(upload)
+    await db.commit()
+    await asyncio.to_thread(discard_session, upload.id)
     
-    # Générer l'URL signée
-    signed_url = await get_supabase_signed_url(storage_path)
-    
-    return PhotoResponse(
-        id=str(photo.id),
-        facade_id=str(photo.facade_id),
-        storage_path=photo.storage_path,
-        signed_url=signed_url,
-        quality=photo.quality,
-        created_at=photo.created_at.isoformat()
+    signed_urls = await storage.create_signed_urls(photo_storage_paths(photo))
+    return build_photo_response(photo, signed_urls)
+
+
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload(
+    upload_id: UUID,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Abandonne un upload reprenable."""
+    upload = await get_owned_resource(
+        db, PhotoUpload, upload_id, current_user, "Session d'upload non trouvée", lock=True
     )
+    await db.delete(upload)
+    await db.commit()
+    await asyncio.to_thread(discard_session, upload.id)
+    
+    return None
 
 
 @router.get("/facade/{facade_id}", response_model=List[PhotoResponse])
 async def list_photos_by_facade(
     facade_id: UUID,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Liste toutes les photos d'une façade."""
+    """Liste les photos d'une façade, paginées par curseur (en-tête X-Next-Cursor)."""
     # Vérifier l'accès
-    facade = db.query(Facade).filter(Facade.id == facade_id).first()
-    if not facade:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Façade non trouvée")
-    
-    project = db.query(Project).filter(Project.id == facade.project_id).first()
-    if not project:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chantier non trouvé")
-    
-    check_company_access(str(project.company_id), current_user.company_id)
+    await get_owned_resource(db, Facade, facade_id, current_user, "Façade non trouvée")
     
     # Récupérer les photos
-    photos = db.query(Photo).filter(Photo.facade_id == facade_id).all()
-    
-    result = []
-    for photo in photos:
-        signed_url = await get_supabase_signed_url(photo.storage_path)
-        result.append(
-            PhotoResponse(
-                id=str(photo.id),
-                facade_id=str(photo.facade_id),
-                storage_path=photo.storage_path,
-                signed_url=signed_url,
-                quality=photo.quality,
-                created_at=photo.created_at.isoformat()
-            )
-        )
+    query = select(
+        Photo.id, Photo.facade_id, Photo.storage_path, Photo.display_path,
+        Photo.thumbnail_path, Photo.quality, Photo.created_at
+    ).where(Photo.facade_id == facade_id)
+    result = await db.execute(paginate(query, Photo, cursor, limit))
+    photos = page_rows(result.all(), limit, response)
     
-    return result
+    # Une seule requête Storage pour toutes les URLs signées de la page
+    signed_urls = await get_storage_client().create_signed_urls(
+        [path for photo in photos for path in photo_storage_paths(photo)]
+    )
+    
+    return [build_photo_response(photo, signed_urls) for photo in photos]
 
 
 @router.delete("/{photo_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_photo(
     photo_id: UUID,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    storage: StorageClient = Depends(get_storage_client)
 ):
     """Supprime une photo."""
-    photo = db.query(Photo).filter(Photo.id == photo_id).first()
-    
-    if not photo:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Photo non trouvée")
-    
-    # Vérifier l'accès
-    facade = db.query(Facade).filter(Facade.id == photo.facade_id).first()
-    project = db.query(Project).filter(Project.id == facade.project_id).first()
-    
-    check_company_access(str(project.company_id), current_user.company_id)
-    
-    # Supprimer de Supabase Storage
-    delete_url = f"{settings.SUPABASE_URL}/storage/v1/object/{settings.STORAGE_BUCKET}/{photo.storage_path}"
-    
-    headers = {
-        "Authorization": f"Bearer {settings.SUPABASE_SERVICE_KEY}",
-        "apikey": settings.SUPABASE_SERVICE_KEY
-    }
+    photo = await get_owned_resource(db, Photo, photo_id, current_user, "Photo non trouvée")
     
-    async with httpx.AsyncClient() as client:
-        await client.delete(delete_url, headers=headers)
+    # Supprimer de Supabase Storage (original et déclinaisons)
+    await storage.delete_many(photo_storage_paths(photo))
     
-    # Supprimer de la base
-    db.delete(photo)
-    db.commit()
+    # Supprimer de la base (métrage enregistré retiré des totaux du chantier)
+    await delete_metrages(db, [photo.id])
+    await db.delete(photo)
+    await db.commit()
     
     return None
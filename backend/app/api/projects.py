@@ -1,13 +1,17 @@
 """Routes de gestion des chantiers - CRUD complet."""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 from uuid import UUID
 
-from ..db.database import get_db
+from ..db.database import get_async_db
 from ..db.models import Project, Customer, Quote, AuditLog
-from ..security.auth import get_current_user, AuthUser, check_company_access
+from ..security.auth import get_current_user, AuthUser, get_owned_resource
+from ..utils.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, page_rows, name_prefix_filter
+)
 
 router = APIRouter()
 
@@ -37,26 +41,22 @@ class ProjectResponse(BaseModel):
         from_attributes = True
 
 
-def log_audit(db: Session, company_id: str, user_id: str, action: str):
+async def log_audit(db: AsyncSession, company_id: str, user_id: str, action: str):
     """Enregistre une action dans les logs d'audit."""
     audit_log = AuditLog(company_id=company_id, user_id=user_id, action=action)
     db.add(audit_log)
-    db.commit()
+    await db.commit()
 
 
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project: ProjectCreate,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Crée un nouveau chantier avec devis automatique."""
     # Vérifier que le client existe et appartient à la bonne société
-    customer = db.query(Customer).filter(Customer.id == project.customer_id).first()
-    if not customer:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client non trouvé")
-    
-    check_company_access(str(customer.company_id), current_user.company_id)
+    await get_owned_resource(db, Customer, project.customer_id, current_user, "Client non trouvé")
     
     # Créer le chantier
     new_project = Project(
@@ -66,8 +66,8 @@ async def create_project(
         status="draft"
     )
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
+    await db.commit()
+    await db.refresh(new_project)
     
     # Créer le devis automatiquement
     quote = Quote(
@@ -76,10 +76,10 @@ async def create_project(
         current_version=1
     )
     db.add(quote)
-    db.commit()
+    await db.commit()
     
     # Log audit
-    log_audit(db, current_user.company_id, current_user.user_id, f"Created project: {project.name}")
+    await log_audit(db, current_user.company_id, current_user.user_id, f"Created project: {project.name}")
     
     return ProjectResponse(
         id=str(new_project.id),
@@ -93,13 +93,26 @@ async def create_project(
 
 @router.get("", response_model=List[ProjectResponse])
 async def list_projects(
+    response: Response,
+    project_status: Optional[str] = Query(None, alias="status"),
+    name_prefix: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Liste tous les chantiers de l'entreprise."""
-    projects = db.query(Project).filter(
-        Project.company_id == current_user.company_id
-    ).all()
+    """Liste les chantiers de l'entreprise, paginés par curseur (en-tête X-Next-Cursor)."""
+    query = select(
+        Project.id, Project.company_id, Project.customer_id, Project.name,
+        Project.status, Project.created_at
+    ).where(Project.company_id == current_user.company_id)
+    if project_status:
+        query = query.where(Project.status == project_status)
+    if name_prefix:
+        query = query.where(name_prefix_filter(Project.name, name_prefix))
+    
+    result = await db.execute(paginate(query, Project, cursor, limit))
+    projects = page_rows(result.all(), limit, response)
     
     return [
         ProjectResponse(
@@ -118,15 +131,10 @@ async def list_projects(
 async def get_project(
     project_id: UUID,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Récupère un chantier par ID."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    
-    if not project:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chantier non trouvé")
-    
-    check_company_access(str(project.company_id), current_user.company_id)
+    project = await get_owned_resource(db, Project, project_id, current_user, "Chantier non trouvé")
     
     return ProjectResponse(
         id=str(project.id),
@@ -143,26 +151,21 @@ async def update_project(
     project_id: UUID,
     project_data: ProjectUpdate,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Met à jour un chantier."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    
-    if not project:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chantier non trouvé")
-    
-    check_company_access(str(project.company_id), current_user.company_id)
+    project = await get_owned_resource(db, Project, project_id, current_user, "Chantier non trouvé")
     
     if project_data.name is not None:
         project.name = project_data.name
     if project_data.status is not None:
         project.status = project_data.status
     
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     
     # Log audit
-    log_audit(db, current_user.company_id, current_user.user_id, f"Updated project: {project.name}")
+    await log_audit(db, current_user.company_id, current_user.user_id, f"Updated project: {project.name}")
     
     return ProjectResponse(
         id=str(project.id),
@@ -178,21 +181,16 @@ async def update_project(
 async def delete_project(
     project_id: UUID,
     current_user: AuthUser = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Supprime un chantier."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    
-    if not project:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chantier non trouvé")
-    
-    check_company_access(str(project.company_id), current_user.company_id)
+    project = await get_owned_resource(db, Project, project_id, current_user, "Chantier non trouvé")
     
     project_name = project.name
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
     
     # Log audit
-    log_audit(db, current_user.company_id, current_user.user_id, f"Deleted project: {project_name}")
+    await log_audit(db, current_user.company_id, current_user.user_id, f"Deleted project: {project_name}")
     
     return None
@@ -1,5 +1,5 @@
 """Modèles SQLAlchemy pour Facade Suite."""
-from sqlalchemy import Column, String, Integer, Numeric, DateTime, ForeignKey, Text, CheckConstraint
+from sqlalchemy import Column, String, Integer, BigInteger, Numeric, DateTime, ForeignKey, Text, CheckConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -98,6 +98,8 @@ class Photo(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     facade_id = Column(UUID(as_uuid=True), ForeignKey("facades.id"), nullable=False)
     storage_path = Column(String, nullable=False)
+    display_path = Column(String)
+    thumbnail_path = Column(String)
     quality = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -107,6 +109,26 @@ class Photo(Base):
     
     # Relations
     facade = relationship("Facade", back_populates="photos")
+    
+    # created_at renvoyé par l'INSERT (RETURNING), sans requête de rechargement
+    __mapper_args__ = {"eager_defaults": True}
+
+
+class PhotoUpload(Base):
+    """Upload de photo reprenable en cours (octets reçus suivis côté serveur)."""
+    __tablename__ = "photo_uploads"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    facade_id = Column(UUID(as_uuid=True), ForeignKey("facades.id"), nullable=False)
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    received_bytes = Column(BigInteger, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    
+    # Relations
+    facade = relationship("Facade")
 
 
 class MetrageRef(Base):
@@ -118,11 +140,41 @@ class MetrageRef(Base):
     type = Column(String)  # agglo, custom
     width_cm = Column(Numeric)
     height_cm = Column(Numeric)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relations
     project = relationship("Project", back_populates="metrage_refs")
 
 
+class PhotoMetrage(Base):
+    """Dernier métrage calculé d'une photo (valeurs arrondies, telles que renvoyées par l'API)."""
+    __tablename__ = "photo_metrages"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    photo_id = Column(UUID(as_uuid=True), ForeignKey("photos.id", ondelete="CASCADE"), nullable=False, unique=True)
+    facade_id = Column(UUID(as_uuid=True), ForeignKey("facades.id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    surface_m2 = Column(Numeric(12, 2), nullable=False)
+    width_m = Column(Numeric(12, 2), nullable=False)
+    height_m = Column(Numeric(12, 2), nullable=False)
+    openings_m2 = Column(Numeric(12, 2), nullable=False)
+    net_surface_m2 = Column(Numeric(12, 2), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ProjectMetrageTotal(Base):
+    """Totaux des métrages d'un chantier, tenus à jour à chaque écriture de photo_metrages."""
+    __tablename__ = "project_metrage_totals"
+    
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    photos = Column(Integer, nullable=False, default=0)
+    surface_m2 = Column(Numeric(14, 2), nullable=False, default=0)
+    openings_m2 = Column(Numeric(14, 2), nullable=False, default=0)
+    net_surface_m2 = Column(Numeric(14, 2), nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class Quote(Base):
     """Devis."""
     __tablename__ = "quotes"
@@ -147,6 +199,8 @@ class QuoteVersion(Base):
     version = Column(Integer, nullable=False)
     total = Column(Numeric)
     pdf_path = Column(String)
+    pdf_sha256 = Column(String)  # Empreinte du PDF stocké (ETag)
+    pdf_size = Column(BigInteger)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relations
@@ -154,6 +208,16 @@ class QuoteVersion(Base):
     lines = relationship("QuoteLine", back_populates="quote_version")
 
 
+class PdfVerification(Base):
+    """Empreinte d'un PDF de devis généré (vérification publique d'authenticité)."""
+    __tablename__ = "pdf_verifications"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    quote_version_id = Column(UUID(as_uuid=True), ForeignKey("quote_versions.id"), nullable=False)
+    hash = Column(String(64), nullable=False, unique=True)  # SHA-256(version id + octets du PDF)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class QuoteLine(Base):
     """Ligne de devis."""
     __tablename__ = "quote_lines"
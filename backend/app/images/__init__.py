@@ -0,0 +1 @@
+"""Image processing package."""
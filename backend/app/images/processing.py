@@ -0,0 +1,80 @@
+"""Traitement d'une photo à l'upload : déclinaisons et note de qualité.
+
+Ces fonctions sont exécutées dans le pool de processus (voir utils/workers.py) :
+elles ne reçoivent et ne renvoient que des types simples (chemins, bytes, tuples).
+L'image source est lue depuis un fichier : elle ne transite pas par le pipe du pool.
+"""
+from io import BytesIO
+from typing import NamedTuple
+
+from PIL import Image, UnidentifiedImageError
+
+from .quality import score_image
+
+# Seul tag EXIF conservé : l'orientation, pour un affichage correct
+EXIF_ORIENTATION = 0x0112
+
+RENDITION_CONTENT_TYPES = {
+    "WEBP": "image/webp",
+    "JPEG": "image/jpeg",
+}
+
+RENDITION_EXTENSIONS = {
+    "WEBP": "webp",
+    "JPEG": "jpg",
+}
+
+
+class InvalidImageError(ValueError):
+    """Le fichier reçu n'est pas une image décodable."""
+
+
+class ProcessedPhoto(NamedTuple):
+    """Résultat du traitement d'une photo."""
+    display: bytes
+    thumbnail: bytes
+    quality: str
+
+
+def _encode(image: Image.Image, fmt: str, quality: int, orientation) -> bytes:
+    exif = Image.Exif()
+    if orientation:
+        exif[EXIF_ORIENTATION] = orientation
+    buffer = BytesIO()
+    image.save(buffer, format=fmt, quality=quality, exif=exif.tobytes(), optimize=fmt == "JPEG")
+    return buffer.getvalue()
+
+
+def process_photo(
+    path: str,
+    display_max_size: int,
+    thumbnail_size: int,
+    fmt: str = "WEBP",
+    display_quality: int = 80,
+    thumbnail_quality: int = 70
+) -> ProcessedPhoto:
+    """Produit la déclinaison d'affichage, la miniature et la note de qualité.
+
+    Les métadonnées EXIF (GPS, appareil...) sont supprimées, sauf l'orientation.
+    L'image n'est décodée qu'une fois pour les trois résultats.
+    """
+    try:
+        with Image.open(path) as source:
+            original_size = source.size
+            orientation = source.getexif().get(EXIF_ORIENTATION)
+            # Décodage JPEG directement à une échelle réduite : bien moins de mémoire et de CPU
+            source.draft("RGB", (display_max_size, display_max_size))
+            image = source.convert("RGB")
+    # DecompressionBombError (dimensions démesurées) ne dérive pas d'OSError : sans
+    # ce cas, l'erreur remonterait du pool de processus en 500
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidImageError(str(e)) from e
+
+    image.thumbnail((display_max_size, display_max_size), Image.Resampling.LANCZOS)
+    display = _encode(image, fmt, display_quality, orientation)
+    quality = score_image(image, original_size)["quality"]
+
+    image.thumbnail((thumbnail_size, thumbnail_size), Image.Resampling.LANCZOS)
+    thumbnail = _encode(image, fmt, thumbnail_quality, orientation)
+
+    return ProcessedPhoto(display, thumbnail, quality)
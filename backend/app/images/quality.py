@@ -0,0 +1,91 @@
+"""Note de qualité d'une photo : netteté, exposition et résolution.
+
+Calcul vectorisé NumPy sur une version réduite en niveaux de gris, exécuté dans
+le pool de processus avec la génération des déclinaisons.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+from PIL import Image
+
+GREEN = "green"
+ORANGE = "orange"
+RED = "red"
+GRADES = (GREEN, ORANGE, RED)
+
+# Taille d'analyse : les seuils de netteté sont calibrés à cette échelle
+ANALYSIS_MAX_SIZE = 1024
+
+# Variance du laplacien en dessous de laquelle la photo est jugée floue
+BLUR_RED_THRESHOLD = 30.0
+BLUR_ORANGE_THRESHOLD = 100.0
+
+# Part de pixels écrêtés (quasi noirs ou quasi blancs)
+CLIPPED_RED_RATIO = 0.25
+CLIPPED_ORANGE_RATIO = 0.10
+SHADOW_LEVEL = 8
+HIGHLIGHT_LEVEL = 247
+
+# Luminosité moyenne acceptable (0-255)
+MEAN_ORANGE_RANGE = (50.0, 205.0)
+
+# Résolution de l'original, en mégapixels
+RESOLUTION_RED_MP = 2.0
+RESOLUTION_ORANGE_MP = 5.0
+
+
+def laplacian_variance(gray: np.ndarray) -> float:
+    """Variance du laplacien 4-voisins : faible pour une image floue."""
+    g = gray.astype(np.float32)
+    laplacian = g[:-2, 1:-1] + g[2:, 1:-1] + g[1:-1, :-2] + g[1:-1, 2:] - 4.0 * g[1:-1, 1:-1]
+    return float(laplacian.var())
+
+
+def exposure_stats(gray: np.ndarray) -> Tuple[float, float]:
+    """Luminosité moyenne et part de pixels écrêtés, depuis l'histogramme."""
+    histogram = np.bincount(gray.ravel(), minlength=256)
+    total = histogram.sum()
+    mean = float(np.dot(histogram, np.arange(256)) / total)
+    clipped = float((histogram[:SHADOW_LEVEL + 1].sum() + histogram[HIGHLIGHT_LEVEL:].sum()) / total)
+    return mean, clipped
+
+
+def _grade(value: float, red: float, orange: float) -> int:
+    """0 (vert), 1 (orange) ou 2 (rouge) pour une mesure où plus bas est pire."""
+    if value < red:
+        return 2
+    if value < orange:
+        return 1
+    return 0
+
+
+def score_image(image: Image.Image, original_size: Tuple[int, int]) -> Dict[str, object]:
+    """Mesures et note globale (la pire des trois) d'une photo.
+
+    `image` peut être une version déjà réduite ; `original_size` est la taille
+    de l'image telle que prise, utilisée pour le critère de résolution.
+    """
+    gray_image = image.convert("L")
+    gray_image.thumbnail((ANALYSIS_MAX_SIZE, ANALYSIS_MAX_SIZE), Image.Resampling.BILINEAR)
+    gray = np.asarray(gray_image)
+
+    sharpness = laplacian_variance(gray)
+    mean, clipped = exposure_stats(gray)
+    megapixels = original_size[0] * original_size[1] / 1_000_000
+
+    exposure_grade = 2 if clipped > CLIPPED_RED_RATIO else (
+        1 if clipped > CLIPPED_ORANGE_RATIO
+        or not MEAN_ORANGE_RANGE[0] <= mean <= MEAN_ORANGE_RANGE[1] else 0
+    )
+    grade = max(
+        _grade(sharpness, BLUR_RED_THRESHOLD, BLUR_ORANGE_THRESHOLD),
+        exposure_grade,
+        _grade(megapixels, RESOLUTION_RED_MP, RESOLUTION_ORANGE_MP)
+    )
+    return {
+        "quality": GRADES[grade],
+        "sharpness": round(sharpness, 2),
+        "brightness": round(mean, 2),
+        "clipped_ratio": round(clipped, 4),
+        "megapixels": round(megapixels, 2),
+    }
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
@@ -5,12 +6,31 @@ from slowapi.errors import RateLimitExceeded
 
 from app.settings import settings
 from app.security.rate_limit import limiter
+from app.storage.client import get_storage_client, close_storage_client
+from app.pdf.jobs import pdf_jobs
+from app.utils.cache import cache_stats
+from app.utils.jobs import job_stats
+from app.utils.workers import shutdown_process_pool
 from app.api import auth, projects, customers, facades, photos, metrage, quotes, pdf, companies
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Client Storage partagé pour toute la durée de vie de l'application
+    get_storage_client()
+    # Consommateurs de la file de génération PDF
+    pdf_jobs.start()
+    yield
+    await pdf_jobs.stop()
+    await close_storage_client()
+    shutdown_process_pool()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="API SaaS B2B pour gestion de chantiers de façade"
+    description="API SaaS B2B pour gestion de chantiers de façade",
+    lifespan=lifespan
 )
 
 # ⚠️ CORS ULTRA LARGE — TEMPORAIRE POUR DÉBLOCAGE
@@ -35,6 +55,14 @@ def root():
 def health():
     return {"status": "healthy"}
 
+@app.get("/health/cache")
+def health_cache():
+    return cache_stats()
+
+@app.get("/health/jobs")
+def health_jobs():
+    return job_stats()
+
 # Routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(customers.router, prefix="/api/customers", tags=["customers"])
@@ -0,0 +1,257 @@
+"""Noyaux géométriques sur des lots de polygones (NumPy).
+
+Les polygones d'un lot sont stockés à plat : tous les sommets dans un seul
+tableau, les sommets d'un même polygone contigus et dans l'ordre du contour.
+"""
+from typing import Iterator, NamedTuple, Sequence, Tuple
+import numpy as np
+
+Point = Sequence[float]
+
+
+class PolygonArrays(NamedTuple):
+    """Polygones de toutes les mesures d'un lot, à plat."""
+    points: np.ndarray   # (m, 2) sommets
+    polygon: np.ndarray  # (m,) indice du polygone de chaque sommet
+    owner: np.ndarray    # (p,) indice de la mesure de chaque polygone
+
+
+def flatten_polygons(polygons: Sequence[Sequence[Sequence[Point]]]) -> PolygonArrays:
+    """`polygons[i]` : liste des polygones (listes de points x, y) de la mesure i."""
+    sizes = [len(polygon) for items in polygons for polygon in items]
+    points = np.array(
+        [point for items in polygons for polygon in items for point in polygon],
+        dtype=np.float64
+    ).reshape(-1, 2)
+    return PolygonArrays(
+        points=points,
+        polygon=np.repeat(np.arange(len(sizes)), sizes),
+        owner=np.repeat(np.arange(len(polygons)), [len(items) for items in polygons])
+    )
+
+
+def next_vertex(polygon: np.ndarray) -> np.ndarray:
+    """Indice du sommet suivant sur le contour (le dernier sommet boucle sur le premier)."""
+    following = np.arange(1, len(polygon) + 1)
+    if len(polygon):
+        ends = np.flatnonzero(np.diff(polygon, append=-1))
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        following[ends] = starts
+    return following
+
+
+def signed_polygon_areas(points: np.ndarray, polygon: np.ndarray, count: int) -> np.ndarray:
+    """Aire orientée de chaque polygone (formule du lacet) : positive dans le sens trigonométrique."""
+    following = next_vertex(polygon)
+    x, y = points[:, 0], points[:, 1]
+    cross = x * y[following] - x[following] * y
+    return np.bincount(polygon, weights=cross, minlength=count) / 2
+
+
+def polygon_areas(points: np.ndarray, polygon: np.ndarray, count: int) -> np.ndarray:
+    """Aire de chaque polygone, dans l'unité des points au carré."""
+    return np.abs(signed_polygon_areas(points, polygon, count))
+
+
+def is_convex(points: np.ndarray) -> bool:
+    """Vrai si le polygone (n, 2) est convexe et non dégénéré."""
+    edges = np.roll(points, -1, axis=0) - points
+    cross = edges[:, 0] * np.roll(edges[:, 1], -1) - edges[:, 1] * np.roll(edges[:, 0], -1)
+    return bool(np.all(cross > 0) or np.all(cross < 0))
+
+
+def _cross(origin: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Produit vectoriel (a - origin) x (b - origin), sur le dernier axe."""
+    return (a[..., 0] - origin[..., 0]) * (b[..., 1] - origin[..., 1]) - (a[..., 1] - origin[..., 1]) * (b[..., 0] - origin[..., 0])
+
+
+def _sectors_overlap(a1: np.ndarray, b1: np.ndarray, a2: np.ndarray, b2: np.ndarray) -> np.ndarray:
+    """Vrai si les secteurs angulaires (a1, b1) et (a2, b2), d'ouverture < 180°, se recouvrent."""
+    def cross(u, v):
+        return u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]
+
+    # Secteurs orientés dans le sens trigonométrique
+    swap = cross(a1, b1) < 0
+    a1, b1 = np.where(swap[:, None], b1, a1), np.where(swap[:, None], a1, b1)
+    swap = cross(a2, b2) < 0
+    a2, b2 = np.where(swap[:, None], b2, a2), np.where(swap[:, None], a2, b2)
+
+    def contains(a, b, u):
+        return (cross(a, u) >= 0) & (cross(u, b) >= 0)
+
+    return contains(a1, b1, a2) | contains(a2, b2, a1)
+
+
+def clip_triangles(subjects: np.ndarray, clips: np.ndarray) -> np.ndarray:
+    """Aire de l'intersection de triangles deux à deux : `subjects` et `clips` (p, 3, 2).
+
+    Sutherland-Hodgman vectorisé : le sujet est découpé par les trois demi-plans
+    du triangle de découpe (orienté dans le sens trigonométrique). Les polygones
+    intermédiaires ont une taille commune à tout le lot ; les emplacements libres
+    répètent le dernier sommet, ce qui ne change ni le découpage ni l'aire.
+    """
+    if not len(subjects):
+        return np.zeros(0)
+    ccw = _cross(clips[:, 0], clips[:, 1], clips[:, 2]) >= 0
+    clips = np.where(ccw[:, None, None], clips, clips[:, ::-1])
+    polygon = subjects
+    rows = np.arange(len(subjects))[:, None]
+    for edge in range(3):
+        a = clips[:, edge][:, None]
+        b = clips[:, (edge + 1) % 3][:, None]
+        current = polygon
+        following = np.roll(polygon, -1, axis=1)
+        d_current = _cross(a, b, current)
+        d_following = _cross(a, b, following)
+        in_current = d_current >= 0
+        in_following = d_following >= 0
+
+        denominator = d_current - d_following
+        t = np.divide(d_current, denominator, out=np.zeros_like(d_current), where=denominator != 0)
+        crossing = current + t[..., None] * (following - current)
+
+        # Par arête : point d'intersection éventuel puis sommet suivant s'il est dedans
+        candidates = np.stack([crossing, following], axis=2).reshape(len(polygon), -1, 2)
+        valid = np.stack([in_current != in_following, in_following], axis=2).reshape(len(polygon), -1)
+
+        # Compactage : sommets retenus en tête, puis répétition du dernier
+        # (au plus un sommet de plus par demi-plan, sauf arrondi sur un point du bord)
+        position = np.cumsum(valid, axis=1) - 1
+        count = position[:, -1] + 1
+        size = max(int(count.max(initial=0)), 1)
+        polygon = np.zeros((len(candidates), size, 2))
+        polygon[np.broadcast_to(rows, valid.shape)[valid], position[valid]] = candidates[valid]
+        last_vertex = polygon[rows[:, 0], np.maximum(count - 1, 0)]
+        padding = np.arange(size)[None, :] >= count[:, None]
+        polygon = np.where(padding[..., None], last_vertex[:, None], polygon)
+
+    x, y = polygon[..., 0], polygon[..., 1]
+    return np.abs(np.sum(x * np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1) * y, axis=1)) / 2
+
+
+def _edge_pairs(subjects: PolygonArrays, clips: PolygonArrays, chunk_size: int) -> Iterator[Tuple[np.ndarray, ...]]:
+    """Paires (arête du sujet, arête de découpe) d'une même mesure, par blocs de `chunk_size`.
+
+    Produit, pour chaque bloc, l'indice de la mesure, du premier sommet de
+    l'arête du sujet et du premier sommet de l'arête de découpe.
+    """
+    measures = int(max(subjects.owner.max(initial=-1), clips.owner.max(initial=-1))) + 1
+    subject_edges = np.bincount(subjects.owner[subjects.polygon], minlength=measures)
+    clip_edges = np.bincount(clips.owner[clips.polygon], minlength=measures)
+    subject_start = np.cumsum(subject_edges) - subject_edges
+    clip_start = np.cumsum(clip_edges) - clip_edges
+    pairs = subject_edges * clip_edges
+    pair_end = np.cumsum(pairs)
+
+    total = int(pair_end[-1]) if measures else 0
+    for begin in range(0, total, chunk_size):
+        pair = np.arange(begin, min(begin + chunk_size, total))
+        owner = np.searchsorted(pair_end, pair, side="right")
+        local = pair - (pair_end[owner] - pairs[owner])
+        yield owner, subject_start[owner] + local // clip_edges[owner], clip_start[owner] + local % clip_edges[owner]
+
+
+def _inside_polygons(subjects: PolygonArrays, clips: PolygonArrays, chunk_size: int) -> np.ndarray:
+    """Vrai pour chaque sujet entièrement contenu dans les polygones de découpe de sa mesure.
+
+    Tous ses sommets sont à l'intérieur (parité des croisements d'une demi-droite
+    horizontale) et aucune de ses arêtes ne touche une arête de découpe.
+    """
+    crossings = np.zeros(len(subjects.points))
+    touching = np.zeros(len(subjects.owner), dtype=bool)
+    subject_next = next_vertex(subjects.polygon)
+    clip_next = next_vertex(clips.polygon)
+    for _, subject_index, clip_index in _edge_pairs(subjects, clips, chunk_size):
+        p = subjects.points[subject_index]
+        q = subjects.points[subject_next[subject_index]]
+        r = clips.points[clip_index]
+        s = clips.points[clip_next[clip_index]]
+
+        straddle = (r[:, 1] > p[:, 1]) != (s[:, 1] > p[:, 1])
+        height = np.where(straddle, s[:, 1] - r[:, 1], 1)
+        x_crossing = r[:, 0] + (p[:, 1] - r[:, 1]) * (s[:, 0] - r[:, 0]) / height
+        crossings += np.bincount(
+            subject_index, weights=straddle & (p[:, 0] < x_crossing), minlength=len(subjects.points)
+        )
+
+        touch = (_cross(p, q, r) * _cross(p, q, s) <= 0) & (_cross(r, s, p) * _cross(r, s, q) <= 0)
+        touching[subjects.polygon[subject_index[touch]]] = True
+
+    outside_vertices = np.bincount(subjects.polygon, weights=crossings % 2 == 0, minlength=len(subjects.owner))
+    return (outside_vertices == 0) & ~touching
+
+
+def _clipped_areas(subjects: PolygonArrays, clips: PolygonArrays, chunk_size: int) -> np.ndarray:
+    """Aire d'intersection par décomposition en triangles orientés (cas général)."""
+    count = len(subjects.owner)
+    measures = int(max(subjects.owner.max(initial=-1), clips.owner.max(initial=-1))) + 1
+    clip_owner = clips.owner[clips.polygon]
+
+    # Origine commune par mesure : centre des sommets de découpe (limite les erreurs d'arrondi)
+    clip_count = np.maximum(np.bincount(clip_owner, minlength=measures), 1)
+    origins = np.column_stack([
+        np.bincount(clip_owner, weights=clips.points[:, 0], minlength=measures) / clip_count,
+        np.bincount(clip_owner, weights=clips.points[:, 1], minlength=measures) / clip_count,
+    ])
+
+    # Orientation de chaque contour : la somme ne dépend pas du sens de saisie des points
+    subject_orientation = np.sign(signed_polygon_areas(subjects.points, subjects.polygon, count))
+    clip_orientation = np.sign(signed_polygon_areas(clips.points, clips.polygon, len(clips.owner)))
+    subject_next = next_vertex(subjects.polygon)
+    clip_next = next_vertex(clips.polygon)
+
+    areas = np.zeros(count)
+    for owner, subject_index, clip_index in _edge_pairs(subjects, clips, chunk_size):
+        origin = origins[owner]
+        subject_triangles = np.stack(
+            [origin, subjects.points[subject_index], subjects.points[subject_next[subject_index]]], axis=1
+        )
+        clip_triangles_ = np.stack(
+            [origin, clips.points[clip_index], clips.points[clip_next[clip_index]]], axis=1
+        )
+        # Seuls les triangles dont les secteurs angulaires (vus de l'origine) se
+        # recouvrent ont une intersection non nulle
+        overlap = _sectors_overlap(
+            subject_triangles[:, 1] - origin, subject_triangles[:, 2] - origin,
+            clip_triangles_[:, 1] - origin, clip_triangles_[:, 2] - origin
+        )
+        subject_triangles, clip_triangles_ = subject_triangles[overlap], clip_triangles_[overlap]
+        subject_index, clip_index = subject_index[overlap], clip_index[overlap]
+
+        subject_polygon = subjects.polygon[subject_index]
+        sign = (
+            np.sign(_cross(subject_triangles[:, 0], subject_triangles[:, 1], subject_triangles[:, 2]))
+            * np.sign(_cross(clip_triangles_[:, 0], clip_triangles_[:, 1], clip_triangles_[:, 2]))
+            * subject_orientation[subject_polygon]
+            * clip_orientation[clips.polygon[clip_index]]
+        )
+        active = sign != 0
+        contribution = sign[active] * clip_triangles(subject_triangles[active], clip_triangles_[active])
+        areas += np.bincount(subject_polygon[active], weights=contribution, minlength=count)
+
+    return np.maximum(areas, 0)
+
+
+def intersection_areas(subjects: PolygonArrays, clips: PolygonArrays, chunk_size: int = 100000) -> np.ndarray:
+    """Aire de chaque polygone de `subjects` contenue dans les polygones `clips` de la même mesure.
+
+    Les polygones peuvent être concaves ; les polygones de découpe d'une mesure
+    ne doivent pas se chevaucher. Un sujet entièrement à l'intérieur garde son
+    aire (cas courant : fenêtre au milieu du mur). Les autres sont décomposés
+    en triangles orientés (origine, arête) : l'aire d'intersection est la somme
+    signée des intersections de ces triangles deux à deux. Les paires d'arêtes
+    sont traitées par blocs de `chunk_size` (mémoire bornée).
+    """
+    inside = _inside_polygons(subjects, clips, chunk_size)
+    areas = np.where(inside, polygon_areas(subjects.points, subjects.polygon, len(subjects.owner)), 0.0)
+
+    boundary = np.flatnonzero(~inside)
+    if len(boundary):
+        keep = ~inside[subjects.polygon]
+        renumber = np.cumsum(~inside) - 1
+        areas[boundary] = _clipped_areas(
+            PolygonArrays(subjects.points[keep], renumber[subjects.polygon[keep]], subjects.owner[boundary]),
+            clips,
+            chunk_size
+        )
+    return areas
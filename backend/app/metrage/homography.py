@@ -0,0 +1,39 @@
+"""Correction de perspective par homographie (NumPy).
+
+Les quatre coins de la référence (agglo, mire) photographiés de biais sont
+mis en correspondance avec un rectangle de dimensions connues (en cm). La
+transformation obtenue ramène tout point du plan de la façade dans ce repère
+métrique : les surfaces y sont mesurées sans déformation.
+"""
+import numpy as np
+
+
+def reference_homographies(corners_px: np.ndarray, width_cm: np.ndarray, height_cm: np.ndarray) -> np.ndarray:
+    """Homographies (n, 3, 3) image -> plan de façade en cm.
+
+    `corners_px` (n, 4, 2) : coins de chaque référence dans l'ordre haut-gauche,
+    haut-droit, bas-droit, bas-gauche. Les n systèmes 8x8 sont résolus en un appel.
+    """
+    n = len(corners_px)
+    target = np.zeros((n, 4, 2))
+    target[:, 1, 0] = target[:, 2, 0] = width_cm
+    target[:, 2, 1] = target[:, 3, 1] = height_cm
+
+    x, y = corners_px[..., 0], corners_px[..., 1]
+    u, v = target[..., 0], target[..., 1]
+    ones, zeros = np.ones_like(x), np.zeros_like(x)
+    # Deux équations par coin (h33 = 1)
+    rows_u = np.stack([x, y, ones, zeros, zeros, zeros, -u * x, -u * y], axis=-1)
+    rows_v = np.stack([zeros, zeros, zeros, x, y, ones, -v * x, -v * y], axis=-1)
+    a = np.concatenate([rows_u, rows_v], axis=1)
+    b = np.concatenate([u, v], axis=1)
+
+    h = np.linalg.solve(a, b[..., None])[..., 0]
+    return np.concatenate([h, np.ones((n, 1))], axis=1).reshape(n, 3, 3)
+
+
+def project_points(homographies: np.ndarray, points: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """Applique à chaque point (m, 2) l'homographie `homographies[index]`."""
+    h = homographies[index]
+    projected = np.einsum("mij,mj->mi", h, np.column_stack([points, np.ones(len(points))]))
+    return projected[:, :2] / projected[:, 2:]
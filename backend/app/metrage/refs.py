@@ -0,0 +1,78 @@
+"""Références de métrage par chantier, en cache.
+
+Les références d'un chantier sont lues une fois puis servies par le cache
+(mémoire et Redis) : les mesures répétées sur un même chantier ne
+requêtent plus metrage_refs. Une référence n'est jamais modifiée ; l'entrée
+du chantier est invalidée à chaque création (voir create_metrage_ref).
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.models import MetrageRef
+from ..settings import settings
+from ..utils.cache import SharedCache
+
+# Références de chaque chantier, indexées par id du chantier
+metrage_ref_cache = SharedCache(
+    "metrage_refs",
+    maxsize=settings.METRAGE_REF_CACHE_SIZE,
+    ttl=settings.METRAGE_REF_CACHE_TTL
+)
+
+
+class ProjectRef(NamedTuple):
+    """Référence de métrage détachée de l'ORM (valeur du cache)."""
+    id: str
+    width_cm: Optional[float]
+    height_cm: Optional[float]
+
+
+def select_ref(refs: List[ProjectRef], ref_id: Optional[UUID] = None) -> Optional[ProjectRef]:
+    """Référence demandée, ou à défaut la première créée sur le chantier."""
+    if ref_id is None:
+        return refs[0] if refs else None
+    return next((ref for ref in refs if ref.id == str(ref_id)), None)
+
+
+async def load_project_refs(
+    db: AsyncSession,
+    project_ids: Iterable[UUID],
+    refresh: bool = False
+) -> Dict[UUID, List[ProjectRef]]:
+    """Références de chaque chantier : cache, puis une requête pour les chantiers manquants.
+
+    `refresh` : ignore le cache (référence créée par un autre worker depuis la
+    mise en cache).
+    """
+    keys = sorted({str(project_id) for project_id in project_ids})
+    found = {} if refresh else await metrage_ref_cache.aget_many(keys)
+    missing = [key for key in keys if key not in found]
+
+    if missing:
+        result = await db.execute(
+            select(MetrageRef.id, MetrageRef.project_id, MetrageRef.width_cm, MetrageRef.height_cm)
+            .where(MetrageRef.project_id.in_([UUID(key) for key in missing]))
+            # Ordre stable : la référence par défaut est la plus ancienne du chantier
+            .order_by(MetrageRef.project_id, MetrageRef.created_at, MetrageRef.id)
+        )
+        loaded: Dict[str, list] = {}
+        for ref_id, project_id, width_cm, height_cm in result.all():
+            loaded.setdefault(str(project_id), []).append([
+                str(ref_id),
+                float(width_cm) if width_cm is not None else None,
+                float(height_cm) if height_cm is not None else None
+            ])
+        # Chantier sans référence : pas mis en cache, la première référence créée
+        # est vue par tous les workers sans attendre l'expiration
+        await metrage_ref_cache.aset_many(loaded)
+        found.update(loaded)
+
+    return {UUID(key): [ProjectRef(*ref) for ref in refs] for key, refs in found.items()}
+
+
+async def invalidate_project_refs(project_id: UUID):
+    """À appeler après l'ajout d'une référence au chantier."""
+    await metrage_ref_cache.adelete(str(project_id))
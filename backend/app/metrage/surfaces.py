@@ -0,0 +1,130 @@
+"""Calcul des surfaces de façade, vectorisé avec NumPy.
+
+Toutes les mesures d'un lot sont calculées en une passe : une mesure par
+indice des tableaux, les ouvertures de toutes les mesures à plat avec
+l'indice de la mesure à laquelle elles appartiennent.
+
+Deux modes : rectangles (dimensions en pixels de la façade et des ouvertures,
+échelle simple) ou contours, ramenés en cm par l'échelle simple ou par
+l'homographie de la référence (voir homography.py).
+"""
+from typing import NamedTuple, Sequence, Tuple
+import numpy as np
+
+from .geometry import PolygonArrays, intersection_areas, polygon_areas
+from .homography import project_points
+
+
+class SurfaceArrays(NamedTuple):
+    """Surfaces calculées (en m et m²), un élément par mesure."""
+    width_m: np.ndarray
+    height_m: np.ndarray
+    surface_m2: np.ndarray
+    openings_m2: np.ndarray
+    net_surface_m2: np.ndarray
+
+
+class OpeningArrays(NamedTuple):
+    """Ouvertures de toutes les mesures, à plat."""
+    width_px: np.ndarray
+    height_px: np.ndarray
+    index: np.ndarray  # indice de la mesure de chaque ouverture
+
+
+def flatten_openings(openings: Sequence[Sequence[Tuple[float, float]]]) -> OpeningArrays:
+    """`openings[i]` : ouvertures (largeur, hauteur en px) de la mesure i."""
+    counts = [len(items) for items in openings]
+    sizes = np.array([size for items in openings for size in items], dtype=np.float64).reshape(-1, 2)
+    return OpeningArrays(
+        width_px=sizes[:, 0],
+        height_px=sizes[:, 1],
+        index=np.repeat(np.arange(len(openings)), counts)
+    )
+
+
+def compute_surfaces(
+    ref_width_cm: np.ndarray,
+    ref_height_cm: np.ndarray,
+    ref_width_px: np.ndarray,
+    ref_height_px: np.ndarray,
+    facade_width_px: np.ndarray,
+    facade_height_px: np.ndarray,
+    openings: OpeningArrays
+) -> SurfaceArrays:
+    """Surfaces brutes, ouvertures et nettes à partir de la référence de chaque mesure.
+
+    L'échelle px/cm est la moyenne des échelles horizontale et verticale de la
+    référence (correction de perspective simple). L'ordre des opérations est
+    celui du calcul unitaire historique : mêmes arrondis au centime.
+    """
+    px_per_cm = (ref_width_px / ref_width_cm + ref_height_px / ref_height_cm) / 2
+
+    width_m = (facade_width_px / px_per_cm) / 100
+    height_m = (facade_height_px / px_per_cm) / 100
+    surface_m2 = width_m * height_m
+
+    opening_px_per_cm = px_per_cm[openings.index]
+    opening_m2 = ((openings.width_px / opening_px_per_cm) / 100) * ((openings.height_px / opening_px_per_cm) / 100)
+    openings_m2 = np.bincount(openings.index, weights=opening_m2, minlength=len(px_per_cm))
+
+    return SurfaceArrays(
+        width_m=width_m,
+        height_m=height_m,
+        surface_m2=surface_m2,
+        openings_m2=openings_m2,
+        net_surface_m2=surface_m2 - openings_m2
+    )
+
+
+def scale_transforms(
+    ref_width_cm: np.ndarray,
+    ref_height_cm: np.ndarray,
+    ref_width_px: np.ndarray,
+    ref_height_px: np.ndarray
+) -> np.ndarray:
+    """Transformations (n, 3, 3) image -> cm de l'échelle simple (sans perspective)."""
+    px_per_cm = (ref_width_px / ref_width_cm + ref_height_px / ref_height_cm) / 2
+    transforms = np.zeros((len(px_per_cm), 3, 3))
+    transforms[:, 0, 0] = transforms[:, 1, 1] = 1 / px_per_cm
+    transforms[:, 2, 2] = 1
+    return transforms
+
+
+def compute_polygon_surfaces(
+    transforms: np.ndarray,
+    walls: PolygonArrays,
+    openings: PolygonArrays
+) -> SurfaceArrays:
+    """Surfaces à partir de contours en pixels, ramenés en cm par `transforms` (n, 3, 3).
+
+    `walls` : contours de façade et de pignons (au moins un par mesure, sans
+    chevauchement) ; `openings` : contours des ouvertures. Seule la partie de
+    chaque ouverture située sur la façade ou un pignon est déduite. Largeur et
+    hauteur sont celles du rectangle englobant les contours redressés.
+    """
+    count = len(transforms)
+
+    wall_owner = walls.owner[walls.polygon]
+    wall_cm = project_points(transforms, walls.points, wall_owner)
+    wall_m2 = polygon_areas(wall_cm, walls.polygon, len(walls.owner)) / 10000
+    surface_m2 = np.bincount(walls.owner, weights=wall_m2, minlength=count)
+    # Sommets regroupés par mesure (dans l'ordre de flatten_polygons)
+    starts = np.flatnonzero(np.diff(wall_owner, prepend=-1))
+    x, y = wall_cm[:, 0], wall_cm[:, 1]
+    width_m = (np.maximum.reduceat(x, starts) - np.minimum.reduceat(x, starts)) / 100
+    height_m = (np.maximum.reduceat(y, starts) - np.minimum.reduceat(y, starts)) / 100
+
+    opening_cm = project_points(transforms, openings.points, openings.owner[openings.polygon])
+    opening_m2 = intersection_areas(
+        PolygonArrays(opening_cm, openings.polygon, openings.owner),
+        PolygonArrays(wall_cm, walls.polygon, walls.owner)
+    ) / 10000
+    openings_m2 = np.bincount(openings.owner, weights=opening_m2, minlength=count)
+
+    return SurfaceArrays(
+        width_m=width_m,
+        height_m=height_m,
+        surface_m2=surface_m2,
+        openings_m2=openings_m2,
+        net_surface_m2=surface_m2 - openings_m2
+    )
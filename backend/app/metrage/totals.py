@@ -0,0 +1,131 @@
+"""Métrages enregistrés par photo et totaux par chantier.
+
+Les totaux d'un chantier (project_metrage_totals) ne sont jamais recalculés
+par agrégation : chaque écriture dans photo_metrages y applique l'écart
+(nouvelles valeurs - anciennes) dans la même transaction, par incrément
+atomique en base. La lecture des totaux est une lecture par clé primaire.
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.models import PhotoMetrage, ProjectMetrageTotal
+
+# Valeurs d'un métrage (colonnes de photo_metrages)
+METRAGE_FIELDS = ("surface_m2", "width_m", "height_m", "openings_m2", "net_surface_m2")
+# Valeurs cumulées par chantier
+TOTAL_FIELDS = ("surface_m2", "openings_m2", "net_surface_m2")
+
+
+def _add_delta(deltas: Dict[UUID, dict], project_id: UUID, values, sign: int):
+    """Ajoute (sign=1) ou retire (sign=-1) un métrage aux écarts du chantier."""
+    delta = deltas.setdefault(project_id, {"photos": 0, **{field: Decimal(0) for field in TOTAL_FIELDS}})
+    delta["photos"] += sign
+    for field in TOTAL_FIELDS:
+        # Valeurs arrondies au centième : exactes en Decimal, sans dérive des totaux
+        delta[field] += sign * Decimal(str(values[field]))
+
+
+async def _apply_deltas(db: AsyncSession, deltas: Dict[UUID, dict]):
+    """Incrémente les totaux des chantiers (ligne créée au premier métrage)."""
+    rows = [
+        {"project_id": project_id, **delta}
+        for project_id, delta in sorted(deltas.items())  # ordre stable des verrous entre transactions
+        if any(delta.values())
+    ]
+    if not rows:
+        return
+    stmt = insert(ProjectMetrageTotal)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ProjectMetrageTotal.project_id],
+            set_={
+                **{
+                    field: getattr(ProjectMetrageTotal, field) + getattr(stmt.excluded, field)
+                    for field in ("photos",) + TOTAL_FIELDS
+                },
+                "updated_at": func.now()
+            }
+        ),
+        rows
+    )
+
+
+async def save_metrages(db: AsyncSession, records: List[dict]):
+    """Enregistre le métrage de chaque photo (remplace le précédent) et met à jour les totaux.
+
+    `records` : photo_id, facade_id, project_id et les valeurs de METRAGE_FIELDS.
+    Trois requêtes au plus quel que soit le nombre de photos ; la transaction
+    n'est pas validée (commit par l'appelant).
+    """
+    # Une photo mesurée deux fois dans le lot : seule la dernière mesure est gardée
+    by_photo = {record["photo_id"]: record for record in records}
+    if not by_photo:
+        return
+
+    # Upsert sur photo_id : une photo déjà mesurée (y compris par une transaction
+    # concurrente validée entre-temps) n'est pas modifiée mais verrouillée jusqu'au
+    # commit, et RETURNING renvoie les valeurs qu'elle portait. Une ligne renvoyée
+    # avec un autre id que celui proposé est donc une ligne existante.
+    rows = [
+        {
+            "id": uuid4(),
+            "photo_id": photo_id,
+            "facade_id": record["facade_id"],
+            "project_id": record["project_id"],
+            **{field: record[field] for field in METRAGE_FIELDS}
+        }
+        for photo_id, record in sorted(by_photo.items())  # ordre stable des verrous entre transactions
+    ]
+    stmt = insert(PhotoMetrage)
+    result = await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[PhotoMetrage.photo_id],
+            set_={"photo_id": stmt.excluded.photo_id}
+        )
+        .returning(PhotoMetrage.id, PhotoMetrage.photo_id, PhotoMetrage.project_id, *[
+            getattr(PhotoMetrage, field) for field in TOTAL_FIELDS
+        ]),
+        rows
+    )
+    proposed_ids = {row["id"] for row in rows}
+
+    deltas: Dict[UUID, dict] = {}
+    updated_rows: List[dict] = []
+    now = datetime.now(timezone.utc)
+    for previous in result.all():
+        record = by_photo[previous.photo_id]
+        values = {field: record[field] for field in METRAGE_FIELDS}
+        if previous.id not in proposed_ids:
+            _add_delta(deltas, previous.project_id, previous._mapping, -1)
+            updated_rows.append({
+                "id": previous.id,
+                "facade_id": record["facade_id"],
+                "project_id": record["project_id"],
+                **values,
+                "updated_at": now
+            })
+        _add_delta(deltas, record["project_id"], values, 1)
+
+    # Lignes existantes, verrouillées par l'upsert : mise à jour par clé primaire
+    if updated_rows:
+        await db.execute(update(PhotoMetrage), updated_rows)
+    await _apply_deltas(db, deltas)
+
+
+async def delete_metrages(db: AsyncSession, photo_ids: Iterable[UUID]):
+    """Supprime le métrage des photos et le retire des totaux (sans commit)."""
+    result = await db.execute(
+        delete(PhotoMetrage)
+        .where(PhotoMetrage.photo_id.in_(list(photo_ids)))
+        .returning(PhotoMetrage.project_id, *[getattr(PhotoMetrage, field) for field in TOTAL_FIELDS])
+    )
+    deltas: Dict[UUID, dict] = {}
+    for row in result.all():
+        _add_delta(deltas, row.project_id, row._mapping, -1)
+    await _apply_deltas(db, deltas)
@@ -0,0 +1,181 @@
+"""Cache disque des PDF de devis, adressé par contenu.
+
+La clé est un SHA-256 de tout ce qui apparaît dans le PDF (version, lignes,
+totaux, société, client, filigrane TRIAL) et de la version du gabarit : un
+changement de nom de société ou de plan produit une nouvelle clé, l'ancien PDF
+n'est donc jamais resservi. Les entrées d'une société sont en plus purgées dès
+que son nom ou son abonnement change via l'ORM (après le commit).
+"""
+from pathlib import Path
+from typing import BinaryIO, Optional, Set
+from uuid import uuid4
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from ..db.models import Company, Subscription
+from ..settings import settings
+from ..utils.cache import register_cache
+from .generator import PDF_TEMPLATE_VERSION
+
+
+def pdf_cache_key(payload: dict) -> str:
+    """Empreinte du contenu d'un PDF (payload construit par api/pdf.py)."""
+    content = {
+        "template": PDF_TEMPLATE_VERSION,
+        "quote_version_id": payload["quote_version_id"],
+        "render": payload["render"],
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+class PdfCache:
+    """PDF rendus, un fichier par empreinte et un dossier par société.
+
+    Taille totale bornée : au-delà de `max_bytes`, les fichiers les moins
+    récemment servis sont supprimés. Les PDF ne sont jamais chargés en mémoire :
+    le rendu écrit dans un fichier temporaire (dossier `tmp`, hors des dossiers
+    purgés), renommé dans le cache une fois terminé.
+
+    Les PDF sont servis ouverts : un fichier évincé ou purgé pendant son
+    utilisation reste lisible jusqu'à sa fermeture.
+    """
+
+    def __init__(self, name: str, directory: Optional[str], max_bytes: int):
+        self.name = name
+        self.directory = Path(directory or Path(tempfile.gettempdir()) / "facade-suite-pdf-cache")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size: Optional[int] = None
+        register_cache(name, self)
+
+    def _path(self, company_id: str, digest: str) -> Path:
+        return self.directory / company_id / f"{digest}.pdf"
+
+    def _open(self, path: Path) -> Optional[BinaryIO]:
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        # mtime = dernier accès, utilisé pour l'éviction
+        os.utime(f.fileno())
+        return f
+
+    def _store(self, tmp_path: Path, path: Path) -> BinaryIO:
+        f = open(tmp_path, "rb")
+        # Dossier de la société éventuellement purgé pendant le rendu
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Renommage atomique : un lecteur concurrent ne voit jamais un fichier partiel
+        os.replace(tmp_path, path)
+        if self._size is None:
+            self._size = sum(f.stat().st_size for f in self.directory.glob("*/*.pdf"))
+        else:
+            self._size += path.stat().st_size
+        if self._size > self.max_bytes:
+            self._evict()
+        return f
+
+    def _evict(self):
+        files = sorted(self.directory.glob("*/*.pdf"), key=lambda f: f.stat().st_mtime)
+        self._size = sum(f.stat().st_size for f in files)
+        for f in files:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            self._size -= f.stat().st_size
+            f.unlink(missing_ok=True)
+            self.evictions += 1
+
+    def temp_path(self) -> Path:
+        """Fichier temporaire où écrire un rendu, sur le même disque que le cache."""
+        directory = self.directory / "tmp"
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / f"{uuid4().hex}.{os.getpid()}.tmp"
+
+    async def open(self, company_id: str, digest: str) -> Optional[BinaryIO]:
+        """PDF en cache ouvert en lecture (à fermer par l'appelant), ou None."""
+        f = await asyncio.to_thread(self._open, self._path(company_id, digest))
+        if f is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return f
+
+    async def store(self, company_id: str, digest: str, tmp_path: Path) -> BinaryIO:
+        """Déplace un rendu (écrit dans temp_path) dans le cache ; le retourne ouvert en lecture."""
+        return await asyncio.to_thread(self._store, tmp_path, self._path(company_id, digest))
+
+    def _purge(self, company_id: str):
+        shutil.rmtree(self.directory / company_id, ignore_errors=True)
+        self._size = None
+
+    async def purge_company(self, company_id: str):
+        """Supprime tous les PDF en cache d'une société (hors de la boucle d'événements)."""
+        await asyncio.to_thread(self._purge, company_id)
+
+    def stats(self) -> dict:
+        """Compteurs hit/miss du cache (pour ce processus)."""
+        total = self.hits + self.misses
+        return {
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+pdf_cache = PdfCache("pdf", settings.PDF_CACHE_DIR, settings.PDF_CACHE_MAX_BYTES)
+
+
+# Tâches de purge en cours : référence gardée jusqu'à leur fin
+_purge_tasks: Set[asyncio.Task] = set()
+
+
+def _schedule_purge(target, company_id: str):
+    """Note la société à purger ; la purge a lieu au commit de la session."""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("pdf_cache_purges", set()).add(company_id)
+
+
+@event.listens_for(Company, "after_update")
+def _purge_company_pdfs(mapper, connection, target):
+    """Le nom de la société figure sur les PDF : ses entrées sont obsolètes."""
+    if inspect(target).attrs.name.history.has_changes():
+        _schedule_purge(target, str(target.id))
+
+
+@event.listens_for(Subscription, "after_update")
+def _purge_subscription_pdfs(mapper, connection, target):
+    """Le plan décide du filigrane TRIAL : les PDF de la société sont obsolètes."""
+    if inspect(target).attrs.plan_id.history.has_changes():
+        _schedule_purge(target, str(target.company_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _purge_after_commit(session):
+    """Purge les sociétés modifiées une fois la transaction validée."""
+    for company_id in session.info.pop("pdf_cache_purges", ()):
+        try:
+            task = asyncio.get_running_loop().create_task(pdf_cache.purge_company(company_id))
+        except RuntimeError:
+            # Hors boucle asyncio (routes sync)
+            pdf_cache._purge(company_id)
+            continue
+        _purge_tasks.add(task)
+        task.add_done_callback(_purge_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_purges(session):
+    """Transaction annulée : les PDF en cache restent valides."""
+    session.info.pop("pdf_cache_purges", None)
@@ -2,135 +2,248 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from io import BytesIO
-from typing import List
-
-
-def generate_quote_pdf(
-    company_name: str,
-    customer_name: str,
-    customer_city: str,
-    project_name: str,
-    version: int,
-    lines: List,
-    total: float,
-    is_trial: bool = False
-) -> bytes:
-    """Génère un PDF de devis."""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=30
-    )
-    
-    elements = []
-    
-    # En-tête verrouillé
-    header_data = [
-        [Paragraph(f"<b>{company_name}</b>", styles['Heading1'])],
-        [Paragraph("Devis de façade", title_style)],
-        [Paragraph(f"Version {version}", styles['Normal'])]
-    ]
-    header_table = Table(header_data, colWidths=[15*cm])
-    header_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f0f0f0')),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-    ]))
-    elements.append(header_table)
-    elements.append(Spacer(1, 1*cm))
-    
-    # Informations client
-    client_data = [
-        ["Client:", customer_name],
-        ["Ville:", customer_city or ""],
-        ["Chantier:", project_name]
-    ]
-    client_table = Table(client_data, colWidths=[4*cm, 11*cm])
-    client_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
-    elements.append(client_table)
-    elements.append(Spacer(1, 1*cm))
-    
-    # Lignes du devis
-    line_data = [["Description", "Quantité", "Prix unitaire", "Total"]]
-    for line in lines:
-        line_data.append([
-            line.label,
-            f"{float(line.quantity):.2f}",
-            f"{float(line.unit_price):.2f} €",
-            f"{float(line.total):.2f} €"
-        ])
-    
-    # Ligne total
-    line_data.append(["", "", "TOTAL", f"{total:.2f} €"])
-    
-    lines_table = Table(line_data, colWidths=[8*cm, 2*cm, 3*cm, 3*cm])
-    lines_table.setStyle(TableStyle([
-        # En-tête
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#333333')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        # Corps
-        ('ALIGN', (0, 1), (0, -2), 'LEFT'),
-        ('ALIGN', (1, 1), (-1, -2), 'RIGHT'),
-        ('GRID', (0, 0), (-1, -2), 0.5, colors.grey),
-        # Total
-        ('FONTNAME', (2, -1), (-1, -1), 'Helvetica-Bold'),
-        ('ALIGN', (2, -1), (-1, -1), 'RIGHT'),
-        ('BACKGROUND', (2, -1), (-1, -1), colors.HexColor('#f0f0f0')),
-        ('LINEABOVE', (2, -1), (-1, -1), 2, colors.black),
-    ]))
-    elements.append(lines_table)
-    elements.append(Spacer(1, 1*cm))
-    
-    # Filigrane TRIAL si nécessaire
-    if is_trial:
-        watermark = Paragraph(
-            "<b>TRIAL - Document non contractuel</b>",
-            ParagraphStyle(
-                'Watermark',
-                parent=styles['Normal'],
-                fontSize=14,
-                textColor=colors.HexColor('#ff0000'),
-                alignment=1
-            )
+from decimal import Decimal
+from typing import List, NamedTuple, Optional
+import os
+
+# À incrémenter à chaque changement de mise en page : invalide le cache PDF
+PDF_TEMPLATE_VERSION = 3
+
+# Hauteur d'une ligne de tableau sur une seule ligne de texte (leading 12 + padding 3 + 3)
+LINE_ROW_HEIGHT = 18
+
+
+class QuoteLineData(NamedTuple):
+    """Ligne de devis détachée de l'ORM (transmissible à un processus worker)."""
+    label: Optional[str]
+    quantity: str
+    unit_price: str
+    total: str
+
+
+class QuotePdfTemplate:
+    """Gabarit de devis : styles, styles de tableaux et éléments fixes.
+
+    Construit une seule fois par processus (voir get_quote_template) ; chaque
+    rendu ne crée que les éléments propres au devis.
+    """
+
+    def __init__(self):
+        # Styles
+        self.styles = getSampleStyleSheet()
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=self.styles['Heading1'],
+            fontSize=18,
+            textColor=colors.HexColor('#1a1a1a'),
+            spaceAfter=30
+        )
+        self.watermark_style = ParagraphStyle(
+            'Watermark',
+            parent=self.styles['Normal'],
+            fontSize=14,
+            textColor=colors.HexColor('#ff0000'),
+            alignment=1
         )
-        elements.append(watermark)
-    
-    # Mentions légales
-    elements.append(Spacer(1, 2*cm))
-    footer = Paragraph(
-        "Développé par El Bennouni Farid pour SARL Plein Sud Crépis - RCS 50113927300020",
-        ParagraphStyle(
+        self.footer_style = ParagraphStyle(
             'Footer',
-            parent=styles['Normal'],
+            parent=self.styles['Normal'],
             fontSize=8,
             textColor=colors.grey,
             alignment=1
         )
+
+        # Styles de tableaux (indices négatifs : valables quel que soit le nombre de lignes)
+        self.header_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f0f0f0')),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ])
+        self.client_table_style = TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ])
+        self.lines_table_style = TableStyle([
+            # En-tête
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#333333')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            # Corps
+            ('ALIGN', (0, 1), (0, -2), 'LEFT'),
+            ('ALIGN', (1, 1), (-1, -2), 'RIGHT'),
+            ('GRID', (0, 0), (-1, -2), 0.5, colors.grey),
+            # Total
+            ('FONTNAME', (2, -1), (-1, -1), 'Helvetica-Bold'),
+            ('ALIGN', (2, -1), (-1, -1), 'RIGHT'),
+            ('BACKGROUND', (2, -1), (-1, -1), colors.HexColor('#f0f0f0')),
+            ('LINEABOVE', (2, -1), (-1, -1), 2, colors.black),
+        ])
+        # Dernier bloc d'un devis multi-pages : sous-total de la page puis total général
+        self.last_chunk_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#333333')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('ALIGN', (0, 1), (0, -3), 'LEFT'),
+            ('ALIGN', (1, 1), (-1, -3), 'RIGHT'),
+            ('GRID', (0, 0), (-1, -3), 0.5, colors.grey),
+            ('FONTNAME', (2, -2), (-1, -1), 'Helvetica-Bold'),
+            ('ALIGN', (2, -2), (-1, -1), 'RIGHT'),
+            ('BACKGROUND', (2, -2), (-1, -1), colors.HexColor('#f0f0f0')),
+            ('LINEABOVE', (2, -1), (-1, -1), 2, colors.black),
+        ])
+        self.lines_header = ["Description", "Quantité", "Prix unitaire", "Total"]
+        self.lines_col_widths = [8*cm, 2*cm, 3*cm, 3*cm]
+
+        # Éléments fixes (identiques pour tous les devis)
+        self.document_title = Paragraph("Devis de façade", self.title_style)
+        self.watermark = Paragraph("<b>TRIAL - Document non contractuel</b>", self.watermark_style)
+        self.footer = Paragraph(
+            "Développé par El Bennouni Farid pour SARL Plein Sud Crépis - RCS 50113927300020",
+            self.footer_style
+        )
+
+    @staticmethod
+    def _line_row(line) -> list:
+        return [
+            line.label,
+            f"{float(line.quantity):.2f}",
+            f"{float(line.unit_price):.2f} €",
+            f"{float(line.total):.2f} €"
+        ]
+
+    def _lines_tables(self, lines: List, total: float, first_page_rows: int, page_rows: int) -> list:
+        """Tableau(x) des lignes du devis.
+
+        Un devis qui tient sur la première page garde un tableau unique. Au-delà,
+        les lignes sont découpées en blocs d'une page, chacun avec son en-tête et
+        son sous-total : ReportLab n'a jamais à mettre en page (ni à redécouper)
+        un tableau géant, le coût reste linéaire en nombre de lignes.
+        """
+        total_row = ["", "", "TOTAL", f"{total:.2f} €"]
+        if len(lines) <= first_page_rows:
+            line_data = [self.lines_header]
+            line_data.extend(self._line_row(line) for line in lines)
+            line_data.append(total_row)
+            table = Table(line_data, colWidths=self.lines_col_widths)
+            table.setStyle(self.lines_table_style)
+            return [table]
+
+        chunks = [lines[:first_page_rows]]
+        # Le dernier bloc porte une ligne de plus (total général)
+        remaining = lines[first_page_rows:]
+        while remaining:
+            size = page_rows if len(remaining) > page_rows else page_rows - 1
+            chunks.append(remaining[:size])
+            remaining = remaining[size:]
+
+        elements = []
+        for index, chunk in enumerate(chunks):
+            is_last = index == len(chunks) - 1
+            subtotal = sum((Decimal(str(line.total)) for line in chunk), Decimal(0))
+            line_data = [self.lines_header]
+            line_data.extend(self._line_row(line) for line in chunk)
+            line_data.append(["", "", "Sous-total page", f"{float(subtotal):.2f} €"])
+            if is_last:
+                line_data.append(total_row)
+            # repeatRows : si une ligne sur plusieurs lignes de texte fait déborder le bloc
+            table = Table(line_data, colWidths=self.lines_col_widths, repeatRows=1)
+            table.setStyle(self.last_chunk_table_style if is_last else self.lines_table_style)
+            elements.append(table)
+            if not is_last:
+                elements.append(PageBreak())
+        return elements
+
+    def build_elements(
+        self,
+        doc: SimpleDocTemplate,
+        company_name: str,
+        customer_name: str,
+        customer_city: str,
+        project_name: str,
+        version: int,
+        lines: List,
+        total: float,
+        is_trial: bool
+    ) -> list:
+        """Éléments du document pour un devis."""
+        elements = []
+
+        # En-tête verrouillé
+        header_data = [
+            [Paragraph(f"<b>{company_name}</b>", self.styles['Heading1'])],
+            [self.document_title],
+            [Paragraph(f"Version {version}", self.styles['Normal'])]
+        ]
+        header_table = Table(header_data, colWidths=[15*cm])
+        header_table.setStyle(self.header_table_style)
+        elements.append(header_table)
+        elements.append(Spacer(1, 1*cm))
+
+        # Informations client
+        client_data = [
+            ["Client:", customer_name],
+            ["Ville:", customer_city or ""],
+            ["Chantier:", project_name]
+        ]
+        client_table = Table(client_data, colWidths=[4*cm, 11*cm])
+        client_table.setStyle(self.client_table_style)
+        elements.append(client_table)
+        elements.append(Spacer(1, 1*cm))
+
+        # Lignes du devis : nombre de lignes tenant sur une page (moins l'en-tête du
+        # tableau et la ligne de sous-total / total)
+        frame_height = doc.height - 12  # padding haut et bas du cadre
+        used_height = sum(element.wrap(doc.width, frame_height)[1] for element in elements)
+        first_page_rows = int((frame_height - used_height) // LINE_ROW_HEIGHT) - 2
+        page_rows = int(frame_height // LINE_ROW_HEIGHT) - 2
+        elements.extend(self._lines_tables(lines, total, first_page_rows, page_rows))
+        elements.append(Spacer(1, 1*cm))
+
+        # Filigrane TRIAL si nécessaire
+        if is_trial:
+            elements.append(self.watermark)
+
+        # Mentions légales
+        elements.append(Spacer(1, 2*cm))
+        elements.append(self.footer)
+
+        return elements
+
+    def _build(self, target, quote: dict):
+        # invariant : pas d'horodatage ni d'identifiant aléatoire, un même devis donne
+        # toujours les mêmes octets (hash de vérification recalculable)
+        doc = SimpleDocTemplate(target, pagesize=A4, invariant=True)
+        doc.build(self.build_elements(doc, **quote))
+
+    def render_to_file(self, path: str, **quote) -> int:
+        """Écrit le PDF d'un devis dans un fichier ; retourne sa taille."""
+        self._build(path, quote)
+        return os.path.getsize(path)
+
+
+_quote_template: Optional[QuotePdfTemplate] = None
+
+
+def get_quote_template() -> QuotePdfTemplate:
+    """Gabarit partagé du processus, créé au premier rendu."""
+    global _quote_template
+    if _quote_template is None:
+        _quote_template = QuotePdfTemplate()
+    return _quote_template
+
+
+def render_quote_pdf_to_file(render: dict, path: str) -> int:
+    """Point d'entrée du pool de processus : `render` est un dict JSON (voir api/pdf.py).
+
+    Le PDF est écrit dans `path` : rien ne revient par le pipe du pool.
+    """
+    return get_quote_template().render_to_file(
+        path, **{**render, "lines": [QuoteLineData(*line) for line in render["lines"]]}
     )
-    elements.append(footer)
-    
-    # Générer le PDF
-    doc.build(elements)
-    
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    
-    return pdf_bytes
@@ -0,0 +1,85 @@
+"""Génération des PDF de devis en arrière-plan."""
+import asyncio
+import os
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+
+from ..db.database import AsyncSessionLocal
+from ..db.models import PdfVerification, QuoteVersion
+from ..settings import settings
+from ..storage.client import get_storage_client, iter_open_file
+from ..utils.jobs import JobQueue
+from ..utils.workers import run_in_process
+from .cache import pdf_cache, pdf_cache_key
+from .generator import render_quote_pdf_to_file
+from .verification import file_digests, verify_negative_cache
+
+
+async def process_pdf_job(payload: dict) -> dict:
+    """Rend le PDF dans le pool de processus, l'envoie sur Storage et l'enregistre sur la version.
+
+    `payload` est construit par api/pdf.py (build_pdf_payload) : uniquement des
+    types JSON, pour pouvoir transiter par Redis.
+    """
+    # PDF identique déjà rendu : pas de nouveau rendu. Le fichier est gardé
+    # ouvert : une éviction ou une purge concurrente ne l'enlève plus sous nos pieds
+    company_id = payload["company_id"]
+    cache_key = pdf_cache_key(payload)
+    pdf_file = await pdf_cache.open(company_id, cache_key)
+    if pdf_file is None:
+        # Le worker écrit le PDF sur disque : les octets ne transitent ni par le
+        # pipe du pool ni par la mémoire de l'API, quelle que soit la taille du devis
+        tmp_path = pdf_cache.temp_path()
+        try:
+            await run_in_process(render_quote_pdf_to_file, payload["render"], str(tmp_path))
+            pdf_file = await pdf_cache.store(company_id, cache_key, tmp_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    
+    try:
+        # Hash de vérification déterministe (même PDF => même hash)
+        quote_version_id = payload["quote_version_id"]
+        pdf_hash, pdf_sha256 = await asyncio.to_thread(file_digests, quote_version_id, pdf_file)
+        pdf_size = os.fstat(pdf_file.fileno()).st_size
+        
+        # Upload sur Supabase Storage, sauf si l'objet en place est déjà ce PDF
+        pdf_path = payload["pdf_path"]
+        if payload.get("pdf_sha256") != pdf_sha256:
+            await get_storage_client().upload(
+                pdf_path, iter_open_file(pdf_file), "application/pdf", content_length=pdf_size, upsert=True
+            )
+            
+            # Enregistrer le chemin, l'empreinte (ETag) et le hash de vérification
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(QuoteVersion)
+                    .where(QuoteVersion.id == quote_version_id)
+                    .values(pdf_path=pdf_path, pdf_sha256=pdf_sha256, pdf_size=pdf_size)
+                )
+                # Les hashs des rendus précédents restent valides (PDF déjà envoyés au client)
+                await db.execute(
+                    insert(PdfVerification)
+                    .values(quote_version_id=quote_version_id, hash=pdf_hash)
+                    .on_conflict_do_nothing(index_elements=[PdfVerification.hash])
+                )
+                await db.commit()
+            await verify_negative_cache.adelete(pdf_hash)
+    finally:
+        pdf_file.close()
+    
+    result = {
+        "pdf_path": pdf_path,
+        "download_url": f"/api/pdf/versions/{quote_version_id}/download",
+        "verification_hash": pdf_hash,
+        "verification_url": f"/public/verify/{pdf_hash}",
+    }
+    return result
+
+
+pdf_jobs = JobQueue(
+    "pdf",
+    process_pdf_job,
+    concurrency=settings.PDF_JOB_CONCURRENCY,
+    ttl=settings.PDF_JOB_TTL_SECONDS
+)
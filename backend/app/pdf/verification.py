@@ -0,0 +1,31 @@
+"""Empreintes de vérification des PDF de devis."""
+from typing import BinaryIO, Tuple
+import hashlib
+import re
+
+from ..settings import settings
+from ..utils.cache import SharedCache
+
+HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# Hashs inconnus récemment demandés : absorbe le scraping sans toucher la base
+verify_negative_cache = SharedCache(
+    "pdf_verify_misses",
+    maxsize=settings.PDF_VERIFY_NEGATIVE_CACHE_SIZE,
+    ttl=settings.PDF_VERIFY_NEGATIVE_CACHE_TTL
+)
+
+
+def file_digests(quote_version_id: str, f: BinaryIO, chunk_size: int = 1024 * 1024) -> Tuple[str, str]:
+    """Hash de vérification et SHA-256 d'un PDF ouvert, lus en une passe par blocs depuis le début.
+
+    Le hash de vérification (SHA-256 de l'identifiant de version puis des octets
+    du PDF) est recalculable par quiconque détient le PDF et l'identifiant.
+    """
+    verification = hashlib.sha256(str(quote_version_id).encode())
+    content = hashlib.sha256()
+    f.seek(0)
+    while chunk := f.read(chunk_size):
+        verification.update(chunk)
+        content.update(chunk)
+    return verification.hexdigest(), content.hexdigest()
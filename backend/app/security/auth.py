@@ -2,16 +2,34 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager, object_session
+from typing import Optional, Set
+import asyncio
+import hashlib
 import httpx
+import time
 
 from ..settings import settings
-from ..db.database import get_db
-from ..db.models import Profile, Company
+from ..db.database import get_async_db
+from ..db.models import (
+    Profile, Company, Customer, Project, Facade, Photo, PhotoUpload, MetrageRef, Quote, QuoteVersion
+)
+from ..utils.cache import SharedCache, TTLCache
 
 security = HTTPBearer()
 
+# Utilisateurs résolus, indexés par `sub` du token
+user_cache = SharedCache(
+    "auth_users",
+    maxsize=settings.AUTH_USER_CACHE_SIZE,
+    ttl=settings.AUTH_USER_CACHE_TTL
+)
+
+# Claims déjà vérifiés, indexés par hash du token, valides jusqu'à `exp`
+claims_cache = TTLCache("jwt_claims", maxsize=settings.JWT_CACHE_SIZE)
+
 
 class AuthUser:
     """Utilisateur authentifié."""
@@ -28,6 +46,11 @@ class AuthUser:
 
 async def verify_supabase_token(token: str) -> dict:
     """Vérifie et décode un JWT Supabase."""
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    payload = claims_cache.get(token_hash)
+    if payload is not None:
+        return payload
+    
     try:
         # Vérification du JWT avec le secret Supabase
         payload = jwt.decode(
@@ -36,18 +59,23 @@ async def verify_supabase_token(token: str) -> dict:
             algorithms=[settings.ALGORITHM],
             audience="authenticated"
         )
-        return payload
     except JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Token invalide: {str(e)}",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    # Sans `exp`, le token n'est pas mis en cache
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp > time.time():
+        claims_cache.set(token_hash, payload, ttl=exp - time.time())
+    return payload
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> AuthUser:
     """Récupère l'utilisateur courant depuis le token JWT."""
     token = credentials.credentials
@@ -62,8 +90,13 @@ async def get_current_user(
             detail="Token invalide: user_id manquant"
         )
     
+    cached = await user_cache.aget(user_id)
+    if cached is not None:
+        return AuthUser(**cached)
+    
     # Récupérer le profil utilisateur
-    profile = db.query(Profile).filter(Profile.id == user_id).first()
+    result = await db.execute(select(Profile).where(Profile.id == user_id))
+    profile = result.scalar_one_or_none()
     
     if not profile:
         raise HTTPException(
@@ -71,12 +104,56 @@ async def get_current_user(
             detail="Profil utilisateur non trouvé"
         )
     
-    return AuthUser(
+    user = AuthUser(
         user_id=user_id,
         email=email,
         company_id=str(profile.company_id),
         role=profile.role
     )
+    await user_cache.aset(user_id, vars(user))
+    return user
+
+
+async def invalidate_user_cache(user_id: str):
+    """Invalide l'utilisateur en cache (à appeler si son rôle ou sa société change)."""
+    await user_cache.adelete(str(user_id))
+
+
+# Tâches d'invalidation Redis en cours : référence gardée jusqu'à leur fin
+_invalidation_tasks: Set[asyncio.Task] = set()
+
+
+@event.listens_for(Profile, "after_update")
+@event.listens_for(Profile, "after_delete")
+def _track_profile_change(mapper, connection, target):
+    """Note le profil modifié via l'ORM ; le cache est invalidé au commit de la session."""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_profiles", set()).add(str(target.id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_profiles(session):
+    """Invalide les profils modifiés une fois la transaction validée.
+    
+    Au flush, une requête concurrente pourrait remettre en cache l'ancien
+    profil avant le commit.
+    """
+    for user_id in session.info.pop("changed_profiles", ()):
+        user_cache.delete(user_id)
+        try:
+            task = asyncio.get_running_loop().create_task(invalidate_user_cache(user_id))
+        except RuntimeError:
+            # Hors boucle asyncio (routes sync) : l'entrée Redis expirera via son TTL
+            continue
+        _invalidation_tasks.add(task)
+        task.add_done_callback(_invalidation_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_profiles(session):
+    """Transaction annulée : le profil en cache reste valide."""
+    session.info.pop("changed_profiles", None)
 
 
 async def require_owner(current_user: AuthUser = Depends(get_current_user)) -> AuthUser:
@@ -96,3 +173,54 @@ def check_company_access(resource_company_id: str, user_company_id: str):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Accès refusé: ressource d'une autre entreprise"
         )
+
+
+# Chemin de relations entre une ressource et l'entité portant son company_id
+OWNERSHIP_PATHS = {
+    Customer: (),
+    Project: (),
+    Facade: (Facade.project,),
+    Photo: (Photo.facade, Facade.project),
+    PhotoUpload: (PhotoUpload.facade, Facade.project),
+    MetrageRef: (MetrageRef.project,),
+    Quote: (Quote.project,),
+    QuoteVersion: (QuoteVersion.quote, Quote.project),
+}
+
+
+async def get_owned_resource(
+    db: AsyncSession,
+    model,
+    resource_id,
+    current_user: AuthUser,
+    detail: str = "Ressource non trouvée",
+    lock: bool = False
+):
+    """Charge une ressource et sa chaîne de propriété en une requête, puis vérifie l'accès.
+    
+    Les entités intermédiaires (ex: photo.facade.project) sont chargées par la
+    même jointure et accessibles sans requête supplémentaire. Avec `lock`, la
+    ligne de la ressource est verrouillée (FOR UPDATE) jusqu'à la fin de la
+    transaction et relue même si elle est déjà dans la session.
+    """
+    path = OWNERSHIP_PATHS[model]
+    query = select(model).where(model.id == resource_id)
+    loader = None
+    for relationship in path:
+        query = query.join(relationship)
+        loader = contains_eager(relationship) if loader is None else loader.contains_eager(relationship)
+    if loader is not None:
+        query = query.options(loader)
+    if lock:
+        query = query.with_for_update(of=model).execution_options(populate_existing=True)
+    
+    result = await db.execute(query)
+    resource = result.scalar_one_or_none()
+    if not resource:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    
+    owner = resource
+    for relationship in path:
+        owner = getattr(owner, relationship.key)
+    check_company_access(str(owner.company_id), current_user.company_id)
+    return resource
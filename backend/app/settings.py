@@ -31,11 +31,53 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     
+    # Cache
+    REDIS_URL: Optional[str] = None
+    AUTH_USER_CACHE_TTL: int = 60
+    AUTH_USER_CACHE_SIZE: int = 10000
+    JWT_CACHE_SIZE: int = 10000
+    
     # Storage
     STORAGE_BUCKET: str = "facade-suite-private"
+    STORAGE_HTTP2: bool = True
+    STORAGE_MAX_CONNECTIONS: int = 50
+    STORAGE_TIMEOUT_SECONDS: float = 30.0
+    SIGNED_URL_CACHE_SIZE: int = 20000
+    PHOTO_MAX_UPLOAD_BYTES: int = 25 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 256 * 1024
+    # Uploads reprenables : blocs stockés sur disque local (volume partagé si plusieurs instances)
+    PHOTO_UPLOAD_SESSION_DIR: Optional[str] = None
+    PHOTO_UPLOAD_SESSION_TTL_HOURS: int = 24
+    PHOTO_UPLOAD_MAX_CHUNK_BYTES: int = 8 * 1024 * 1024
+    PHOTO_BATCH_MAX_FILES: int = 100
+    PHOTO_BATCH_CONCURRENCY: int = 4
+    # Déclinaisons générées à l'upload (format WEBP ou JPEG)
+    PHOTO_DISPLAY_MAX_SIZE: int = 1920
+    PHOTO_THUMBNAIL_SIZE: int = 320
+    PHOTO_RENDITION_FORMAT: str = "WEBP"
+    # Une URL en cache n'est resservie que s'il lui reste au moins cette durée de validité
+    SIGNED_URL_SAFETY_MARGIN_SECONDS: int = 300
+    
+    # Workers CPU (None = un par cœur)
+    PROCESS_POOL_WORKERS: Optional[int] = None
+    
+    # Métrage
+    METRAGE_BATCH_MAX_ITEMS: int = 5000
+    # Découpage des ouvertures : (points des ouvertures x points de la façade) par requête
+    METRAGE_MAX_EDGE_PAIRS: int = 2000000
+    METRAGE_REF_CACHE_SIZE: int = 10000
+    METRAGE_REF_CACHE_TTL: int = 600
     
     # PDF
     PDF_WATERMARK_TEXT: str = "TRIAL - Facade Suite"
+    # Consommateurs de la file PDF par processus API (le rendu part dans le pool de processus)
+    PDF_JOB_CONCURRENCY: int = 4
+    PDF_JOB_TTL_SECONDS: int = 3600
+    # Cache disque des PDF rendus (dossier temporaire système par défaut)
+    PDF_CACHE_DIR: Optional[str] = None
+    PDF_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    PDF_VERIFY_NEGATIVE_CACHE_SIZE: int = 100000
+    PDF_VERIFY_NEGATIVE_CACHE_TTL: int = 300
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,253 @@
+"""Client Supabase Storage partagé par toute l'application."""
+from fastapi import HTTPException, UploadFile, status
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional
+import asyncio
+import httpx
+
+from ..settings import settings
+from ..utils.cache import SharedCache
+
+# URLs signées déjà générées ; chaque hit est un appel Storage évité
+signed_url_cache = SharedCache("signed_urls", maxsize=settings.SIGNED_URL_CACHE_SIZE)
+
+
+def _signed_url_key(storage_path: str, expires_in: int) -> str:
+    return f"{expires_in}:{storage_path}"
+
+
+def _signed_url_ttl(expires_in: int) -> int:
+    """Durée pendant laquelle une URL signée peut être resservie depuis le cache."""
+    return expires_in - settings.SIGNED_URL_SAFETY_MARGIN_SECONDS
+
+
+class StorageClient:
+    """Accès au bucket Supabase Storage via un pool de connexions persistant.
+
+    Un seul client vit pendant toute la durée de l'application (voir le lifespan
+    dans main.py) : les connexions TCP/TLS sont réutilisées d'une requête à l'autre.
+    """
+
+    def __init__(
+        self,
+        base_url: str = settings.SUPABASE_URL,
+        service_key: str = settings.SUPABASE_SERVICE_KEY,
+        bucket: str = settings.STORAGE_BUCKET,
+        http2: bool = settings.STORAGE_HTTP2,
+        max_connections: int = settings.STORAGE_MAX_CONNECTIONS,
+        timeout: float = settings.STORAGE_TIMEOUT_SECONDS,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.base_url = base_url
+        self.bucket = bucket
+        self._client = httpx.AsyncClient(
+            base_url=f"{base_url}/storage/v1",
+            headers={
+                "Authorization": f"Bearer {service_key}",
+                "apikey": service_key
+            },
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0
+            ),
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            transport=transport
+        )
+
+    def _object_url(self, storage_path: str) -> str:
+        return f"/object/{self.bucket}/{storage_path}"
+
+    async def upload(
+        self,
+        storage_path: str,
+        content,
+        content_type: str,
+        content_length: Optional[int] = None,
+        upsert: bool = False
+    ):
+        """Envoie un objet dans le bucket (bytes ou itérateur asynchrone de bytes).
+        
+        Sans `content_length`, un itérateur est envoyé en Transfer-Encoding chunked.
+        Avec `upsert`, un objet existant au même chemin est remplacé.
+        """
+        headers = {"Content-Type": content_type}
+        if content_length is not None:
+            headers["Content-Length"] = str(content_length)
+        if upsert:
+            headers["x-upsert"] = "true"
+        response = await self._client.post(
+            self._object_url(storage_path),
+            content=content,
+            headers=headers
+        )
+        if response.status_code not in [200, 201]:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to upload file: {response.text}"
+            )
+
+    async def create_signed_url(self, storage_path: str, expires_in: int = 3600) -> str:
+        """Génère une URL signée pour un objet du bucket (servie depuis le cache si encore valide)."""
+        key = _signed_url_key(storage_path, expires_in)
+        cached = await signed_url_cache.aget(key)
+        if cached is not None:
+            return cached
+
+        response = await self._client.post(
+            f"/object/sign/{self.bucket}/{storage_path}",
+            json={"expiresIn": expires_in}
+        )
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate signed URL"
+            )
+
+        signed_path = response.json().get("signedURL")
+        if not signed_path:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="No signed URL returned"
+            )
+
+        signed_url = f"{self.base_url}/storage/v1{signed_path}"
+        await signed_url_cache.aset(key, signed_url, ttl=_signed_url_ttl(expires_in))
+        return signed_url
+
+    async def create_signed_urls(self, storage_paths: List[str], expires_in: int = 3600) -> Dict[str, str]:
+        """Génère les URLs signées de plusieurs objets en un seul appel (endpoint bulk).
+        
+        Seuls les chemins absents du cache sont envoyés à Storage.
+        """
+        keys = {path: _signed_url_key(path, expires_in) for path in storage_paths}
+        cached = await signed_url_cache.aget_many(list(keys.values()))
+        signed_urls = {path: cached[key] for path, key in keys.items() if key in cached}
+        missing = [path for path in keys if path not in signed_urls]
+        if not missing:
+            return signed_urls
+
+        response = await self._client.post(
+            f"/object/sign/{self.bucket}",
+            json={"expiresIn": expires_in, "paths": missing}
+        )
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate signed URLs"
+            )
+
+        fresh = {
+            item["path"]: f"{self.base_url}/storage/v1{item['signedURL']}"
+            for item in response.json()
+            if item.get("signedURL")
+        }
+        if len(fresh) != len(missing):
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="No signed URL returned"
+            )
+        await signed_url_cache.aset_many(
+            {keys[path]: url for path, url in fresh.items()},
+            ttl=_signed_url_ttl(expires_in)
+        )
+        signed_urls.update(fresh)
+        return signed_urls
+
+    async def open_download(self, storage_path: str) -> httpx.Response:
+        """Ouvre le téléchargement d'un objet en flux.
+        
+        Le statut est vérifié avant de rendre la main : l'appelant lit le corps via
+        `aiter_bytes()` et doit fermer la réponse (`aclose()`).
+        """
+        request = self._client.build_request("GET", f"/object/authenticated/{self.bucket}/{storage_path}")
+        response = await self._client.send(request, stream=True)
+        if response.status_code != 200:
+            await response.aclose()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND if response.status_code in (400, 404) else status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Fichier introuvable sur le stockage" if response.status_code in (400, 404) else "Failed to download file"
+            )
+        return response
+
+    async def delete_many(self, storage_paths: List[str]):
+        """Supprime plusieurs objets du bucket en un seul appel."""
+        response = await self._client.request(
+            "DELETE",
+            f"/object/{self.bucket}",
+            json={"prefixes": storage_paths}
+        )
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to delete files: {response.text}"
+            )
+
+    async def aclose(self):
+        """Ferme le pool de connexions."""
+        await self._client.aclose()
+
+
+def check_upload_size(size: Optional[int], max_bytes: int):
+    """Refuse un fichier dépassant la taille maximale autorisée."""
+    if size is not None and size > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Fichier trop volumineux (max {max_bytes // (1024 * 1024)} Mo)"
+        )
+
+
+async def iter_upload_file(
+    file: UploadFile,
+    max_bytes: int,
+    chunk_size: int = settings.UPLOAD_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Lit un UploadFile par blocs sans le charger en mémoire, en imposant une taille max."""
+    await file.seek(0)
+    total = 0
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        total += len(chunk)
+        check_upload_size(total, max_bytes)
+        yield chunk
+
+
+async def iter_file(path, chunk_size: int = settings.UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Lit un fichier local par blocs (lectures dans un thread), pour un upload en streaming."""
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        async for chunk in iter_open_file(f, chunk_size):
+            yield chunk
+    finally:
+        f.close()
+
+
+async def iter_open_file(f: BinaryIO, chunk_size: int = settings.UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Comme iter_file, depuis le début d'un fichier déjà ouvert (non fermé ici)."""
+    await asyncio.to_thread(f.seek, 0)
+    while True:
+        chunk = await asyncio.to_thread(f.read, chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+_storage_client: Optional[StorageClient] = None
+
+
+def get_storage_client() -> StorageClient:
+    """Retourne le client partagé (dependency FastAPI), créé au premier appel."""
+    global _storage_client
+    if _storage_client is None:
+        _storage_client = StorageClient()
+    return _storage_client
+
+
+async def close_storage_client():
+    """Ferme le client partagé à l'arrêt de l'application."""
+    global _storage_client
+    if _storage_client is not None:
+        await _storage_client.aclose()
+        _storage_client = None
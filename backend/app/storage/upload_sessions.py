@@ -0,0 +1,72 @@
+"""Fichiers temporaires des uploads reprenables (init / append / finalize).
+
+L'état (taille attendue, octets reçus) vit en base dans `photo_uploads` ; seuls
+les octets reçus sont écrits ici, dans un fichier par session. Ces fonctions sont
+bloquantes et s'appellent via asyncio.to_thread.
+"""
+from pathlib import Path
+from uuid import UUID
+import os
+import tempfile
+
+from ..settings import settings
+
+
+def _session_dir() -> Path:
+    directory = Path(settings.PHOTO_UPLOAD_SESSION_DIR or Path(tempfile.gettempdir()) / "facade-suite-uploads")
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def session_file(upload_id: UUID) -> Path:
+    """Chemin du fichier temporaire d'une session."""
+    return _session_dir() / f"{upload_id}.part"
+
+
+class SessionDataLost(Exception):
+    """Fichier de session absent ou plus court que les octets confirmés en base.
+
+    Fichier temporaire perdu, ou bloc arrivé sur une autre instance : `size`
+    est le nombre d'octets réellement présents, d'où le client doit reprendre.
+    """
+
+    def __init__(self, size: int):
+        super().__init__(f"{size} octets présents sur disque")
+        self.size = size
+
+
+def session_size(upload_id: UUID) -> int:
+    """Octets présents dans le fichier temporaire d'une session (0 s'il n'existe pas)."""
+    try:
+        return session_file(upload_id).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def write_chunk(upload_id: UUID, offset: int, data: bytes):
+    """Écrit un bloc à l'offset donné.
+
+    Le fichier est d'abord tronqué à `offset` : un bloc renvoyé après une coupure
+    (écrit sur disque mais jamais confirmé en base) est simplement réécrit.
+    Lève SessionDataLost si le fichier ne contient pas les `offset` premiers
+    octets : rien n'est écrit (pas de trou comblé par des zéros).
+    """
+    path = session_file(upload_id)
+    try:
+        f = open(path, "r+b")
+    except FileNotFoundError:
+        if offset:
+            raise SessionDataLost(0)
+        f = open(path, "wb")
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        if size < offset:
+            raise SessionDataLost(size)
+        f.truncate(offset)
+        f.seek(offset)
+        f.write(data)
+
+
+def discard_session(upload_id: UUID):
+    """Supprime le fichier temporaire d'une session."""
+    session_file(upload_id).unlink(missing_ok=True)
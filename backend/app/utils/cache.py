@@ -0,0 +1,212 @@
+"""Caches applicatifs : mémoire LRU avec TTL et partage Redis optionnel."""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import time
+
+from ..settings import settings
+
+logger = logging.getLogger(__name__)
+
+_registry: Dict[str, "TTLCache"] = {}
+_redis_client = None
+
+
+def get_redis():
+    """Retourne le client Redis partagé, ou None si REDIS_URL n'est pas configuré."""
+    global _redis_client
+    if not settings.REDIS_URL:
+        return None
+    if _redis_client is None:
+        import redis.asyncio as redis
+        _redis_client = redis.from_url(settings.REDIS_URL)
+    return _redis_client
+
+
+def register_cache(name: str, cache):
+    """Expose les compteurs d'un cache (objet avec une méthode stats()) dans /health/cache."""
+    _registry[name] = cache
+
+
+def cache_stats() -> Dict[str, dict]:
+    """Compteurs de tous les caches enregistrés."""
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+
+class TTLCache:
+    """Cache mémoire borné (LRU) avec expiration par entrée."""
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        register_cache(name, self)
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def _count(self, value: Optional[Any]) -> Optional[Any]:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retourne la valeur en cache, ou None si absente ou expirée."""
+        return self._count(self._lookup(key))
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Ajoute une valeur, en évinçant la moins récemment utilisée si plein."""
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        """Supprime une entrée."""
+        self._data.pop(key, None)
+
+    def clear(self):
+        """Vide le cache et remet les compteurs à zéro."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """Compteurs hit/miss du cache."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class SharedCache(TTLCache):
+    """Cache mémoire doublé d'un niveau Redis partagé entre workers.
+
+    Les valeurs doivent être sérialisables en JSON. Sans REDIS_URL, ou si Redis
+    est indisponible, seul le niveau mémoire est utilisé.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60.0):
+        super().__init__(name, maxsize=maxsize, ttl=ttl)
+        self.redis_hits = 0
+
+    def _redis_key(self, key: str) -> str:
+        return f"facade-suite:{self.name}:{key}"
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Lit le niveau mémoire puis, à défaut, Redis."""
+        value = self._lookup(key)
+        if value is not None:
+            return self._count(value)
+        redis = get_redis()
+        if redis is None:
+            return self._count(None)
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                raw, ttl_ms = await pipe.get(self._redis_key(key)).pttl(self._redis_key(key)).execute()
+        except Exception as e:
+            logger.warning("Redis indisponible pour le cache %s: %s", self.name, e)
+            return self._count(None)
+        if raw is None:
+            return self._count(None)
+        value = json.loads(raw)
+        self.redis_hits += 1
+        self.set(key, value, ttl=min(self.ttl, ttl_ms / 1000) if ttl_ms > 0 else self.ttl)
+        return self._count(value)
+
+    async def aget_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Lecture groupée : mémoire puis un seul MGET Redis pour les clés manquantes."""
+        found = {}
+        missing = []
+        for key in keys:
+            value = self._lookup(key)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        redis = get_redis()
+        if missing and redis is not None:
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.mget([self._redis_key(key) for key in missing])
+                    for key in missing:
+                        pipe.pttl(self._redis_key(key))
+                    raws, *ttls = await pipe.execute()
+            except Exception as e:
+                logger.warning("Redis indisponible pour le cache %s: %s", self.name, e)
+                raws, ttls = [None] * len(missing), []
+            for key, raw, ttl_ms in zip(missing, raws, ttls or [-1] * len(missing)):
+                if raw is None:
+                    continue
+                found[key] = json.loads(raw)
+                self.redis_hits += 1
+                self.set(key, found[key], ttl=min(self.ttl, ttl_ms / 1000) if ttl_ms > 0 else self.ttl)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Écrit dans le niveau mémoire et dans Redis."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self.set(key, value, ttl=ttl)
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(self._redis_key(key), json.dumps(value), px=int(ttl * 1000))
+        except Exception as e:
+            logger.warning("Redis indisponible pour le cache %s: %s", self.name, e)
+
+    async def aset_many(self, items: Dict[str, Any], ttl: Optional[float] = None):
+        """Écriture groupée (un seul aller-retour Redis)."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or not items:
+            return
+        for key, value in items.items():
+            self.set(key, value, ttl=ttl)
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(self._redis_key(key), json.dumps(value), px=int(ttl * 1000))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Redis indisponible pour le cache %s: %s", self.name, e)
+
+    async def adelete(self, key: str):
+        """Invalide l'entrée en mémoire et dans Redis."""
+        self.delete(key)
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.delete(self._redis_key(key))
+        except Exception as e:
+            logger.warning("Redis indisponible pour le cache %s: %s", self.name, e)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["redis_hits"] = self.redis_hits
+        return stats
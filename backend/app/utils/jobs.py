@@ -0,0 +1,165 @@
+"""File de tâches en arrière-plan : Redis si configuré, sinon en mémoire.
+
+Chaque processus API consomme la file avec quelques tâches asyncio ; le travail
+CPU des handlers part dans le pool de processus (voir utils/workers.py). Avec
+Redis, un job déposé par un worker uvicorn peut être exécuté par un autre.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+import asyncio
+import json
+import logging
+
+from .cache import TTLCache, get_redis
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Un handler reçoit le payload du job et retourne son résultat JSON
+JobHandler = Callable[[dict], Awaitable[dict]]
+
+_registry: Dict[str, "JobQueue"] = {}
+
+
+def job_stats() -> Dict[str, dict]:
+    """Compteurs de toutes les files enregistrées."""
+    return {name: queue.stats() for name, queue in _registry.items()}
+
+
+class _MemoryBackend:
+    """Stockage en mémoire du processus (tests, déploiement mono-worker)."""
+
+    def __init__(self, name: str, ttl: float):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._jobs = TTLCache(f"{name}_jobs", maxsize=100000, ttl=ttl)
+
+    async def push(self, job_id: str):
+        self._queue.put_nowait(job_id)
+
+    async def pop(self, timeout: float) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def save(self, job_id: str, job: dict):
+        self._jobs.set(job_id, job)
+
+    async def load(self, job_id: str) -> Optional[dict]:
+        return self._jobs.get(job_id)
+
+
+class _RedisBackend:
+    """Stockage Redis partagé entre tous les workers."""
+
+    def __init__(self, name: str, ttl: float, redis):
+        self._redis = redis
+        self._prefix = f"facade-suite:jobs:{name}"
+        self._ttl = int(ttl)
+
+    async def push(self, job_id: str):
+        await self._redis.lpush(f"{self._prefix}:queue", job_id)
+
+    async def pop(self, timeout: float) -> Optional[str]:
+        item = await self._redis.brpop(f"{self._prefix}:queue", timeout=max(1, int(timeout)))
+        if item is None:
+            return None
+        job_id = item[1]
+        return job_id.decode() if isinstance(job_id, bytes) else job_id
+
+    async def save(self, job_id: str, job: dict):
+        await self._redis.set(f"{self._prefix}:{job_id}", json.dumps(job), ex=self._ttl)
+
+    async def load(self, job_id: str) -> Optional[dict]:
+        raw = await self._redis.get(f"{self._prefix}:{job_id}")
+        return json.loads(raw) if raw is not None else None
+
+
+class JobQueue:
+    """File de jobs nommée, avec suivi d'état (queued / running / done / failed).
+
+    Les jobs expirent après `ttl` secondes.
+    """
+
+    def __init__(self, name: str, handler: JobHandler, concurrency: int = 4, ttl: float = 3600):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.ttl = ttl
+        self.processed = 0
+        self.failed = 0
+        self._backend = None
+        self._tasks: List[asyncio.Task] = []
+        _registry[name] = self
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            redis = get_redis()
+            self._backend = _MemoryBackend(self.name, self.ttl) if redis is None else _RedisBackend(self.name, self.ttl, redis)
+        return self._backend
+
+    async def enqueue(self, payload: dict, owner: str) -> dict:
+        """Dépose un job ; `owner` identifie qui peut le consulter (société)."""
+        job = {"id": str(uuid4()), "status": QUEUED, "owner": owner, "payload": payload, "result": None, "error": None}
+        await self.backend.save(job["id"], job)
+        await self.backend.push(job["id"])
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        """État d'un job, ou None s'il est inconnu ou expiré."""
+        return await self.backend.load(job_id)
+
+    async def _execute(self, job_id: str):
+        job = await self.backend.load(job_id)
+        if job is None:
+            return
+        job["status"] = RUNNING
+        await self.backend.save(job_id, job)
+        try:
+            result = await self.handler(job["payload"])
+        except Exception as e:
+            logger.exception("Job %s %s en échec", self.name, job_id)
+            self.failed += 1
+            job.update(status=FAILED, error=str(e))
+        else:
+            self.processed += 1
+            job.update(status=DONE, result=result)
+        await self.backend.save(job_id, job)
+
+    async def _consume(self):
+        while True:
+            try:
+                job_id = await self.backend.pop(timeout=5)
+                if job_id is not None:
+                    await self._execute(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("File %s: %s", self.name, e)
+                await asyncio.sleep(1)
+
+    def start(self):
+        """Lance les consommateurs (au démarrage de l'application)."""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """Arrête les consommateurs."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs de la file (pour ce processus)."""
+        return {
+            "backend": "redis" if isinstance(self._backend, _RedisBackend) else "memory",
+            "consumers": len(self._tasks),
+            "processed": self.processed,
+            "failed": self.failed,
+        }
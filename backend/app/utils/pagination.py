@@ -0,0 +1,59 @@
+"""Pagination par curseur (keyset) sur (created_at, id)."""
+from fastapi import HTTPException, Response, status
+from sqlalchemy import func, tuple_
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+import base64
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# En-tête portant le curseur de la page suivante (absent sur la dernière page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, resource_id) -> str:
+    """Encode la position (created_at, id) d'une ligne en curseur opaque."""
+    raw = f"{created_at.isoformat()}|{resource_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Décode un curseur produit par encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, resource_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(resource_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide"
+        )
+
+
+def paginate(query, model, cursor: Optional[str], limit: int):
+    """Applique l'ordre (created_at, id) décroissant, le curseur et la limite.
+
+    Une ligne de plus que `limit` est demandée pour savoir s'il existe une page suivante.
+    """
+    if cursor:
+        created_at, resource_id = decode_cursor(cursor)
+        query = query.where(tuple_(model.created_at, model.id) < (created_at, resource_id))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def page_rows(rows, limit: int, response: Response) -> list:
+    """Tronque les lignes à `limit` et expose le curseur suivant dans l'en-tête."""
+    rows = list(rows)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return rows
+
+
+def name_prefix_filter(column, prefix: str):
+    """Filtre insensible à la casse sur un préfixe (utilise l'index lower(name))."""
+    escaped = prefix.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return func.lower(column).like(f"{escaped}%", escape="\\")
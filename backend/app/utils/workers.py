@@ -0,0 +1,31 @@
+"""Pool de processus partagé pour le travail CPU (images, calculs)."""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+import asyncio
+
+from ..settings import settings
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Retourne le pool partagé, créé au premier appel."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.PROCESS_POOL_WORKERS)
+    return _process_pool
+
+
+async def run_in_process(func: Callable, *args, **kwargs):
+    """Exécute une fonction (picklable) dans le pool sans bloquer la boucle d'événements."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), partial(func, *args, **kwargs))
+
+
+def shutdown_process_pool():
+    """Arrête le pool à l'arrêt de l'application."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
@@ -0,0 +1,90 @@
+"""Note de qualité (images/quality.py) et traitement des photos (images/processing.py)."""
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image, ImageFilter
+
+from app.images.processing import InvalidImageError, process_photo
+from app.images.quality import GREEN, ORANGE, RED, score_image
+
+# Taille d'une photo de façade prise au téléphone : critère de résolution au vert
+PHONE_SIZE = (4000, 3000)
+
+
+def _texture(size=(1024, 768), seed: int = 0) -> Image.Image:
+    """Façade synthétique nette : crépi (bruit) en gris moyen, sans pixels écrêtés."""
+    pixels = np.random.default_rng(seed).integers(40, 216, size=(size[1], size[0]), dtype=np.uint8)
+    return Image.fromarray(pixels).convert("RGB")
+
+
+def _png(image: Image.Image) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_sharp_image_is_green():
+    score = score_image(_texture(), PHONE_SIZE)
+    assert score["quality"] == GREEN
+    assert score["clipped_ratio"] == 0
+
+
+def test_blurred_image_is_red():
+    sharp = score_image(_texture(), PHONE_SIZE)
+    blurred = score_image(_texture().filter(ImageFilter.GaussianBlur(6)), PHONE_SIZE)
+    assert blurred["sharpness"] < sharp["sharpness"] / 100
+    assert blurred["quality"] == RED
+
+
+def test_underexposed_image_is_not_green():
+    dark = Image.fromarray((np.asarray(_texture()) // 8).astype(np.uint8))
+    score = score_image(dark, PHONE_SIZE)
+    assert score["brightness"] < 50
+    assert score["quality"] != GREEN
+
+
+def test_low_resolution_original_is_red():
+    assert score_image(_texture(), (1200, 900))["quality"] == RED
+
+
+def test_process_photo_produces_renditions(tmp_path):
+    path = tmp_path / "facade.png"
+    path.write_bytes(_png(_texture((2000, 1500))))
+
+    processed = process_photo(str(path), display_max_size=800, thumbnail_size=200)
+
+    with Image.open(BytesIO(processed.display)) as display:
+        assert max(display.size) == 800
+    with Image.open(BytesIO(processed.thumbnail)) as thumbnail:
+        assert max(thumbnail.size) == 200
+    assert processed.quality == ORANGE  # 3 Mpx seulement
+
+
+def test_undecodable_file_is_invalid_image(tmp_path):
+    path = tmp_path / "facade.jpg"
+    path.write_bytes(b"not an image")
+    with pytest.raises(InvalidImageError):
+        process_photo(str(path), display_max_size=800, thumbnail_size=200)
+
+
+def _bomb() -> bytes:
+    """PNG minuscule sur disque mais de dimensions démesurées (plus du double de MAX_IMAGE_PIXELS)."""
+    side = int((2 * Image.MAX_IMAGE_PIXELS) ** 0.5) + 100
+    return _png(Image.new("1", (side, side)))
+
+
+def test_decompression_bomb_is_invalid_image(tmp_path):
+    path = tmp_path / "bomb.png"
+    path.write_bytes(_bomb())
+    with pytest.raises(InvalidImageError):
+        process_photo(str(path), display_max_size=800, thumbnail_size=200)
+
+
+async def test_decompression_bomb_upload_is_rejected(api, project, fake_storage):
+    response = await api.post(
+        f"/api/photos/{project['facade_id']}/upload",
+        files={"file": ("bomb.png", _bomb(), "image/png")}
+    )
+    assert response.status_code == 400
+    assert not fake_storage.objects
@@ -0,0 +1,180 @@
+"""Noyaux géométriques (metrage/geometry.py) et surfaces par contours (metrage/surfaces.py)."""
+import numpy as np
+import pytest
+
+from app.metrage.geometry import (
+    PolygonArrays,
+    flatten_polygons,
+    intersection_areas,
+    is_convex,
+    polygon_areas,
+)
+from app.metrage.surfaces import compute_polygon_surfaces
+
+SQUARE = [(0, 0), (10, 0), (10, 10), (0, 10)]
+# En L (concave) : 10 x 10 moins le quart haut-droit
+L_SHAPE = [(0, 0), (10, 0), (10, 5), (5, 5), (5, 10), (0, 10)]
+# Deux carrés de 2 x 2 qui se touchent en (2, 2), parcourus en un seul contour
+SELF_TOUCHING = [(0, 0), (2, 0), (2, 2), (4, 2), (4, 4), (2, 4), (2, 2), (0, 2)]
+
+
+def _areas(polygons) -> np.ndarray:
+    arrays = flatten_polygons([polygons])
+    return polygon_areas(arrays.points, arrays.polygon, len(arrays.owner))
+
+
+def _point_in_polygon(x: float, y: float, polygon) -> bool:
+    """Parité des croisements, en Python pur (référence)."""
+    inside = False
+    for (x1, y1), (x2, y2) in zip(polygon, polygon[1:] + polygon[:1]):
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+def _reference_area(subject, clips) -> float:
+    """Aire d'intersection de polygones à sommets entiers et côtés horizontaux ou verticaux.
+
+    Compte les cellules unité dont le centre est dans le sujet et dans une
+    découpe : exact pour ces polygones.
+    """
+    xs = [x for x, _ in subject]
+    ys = [y for _, y in subject]
+    return float(sum(
+        _point_in_polygon(x + 0.5, y + 0.5, subject)
+        and any(_point_in_polygon(x + 0.5, y + 0.5, clip) for clip in clips)
+        for x in range(int(min(xs)), int(max(xs)))
+        for y in range(int(min(ys)), int(max(ys)))
+    ))
+
+
+def _clip_convex(subject, clip) -> float:
+    """Aire de `subject` découpé par le polygone convexe `clip` (Sutherland-Hodgman, référence)."""
+    def side(a, b, p):
+        return (b[0] - a[0]) * (p[1] - a[1]) - (b[1] - a[1]) * (p[0] - a[0])
+
+    if sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(clip, clip[1:] + clip[:1])) < 0:
+        clip = clip[::-1]
+    polygon = list(subject)
+    for a, b in zip(clip, clip[1:] + clip[:1]):
+        result = []
+        for p, q in zip(polygon, polygon[1:] + polygon[:1]):
+            dp, dq = side(a, b, p), side(a, b, q)
+            if dp >= 0:
+                result.append(p)
+            if (dp >= 0) != (dq >= 0):
+                t = dp / (dp - dq)
+                result.append((p[0] + t * (q[0] - p[0]), p[1] + t * (q[1] - p[1])))
+        polygon = result
+        if not polygon:
+            return 0.0
+    return abs(sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(polygon, polygon[1:] + polygon[:1]))) / 2
+
+
+def _intersection(subjects, clips, chunk_size: int = 100000) -> np.ndarray:
+    """`subjects` et `clips` : listes de polygones par mesure."""
+    return intersection_areas(flatten_polygons(subjects), flatten_polygons(clips), chunk_size)
+
+
+def test_polygon_areas_concave_and_self_touching():
+    np.testing.assert_allclose(_areas([SQUARE, L_SHAPE, SELF_TOUCHING]), [100, 75, 8])
+    # Le sens de parcours ne change pas l'aire
+    np.testing.assert_allclose(_areas([L_SHAPE[::-1], SELF_TOUCHING[::-1]]), [75, 8])
+
+
+def test_is_convex():
+    assert is_convex(np.array(SQUARE, dtype=float))
+    assert not is_convex(np.array(L_SHAPE, dtype=float))
+    assert not is_convex(np.array([(0, 0), (5, 0), (10, 0), (10, 10)], dtype=float))
+
+
+@pytest.mark.parametrize("opening, expected", [
+    # Entièrement dans le mur
+    ([(2, 2), (4, 2), (4, 4), (2, 4)], 4),
+    # À cheval sur le bord droit
+    ([(8, 2), (12, 2), (12, 4), (8, 4)], 4),
+    # Dépasse de deux côtés (coin)
+    ([(8, 8), (14, 8), (14, 14), (8, 14)], 4),
+    # Entièrement hors du mur
+    ([(20, 20), (22, 20), (22, 22), (20, 22)], 0),
+    # Recouvre tout le mur
+    ([(-1, -1), (11, -1), (11, 11), (-1, 11)], 100),
+    # Arête commune avec le mur
+    ([(0, 0), (3, 0), (3, 3), (0, 3)], 9),
+])
+def test_opening_partly_outside_rectangular_wall(opening, expected):
+    np.testing.assert_allclose(_intersection([[opening]], [[SQUARE]]), [expected], atol=1e-9)
+
+
+@pytest.mark.parametrize("opening", [
+    [(4, 4), (8, 4), (8, 8), (4, 8)],      # coin rentrant du L
+    [(6, 6), (9, 6), (9, 9), (6, 9)],      # dans l'encoche, hors du mur
+    [(-2, 3), (12, 3), (12, 7), (-2, 7)],  # traverse le mur de part en part
+    L_SHAPE,                               # concave elle-même
+])
+def test_opening_on_concave_wall_matches_reference(opening):
+    expected = _reference_area(opening, [L_SHAPE])
+    np.testing.assert_allclose(_intersection([[opening]], [[L_SHAPE]]), [expected], atol=1e-9)
+    # Sens de saisie des contours indifférent
+    np.testing.assert_allclose(_intersection([[opening[::-1]]], [[L_SHAPE[::-1]]]), [expected], atol=1e-9)
+
+
+def test_opening_over_self_touching_wall():
+    opening = [(1, 1), (3, 1), (3, 3), (1, 3)]
+    np.testing.assert_allclose(_intersection([[opening]], [[SELF_TOUCHING]]), [2], atol=1e-9)
+
+
+def test_opening_over_facade_and_gable():
+    """Une ouverture à cheval sur deux contours de mur adjacents compte une seule fois."""
+    facade = [(0, 0), (10, 0), (10, 10), (0, 10)]
+    gable = [(10, 0), (16, 0), (16, 6), (10, 6)]
+    opening = [(8, 2), (12, 2), (12, 8), (8, 8)]
+    expected = _reference_area(opening, [facade, gable])
+    np.testing.assert_allclose(_intersection([[opening]], [[facade, gable]]), [expected], atol=1e-9)
+
+
+def test_random_polygons_match_reference():
+    """Ouvertures quelconques (étoilées, donc souvent concaves) sur des murs convexes."""
+    rng = np.random.default_rng(1)
+    subjects, clips, expected = [], [], []
+    for _ in range(40):
+        angles = np.sort(rng.uniform(0, 2 * np.pi, 7))
+        radii = rng.uniform(1, 6, 7)
+        center = rng.uniform(-3, 3, 2)
+        opening = [tuple(center + r * np.array([np.cos(a), np.sin(a)])) for a, r in zip(angles, radii)]
+        wall_angles = np.sort(rng.uniform(0, 2 * np.pi, 5))
+        wall = [tuple(6 * np.array([np.cos(a), np.sin(a)])) for a in wall_angles]
+        subjects.append([opening])
+        clips.append([wall])
+        expected.append(_clip_convex(opening, wall))
+
+    np.testing.assert_allclose(_intersection(subjects, clips), expected, atol=1e-9)
+    # Découpage en petits blocs de paires d'arêtes : même résultat
+    np.testing.assert_allclose(_intersection(subjects, clips, chunk_size=7), expected, atol=1e-9)
+
+
+def test_measures_do_not_mix():
+    """Les ouvertures ne sont découpées que par les murs de leur propre mesure."""
+    opening = [(2, 2), (4, 2), (4, 4), (2, 4)]
+    far_wall = [(100, 100), (110, 100), (110, 110), (100, 110)]
+    np.testing.assert_allclose(_intersection([[opening], [opening]], [[SQUARE], [far_wall]]), [4, 0], atol=1e-9)
+
+
+def test_polygon_surfaces_deduct_only_the_part_on_the_wall():
+    """Mesure en pixels (2 px/cm) : mur 4 m x 2,5 m, fenêtre à moitié hors du mur."""
+    transforms = np.array([[[0.5, 0, 0], [0, 0.5, 0], [0, 0, 1]]], dtype=float)
+    walls = flatten_polygons([[[(0, 0), (800, 0), (800, 500), (0, 500)]]])
+    openings = flatten_polygons([[[(700, 100), (900, 100), (900, 300), (700, 300)]]])
+
+    surfaces = compute_polygon_surfaces(transforms, walls, openings)
+
+    np.testing.assert_allclose(surfaces.width_m, [4])
+    np.testing.assert_allclose(surfaces.height_m, [2.5])
+    np.testing.assert_allclose(surfaces.surface_m2, [10])
+    np.testing.assert_allclose(surfaces.openings_m2, [0.5])
+    np.testing.assert_allclose(surfaces.net_surface_m2, [9.5])
+
+
+def test_empty_batch():
+    empty = PolygonArrays(np.zeros((0, 2)), np.zeros(0, dtype=int), np.zeros(0, dtype=int))
+    assert intersection_areas(empty, empty).shape == (0,)
@@ -0,0 +1,70 @@
+"""Correction de perspective (metrage/homography.py)."""
+import numpy as np
+import pytest
+
+from app.metrage.geometry import polygon_areas
+from app.metrage.homography import project_points, reference_homographies
+
+# Homographies façade (cm) -> image (px) : vue de face, de biais, en contre-plongée
+KNOWN = np.array([
+    [[2.0, 0.0, 100.0], [0.0, 2.0, 50.0], [0.0, 0.0, 1.0]],
+    [[1.8, 0.3, 120.0], [-0.2, 1.5, 80.0], [0.0004, 0.0002, 1.0]],
+    [[1.1, -0.4, 300.0], [0.1, 0.9, 40.0], [-0.0003, 0.0006, 1.0]],
+])
+WIDTH_CM = np.array([200.0, 50.0, 120.0])
+HEIGHT_CM = np.array([100.0, 20.0, 250.0])
+
+
+def _rectangles(width_cm, height_cm) -> np.ndarray:
+    """Coins (n, 4, 2) : haut-gauche, haut-droit, bas-droit, bas-gauche."""
+    corners = np.zeros((len(width_cm), 4, 2))
+    corners[:, 1, 0] = corners[:, 2, 0] = width_cm
+    corners[:, 2, 1] = corners[:, 3, 1] = height_cm
+    return corners
+
+
+def _photographed(points_cm: np.ndarray, index: np.ndarray) -> np.ndarray:
+    return project_points(KNOWN, points_cm, index)
+
+
+@pytest.fixture
+def corners_px() -> np.ndarray:
+    corners_cm = _rectangles(WIDTH_CM, HEIGHT_CM)
+    index = np.repeat(np.arange(len(KNOWN)), 4)
+    return _photographed(corners_cm.reshape(-1, 2), index).reshape(-1, 4, 2)
+
+
+def test_recovers_inverse_of_known_homography(corners_px):
+    homographies = reference_homographies(corners_px, WIDTH_CM, HEIGHT_CM)
+    expected = np.linalg.inv(KNOWN)
+    expected /= expected[:, 2:, 2:]
+    np.testing.assert_allclose(homographies, expected, rtol=1e-9, atol=1e-12)
+
+
+def test_round_trip_image_facade_image(corners_px):
+    homographies = reference_homographies(corners_px, WIDTH_CM, HEIGHT_CM)
+    rng = np.random.default_rng(0)
+    points_px = rng.uniform(0, 800, size=(300, 2))
+    index = rng.integers(0, len(KNOWN), size=300)
+
+    points_cm = project_points(homographies, points_px, index)
+    np.testing.assert_allclose(project_points(KNOWN, points_cm, index), points_px, rtol=1e-9, atol=1e-7)
+
+
+def test_reference_corners_map_to_rectangle(corners_px):
+    homographies = reference_homographies(corners_px, WIDTH_CM, HEIGHT_CM)
+    index = np.repeat(np.arange(len(KNOWN)), 4)
+    projected = project_points(homographies, corners_px.reshape(-1, 2), index)
+    np.testing.assert_allclose(projected, _rectangles(WIDTH_CM, HEIGHT_CM).reshape(-1, 2), atol=1e-8)
+
+
+def test_area_of_rectified_quad(corners_px):
+    """Un mur de 4 m x 2,5 m photographé de biais retrouve ses 10 m²."""
+    homographies = reference_homographies(corners_px, WIDTH_CM, HEIGHT_CM)
+    wall_cm = np.array([[-30.0, -40.0], [370.0, -40.0], [370.0, 210.0], [-30.0, 210.0]])
+    for owner in range(len(KNOWN)):
+        index = np.full(4, owner)
+        wall_px = _photographed(wall_cm, index)
+        rectified = project_points(homographies, wall_px, index)
+        area = polygon_areas(rectified, np.zeros(4, dtype=int), 1)
+        np.testing.assert_allclose(area, [400 * 250], rtol=1e-9)
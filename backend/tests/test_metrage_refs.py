@@ -0,0 +1,134 @@
+"""Références de métrage en cache (metrage/refs.py, resolve_refs dans api/metrage.py)."""
+from datetime import datetime, timedelta, timezone
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+from app.db import models
+
+REF_ERROR = "Référence de métrage non trouvée"
+
+
+def _ref_queries(db_sessions) -> int:
+    return sum("FROM metrage_refs" in query for query in db_sessions.queries)
+
+
+def _measurement(photo_id: str, ref_id=None) -> dict:
+    measurement = {
+        "photo_id": photo_id,
+        "ref_width_px": 100,
+        "ref_height_px": 40,
+        "facade_width_px": 1500,
+        "facade_height_px": 900,
+        "openings": [{"width_px": 120, "height_px": 160}],
+    }
+    if ref_id is not None:
+        measurement["ref_id"] = str(ref_id)
+    return measurement
+
+
+@pytest.fixture
+async def photos(db_sessions, project):
+    async with db_sessions() as db:
+        created = [
+            models.Photo(facade_id=uuid.UUID(project["facade_id"]), storage_path=f"p/{index}.jpg")
+            for index in range(10)
+        ]
+        db.add_all(created)
+        await db.commit()
+    return [str(photo.id) for photo in created]
+
+
+@pytest.fixture
+async def refs(api, db_sessions, project):
+    """Deux références : agglo 50 x 20 (la plus ancienne, par défaut) puis une mire 100 x 50."""
+    agglo = (await api.post("/api/metrage/ref", json={"project_id": project["project_id"], "type": "agglo"})).json()
+    custom = (await api.post("/api/metrage/ref", json={
+        "project_id": project["project_id"], "type": "custom", "width_cm": 100, "height_cm": 50
+    })).json()
+    # CURRENT_TIMESTAMP de SQLite est à la seconde : dates écartées pour un ordre certain
+    async with db_sessions() as db:
+        await db.execute(
+            update(models.MetrageRef)
+            .where(models.MetrageRef.id == uuid.UUID(agglo["id"]))
+            .values(created_at=datetime.now(timezone.utc) - timedelta(hours=1))
+        )
+        await db.commit()
+    return agglo["id"], custom["id"]
+
+
+async def _batch(api, measurements):
+    response = await api.post("/api/metrage/calculate/batch", json={"measurements": measurements})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_refs_read_once_then_served_from_cache(api, db_sessions, photos, refs):
+    db_sessions.queries.clear()
+    cold = await _batch(api, [_measurement(photo_id) for photo_id in photos])
+    assert _ref_queries(db_sessions) == 1
+    assert all(item["error"] is None for item in cold)
+
+    db_sessions.queries.clear()
+    warm = await _batch(api, [_measurement(photo_id) for photo_id in photos])
+    assert _ref_queries(db_sessions) == 0
+    assert [item["result"] for item in warm] == [item["result"] for item in cold]
+
+    db_sessions.queries.clear()
+    assert (await api.post("/api/metrage/calculate", json=_measurement(photos[0]))).status_code == 200
+    assert _ref_queries(db_sessions) == 0
+
+
+async def test_default_ref_is_oldest_and_ref_id_selects_another(api, db_sessions, photos, refs):
+    agglo_id, custom_id = refs
+    await _batch(api, [_measurement(photos[0])])
+
+    db_sessions.queries.clear()
+    default, agglo, custom = await _batch(api, [
+        _measurement(photos[0]), _measurement(photos[1], agglo_id), _measurement(photos[2], custom_id)
+    ])
+    assert _ref_queries(db_sessions) == 0
+    assert default["result"] == agglo["result"]
+    assert custom["result"] != agglo["result"]
+
+
+async def test_unknown_ref_id_reloads_project_refs_once(api, db_sessions, project, photos, refs):
+    await _batch(api, [_measurement(photos[0])])
+    # Référence créée par un autre worker : absente du cache de ce processus
+    async with db_sessions() as db:
+        added = models.MetrageRef(project_id=uuid.UUID(project["project_id"]), type="custom", width_cm=80, height_cm=40)
+        db.add(added)
+        await db.commit()
+
+    db_sessions.queries.clear()
+    found, missing = await _batch(api, [
+        _measurement(photos[0], added.id), _measurement(photos[1], uuid.uuid4())
+    ])
+    assert _ref_queries(db_sessions) == 1
+    assert found["error"] is None
+    assert missing["error"] == REF_ERROR
+
+    # Le cache rechargé contient la nouvelle référence
+    db_sessions.queries.clear()
+    (again,) = await _batch(api, [_measurement(photos[2], added.id)])
+    assert again["error"] is None
+    assert _ref_queries(db_sessions) == 0
+
+
+async def test_ref_of_another_project_is_rejected(api, db_sessions, photos, refs):
+    customer = (await api.post("/api/customers", json={"name": "Autre"})).json()
+    other = (await api.post("/api/projects", json={"customer_id": customer["id"], "name": "Autre"})).json()
+    foreign = (await api.post("/api/metrage/ref", json={"project_id": other["id"], "type": "agglo"})).json()
+
+    (item,) = await _batch(api, [_measurement(photos[0], foreign["id"])])
+    assert item["error"] == REF_ERROR
+
+
+async def test_new_ref_invalidates_project_cache(api, db_sessions, project, photos):
+    (item,) = await _batch(api, [_measurement(photos[0])])
+    assert item["error"] == REF_ERROR  # chantier sans référence : pas mis en cache
+
+    await api.post("/api/metrage/ref", json={"project_id": project["project_id"], "type": "agglo"})
+    (item,) = await _batch(api, [_measurement(photos[0])])
+    assert item["error"] is None
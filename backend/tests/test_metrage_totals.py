@@ -0,0 +1,95 @@
+"""Cohérence des totaux par chantier sous écritures concurrentes (metrage/totals.py)."""
+from decimal import Decimal
+import asyncio
+import random
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.models import PhotoMetrage, ProjectMetrageTotal
+from app.metrage.totals import delete_metrages, save_metrages
+
+PROJECTS = 8
+PHOTOS = 500
+WORKERS = 16
+ROUNDS = 12
+
+
+def _record(rng: random.Random, photo_id, facade_id, project_id) -> dict:
+    width = Decimal(rng.randint(200, 2000)) / 100
+    height = Decimal(rng.randint(200, 1200)) / 100
+    surface = (width * height).quantize(Decimal("0.01"))
+    openings = (surface * Decimal(rng.randint(0, 30)) / 100).quantize(Decimal("0.01"))
+    return {
+        "photo_id": photo_id,
+        "facade_id": facade_id,
+        "project_id": project_id,
+        "surface_m2": surface,
+        "width_m": width,
+        "height_m": height,
+        "openings_m2": openings,
+        "net_surface_m2": surface - openings,
+    }
+
+
+async def _run(path: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"timeout": 60})
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: PhotoMetrage.metadata.create_all(
+            sync_conn, tables=[PhotoMetrage.__table__, ProjectMetrageTotal.__table__]
+        ))
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    project_ids = [uuid.uuid4() for _ in range(PROJECTS)]
+    # Une façade par photo (500 façades) : les lots couvrent de nombreuses façades de plusieurs chantiers
+    photos = [(uuid.uuid4(), uuid.uuid4(), project_ids[i % PROJECTS]) for i in range(PHOTOS)]
+
+    async def worker(seed: int):
+        rng = random.Random(seed)
+        for _ in range(ROUNDS):
+            async with sessions() as db:
+                if rng.random() < 0.2:
+                    await delete_metrages(db, [photo[0] for photo in rng.sample(photos, 10)])
+                else:
+                    # Lots qui se recouvrent entre workers, avec des photos en double dans le lot
+                    batch = rng.sample(photos, rng.randint(1, 60))
+                    batch += rng.sample(batch, len(batch) // 4)
+                    await save_metrages(db, [_record(rng, *photo) for photo in batch])
+                await db.commit()
+
+    await asyncio.gather(*(worker(seed) for seed in range(WORKERS)))
+
+    async with sessions() as db:
+        expected = {
+            row.project_id: (row.photos, row.surface_m2, row.openings_m2, row.net_surface_m2)
+            for row in await db.execute(
+                select(
+                    PhotoMetrage.project_id,
+                    func.count().label("photos"),
+                    func.sum(PhotoMetrage.surface_m2).label("surface_m2"),
+                    func.sum(PhotoMetrage.openings_m2).label("openings_m2"),
+                    func.sum(PhotoMetrage.net_surface_m2).label("net_surface_m2"),
+                ).group_by(PhotoMetrage.project_id)
+            )
+        }
+        totals = {
+            row.project_id: (row.photos, row.surface_m2, row.openings_m2, row.net_surface_m2)
+            for row in (await db.execute(select(ProjectMetrageTotal))).scalars()
+        }
+    await engine.dispose()
+    return project_ids, expected, totals
+
+
+def test_totals_match_per_photo_sums_after_concurrent_writes(tmp_path):
+    project_ids, expected, totals = asyncio.run(_run(tmp_path / "metrage.db"))
+
+    assert expected, "aucun métrage enregistré"
+    for project_id in project_ids:
+        photos, *sums = expected.get(project_id, (0, 0, 0, 0))
+        total = totals.get(project_id, (0, 0, 0, 0))
+        assert total[0] == photos
+        # Sommes en Decimal arrondies au centième : égalité exacte attendue
+        assert [Decimal(str(value)).quantize(Decimal("0.01")) for value in total[1:]] == [
+            Decimal(str(value)).quantize(Decimal("0.01")) for value in sums
+        ]
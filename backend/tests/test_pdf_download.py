@@ -0,0 +1,105 @@
+"""Téléchargement des PDF de devis : flux, ETag / 304, redirection signée (api/pdf.py)."""
+import pytest
+
+from app.pdf import jobs as pdf_jobs_module
+from app.pdf.cache import pdf_cache
+from app.pdf.jobs import pdf_jobs
+from app.settings import settings
+from app.utils.workers import shutdown_process_pool
+
+
+@pytest.fixture(scope="module", autouse=True)
+def process_pool():
+    yield
+    shutdown_process_pool()
+
+
+@pytest.fixture(autouse=True)
+def isolated_pdf_cache(tmp_path, monkeypatch, db_sessions):
+    monkeypatch.setattr(pdf_cache, "directory", tmp_path / "pdf-cache")
+    monkeypatch.setattr(pdf_cache, "_size", None)
+    # La mise à jour de la version après rendu passe par la session du module jobs
+    monkeypatch.setattr(pdf_jobs_module, "AsyncSessionLocal", db_sessions)
+
+
+@pytest.fixture
+async def version_id(api, project) -> str:
+    response = await api.post(f"/api/quotes/{project['project_id']}/version", json={"lines": [
+        {"label": "Ravalement", "quantity": 120, "unit_price": 35}
+    ]})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+async def _generate(api, version_id: str) -> dict:
+    response = await api.post("/api/pdf/generate", json={"quote_version_id": version_id})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_download_streams_stored_pdf_with_etag(api, fake_storage, version_id):
+    generated = await _generate(api, version_id)
+
+    response = await api.get(generated["download_url"])
+
+    assert response.status_code == 200
+    stored, _ = fake_storage.objects[f"{settings.STORAGE_BUCKET}/{generated['pdf_path']}"]
+    assert response.content == stored
+    assert stored.startswith(b"%PDF")
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["content-length"] == str(len(stored))
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert "attachment" in response.headers["content-disposition"]
+
+
+async def test_matching_etag_returns_304_without_storage_call(api, fake_storage, version_id):
+    generated = await _generate(api, version_id)
+    etag = (await api.get(generated["download_url"])).headers["etag"]
+    downloads = fake_storage.calls_to("GET")
+
+    for value in (etag, f"W/{etag}"):
+        response = await api.get(generated["download_url"], headers={"If-None-Match": value})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert not response.content
+    assert fake_storage.calls_to("GET") == downloads
+
+    stale = await api.get(generated["download_url"], headers={"If-None-Match": '"autre"'})
+    assert stale.status_code == 200
+
+
+async def test_redirect_to_signed_url(api, fake_storage, version_id):
+    generated = await _generate(api, version_id)
+
+    response = await api.get(generated["download_url"], params={"redirect": "true"})
+
+    assert response.status_code == 307
+    assert response.headers["location"].endswith(f"/{generated['pdf_path']}?token=t")
+    assert response.headers["etag"]
+    assert fake_storage.calls_to("GET") == 0
+
+
+async def test_download_before_generation_is_404(api, fake_storage, version_id):
+    response = await api.get(f"/api/pdf/versions/{version_id}/download")
+
+    assert response.status_code == 404
+    assert not fake_storage.calls
+
+
+async def test_job_result_available_once_done(api, fake_storage, version_id):
+    job = (await api.post("/api/pdf/jobs", json={"quote_version_id": version_id})).json()
+
+    pending = await api.get(f"/api/pdf/jobs/{job['job_id']}/result")
+    assert pending.status_code == 409
+
+    # Pas de consommateurs sous ASGITransport (pas de lifespan) : exécution directe
+    await pdf_jobs._execute(job["job_id"])
+    assert (await api.get(f"/api/pdf/jobs/{job['job_id']}")).json()["status"] == "done"
+
+    response = await api.get(f"/api/pdf/jobs/{job['job_id']}/result")
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF")
+    etag = response.headers["etag"]
+    cached = await api.get(f"/api/pdf/jobs/{job['job_id']}/result", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
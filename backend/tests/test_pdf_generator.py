@@ -0,0 +1,84 @@
+"""Découpage des lignes d'un devis en pages (pdf/generator.py)."""
+from io import BytesIO
+
+import pytest
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Table
+
+from app.pdf.generator import QuoteLineData, get_quote_template
+
+
+class _PageRecorder(SimpleDocTemplate):
+    """Note la page de chaque tableau posé dans le document."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tables = []
+
+    def afterFlowable(self, flowable):
+        if isinstance(flowable, Table):
+            self.tables.append((self.page, len(flowable._cellvalues)))
+
+
+def _render(count: int) -> _PageRecorder:
+    template = get_quote_template()
+    lines = [QuoteLineData(f"Ligne {i}", "1", "10", "10") for i in range(count)]
+    doc = _PageRecorder(BytesIO(), pagesize=A4, invariant=True)
+    doc.build(template.build_elements(
+        doc,
+        company_name="Société",
+        customer_name="Client",
+        customer_city="Ville",
+        project_name="Chantier",
+        version=1,
+        lines=lines,
+        total=10.0 * count,
+        is_trial=False
+    ))
+    return doc
+
+
+def _page_rows() -> tuple:
+    """Lignes par page calculées par le gabarit (première page, pages suivantes)."""
+    captured = {}
+    template = get_quote_template()
+    original = template._lines_tables
+
+    def spy(lines, total, first_page_rows, page_rows):
+        captured.update(first=first_page_rows, page=page_rows)
+        return original(lines, total, first_page_rows, page_rows)
+
+    template._lines_tables = spy
+    try:
+        _render(1)
+    finally:
+        del template._lines_tables
+    return captured["first"], captured["page"]
+
+
+def _sizes(first: int, page: int) -> list:
+    # Bords : première page pleine, puis dernier bloc à 0, 1, page - 1 et page lignes
+    return sorted({first - 1, first, first + 1, first + page - 1, first + page, first + page + 1,
+                   first + 2 * page - 1, first + 2 * page, 59, 95})
+
+
+FIRST_PAGE_ROWS, PAGE_ROWS = _page_rows()
+
+
+@pytest.mark.parametrize("count", _sizes(FIRST_PAGE_ROWS, PAGE_ROWS))
+def test_each_lines_table_fits_on_its_own_page(count):
+    doc = _render(count)
+    # Les deux premiers tableaux sont l'en-tête et les informations client
+    header, client, *line_tables = doc.tables
+    assert header[0] == client[0] == 1
+    # Le dernier bloc porte aussi le total général : une ligne de moins que les autres
+    if count <= FIRST_PAGE_ROWS:
+        expected_tables = 1
+    else:
+        expected_tables = 1 + -(-(count - FIRST_PAGE_ROWS + 1) // PAGE_ROWS)
+    assert len(line_tables) == expected_tables
+    # Un tableau par page, jamais redécoupé par ReportLab
+    assert [page for page, _ in line_tables] == list(range(1, len(line_tables) + 1))
+    # Toutes les lignes sont présentes (en-tête, sous-total et total en plus)
+    extra_rows = 2 if len(line_tables) == 1 else 2 * len(line_tables) + 1
+    assert sum(rows for _, rows in line_tables) == count + extra_rows
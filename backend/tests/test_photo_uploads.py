@@ -0,0 +1,155 @@
+"""Uploads reprenables : init / append / finalize (api/photos.py, storage/upload_sessions.py)."""
+from io import BytesIO
+import uuid
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.settings import settings
+from app.storage.upload_sessions import session_file
+
+CHUNK = 64 * 1024
+
+
+def _jpeg(seed: int = 1, size=(800, 600)) -> bytes:
+    pixels = (np.random.default_rng(seed).random((size[1], size[0], 3)) * 255).astype("uint8")
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def session_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PHOTO_UPLOAD_SESSION_DIR", str(tmp_path / "uploads"))
+
+
+async def _start(api, facade_id: str, data: bytes) -> str:
+    response = await api.post(f"/api/photos/{facade_id}/uploads", json={
+        "filename": "facade.jpg", "content_type": "image/jpeg", "total_size": len(data)
+    })
+    assert response.status_code == 201
+    return response.json()["upload_id"]
+
+
+async def _append(api, upload_id: str, offset: int, content: bytes):
+    return await api.put(f"/api/photos/uploads/{upload_id}", params={"offset": offset}, content=content)
+
+
+async def _send_from(api, upload_id: str, data: bytes, offset: int) -> int:
+    while offset < len(data):
+        response = await _append(api, upload_id, offset, data[offset:offset + CHUNK])
+        assert response.status_code == 200
+        offset = response.json()["offset"]
+    return offset
+
+
+async def test_resumable_upload_stores_identical_original(api, project, fake_storage):
+    data = _jpeg()
+    upload_id = await _start(api, project["facade_id"], data)
+    await _send_from(api, upload_id, data, 0)
+
+    response = await api.post(f"/api/photos/uploads/{upload_id}/finalize")
+
+    assert response.status_code == 201
+    originals = [content for key, (content, _) in fake_storage.objects.items() if key.endswith(".jpg")]
+    assert originals == [data]
+    assert not session_file(uuid.UUID(upload_id)).exists()
+    assert (await api.get(f"/api/photos/uploads/{upload_id}")).status_code == 404
+
+
+async def test_offset_mismatch_returns_expected_offset(api, project):
+    data = _jpeg()
+    upload_id = await _start(api, project["facade_id"], data)
+    await _append(api, upload_id, 0, data[:CHUNK])
+
+    response = await _append(api, upload_id, 2 * CHUNK, data[2 * CHUNK:3 * CHUNK])
+
+    assert response.status_code == 409
+    assert response.headers["Upload-Offset"] == str(CHUNK)
+    assert (await api.get(f"/api/photos/uploads/{upload_id}")).json()["offset"] == CHUNK
+
+
+async def test_partial_chunk_resent_is_rewritten(api, project, fake_storage):
+    """Bloc écrit sur disque mais jamais confirmé (coupure) : renvoyé, il remplace les octets partiels."""
+    data = _jpeg()
+    upload_id = await _start(api, project["facade_id"], data)
+    await _append(api, upload_id, 0, data[:CHUNK])
+    with open(session_file(uuid.UUID(upload_id)), "ab") as f:
+        f.write(b"\0" * (CHUNK // 2))
+
+    offset = (await api.get(f"/api/photos/uploads/{upload_id}")).json()["offset"]
+    assert offset == CHUNK
+    await _send_from(api, upload_id, data, offset)
+
+    assert (await api.post(f"/api/photos/uploads/{upload_id}/finalize")).status_code == 201
+    originals = [content for key, (content, _) in fake_storage.objects.items() if key.endswith(".jpg")]
+    assert originals == [data]
+
+
+async def test_finalize_before_last_chunk_is_rejected(api, project):
+    data = _jpeg()
+    upload_id = await _start(api, project["facade_id"], data)
+    await _append(api, upload_id, 0, data[:CHUNK])
+
+    response = await api.post(f"/api/photos/uploads/{upload_id}/finalize")
+
+    assert response.status_code == 409
+    assert response.headers["Upload-Offset"] == str(CHUNK)
+
+
+async def test_chunk_past_total_size_is_rejected(api, project):
+    data = _jpeg()
+    upload_id = await _start(api, project["facade_id"], data)
+    offset = await _send_from(api, upload_id, data, 0)
+
+    response = await _append(api, upload_id, offset, b"extra")
+
+    assert response.status_code == 400
+
+
+async def test_lost_session_file_restarts_from_disk_offset(api, project, fake_storage):
+    """Fichier temporaire perdu (redémarrage, autre instance) : 409 et reprise à 0, pas de zéros."""
+    data = _jpeg()
+    upload_id = await _start(api, project["facade_id"], data)
+    await _append(api, upload_id, 0, data[:2 * CHUNK])
+    session_file(uuid.UUID(upload_id)).unlink()
+
+    response = await _append(api, upload_id, 2 * CHUNK, data[2 * CHUNK:3 * CHUNK])
+
+    assert response.status_code == 409
+    assert response.headers["Upload-Offset"] == "0"
+    assert not session_file(uuid.UUID(upload_id)).exists()
+    assert (await api.get(f"/api/photos/uploads/{upload_id}")).json()["offset"] == 0
+
+    await _send_from(api, upload_id, data, 0)
+    assert (await api.post(f"/api/photos/uploads/{upload_id}/finalize")).status_code == 201
+    originals = [content for key, (content, _) in fake_storage.objects.items() if key.endswith(".jpg")]
+    assert originals == [data]
+
+
+async def test_truncated_session_file_blocks_finalize(api, project, fake_storage):
+    data = _jpeg()
+    upload_id = await _start(api, project["facade_id"], data)
+    await _send_from(api, upload_id, data, 0)
+    with open(session_file(uuid.UUID(upload_id)), "r+b") as f:
+        f.truncate(CHUNK)
+
+    response = await api.post(f"/api/photos/uploads/{upload_id}/finalize")
+
+    assert response.status_code == 409
+    assert response.headers["Upload-Offset"] == str(CHUNK)
+    assert not fake_storage.objects
+
+    await _send_from(api, upload_id, data, CHUNK)
+    assert (await api.post(f"/api/photos/uploads/{upload_id}/finalize")).status_code == 201
+
+
+async def test_abort_discards_session(api, project):
+    data = _jpeg()
+    upload_id = await _start(api, project["facade_id"], data)
+    await _append(api, upload_id, 0, data[:CHUNK])
+
+    assert (await api.delete(f"/api/photos/uploads/{upload_id}")).status_code == 204
+    assert not session_file(uuid.UUID(upload_id)).exists()
+    assert (await api.get(f"/api/photos/uploads/{upload_id}")).status_code == 404
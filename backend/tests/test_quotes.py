@@ -0,0 +1,91 @@
+"""Lecture des devis en nombre de requêtes borné (api/quotes.py).
+
+Devis de 20 versions x 50 lignes : le nombre de requêtes ne dépend ni du
+nombre de versions ni du nombre de lignes.
+"""
+import time
+
+import pytest
+
+VERSIONS = 20
+LINES = 50
+
+
+def _lines(version: int) -> list:
+    return [
+        {"label": f"V{version} ligne {index}", "quantity": index + 1, "unit_price": 12.5}
+        for index in range(LINES)
+    ]
+
+
+def _count(db_sessions, table: str) -> int:
+    return sum(f"FROM {table}" in query or f"INTO {table}" in query for query in db_sessions.queries)
+
+
+@pytest.fixture
+async def quote(api, project, db_sessions) -> dict:
+    """Devis du chantier `project` avec VERSIONS versions de LINES lignes."""
+    for version in range(1, VERSIONS + 1):
+        db_sessions.queries.clear()
+        response = await api.post(f"/api/quotes/{project['project_id']}/version", json={"lines": _lines(version)})
+        assert response.status_code == 201
+        # Lignes insérées en une requête, quel que soit leur nombre
+        assert _count(db_sessions, "quote_lines") == 1
+    return (await api.get(f"/api/quotes/{project['project_id']}")).json()
+
+
+async def _queries_for_get(api, db_sessions, project_id: str, **params) -> tuple:
+    db_sessions.queries.clear()
+    started = time.perf_counter()
+    response = await api.get(f"/api/quotes/{project_id}", params=params)
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    return response.json(), len(db_sessions.queries), elapsed
+
+
+async def test_full_quote_in_bounded_queries(api, project, db_sessions, quote):
+    body, queries, elapsed = await _queries_for_get(api, db_sessions, project["project_id"])
+
+    # Le devis créé avec le chantier est en version 1 sans lignes : la première version postée est V2
+    current = body["current_version"]
+    assert [version["version"] for version in body["versions"]] == list(range(current, current - VERSIONS, -1))
+    assert all(len(version["lines"]) == LINES for version in body["versions"])
+    assert body["versions"][0]["lines"][0]["label"] == f"V{VERSIONS} ligne 0"
+    # Chantier, devis, versions, lignes : une requête chacun (pas de N+1 par version)
+    assert _count(db_sessions, "quote_versions") == 1
+    assert _count(db_sessions, "quote_lines") == 1
+    assert queries <= 4
+    print(f"\n{VERSIONS} versions x {LINES} lignes : {queries} requêtes, {elapsed * 1000:.1f} ms")
+
+
+async def test_query_count_does_not_grow_with_versions(api, db_sessions):
+    customer = (await api.post("/api/customers", json={"name": "Client"})).json()
+    counts = []
+    for versions in (1, 5):
+        project = (await api.post("/api/projects", json={"customer_id": customer["id"], "name": f"C{versions}"})).json()
+        for version in range(1, versions + 1):
+            await api.post(f"/api/quotes/{project['id']}/version", json={"lines": _lines(version)})
+        _, queries, _ = await _queries_for_get(api, db_sessions, project["id"])
+        counts.append(queries)
+    assert counts[0] == counts[1]
+
+
+async def test_current_only_returns_current_version(api, project, db_sessions, quote):
+    body, queries, _ = await _queries_for_get(api, db_sessions, project["project_id"], current_only="true")
+
+    assert [version["version"] for version in body["versions"]] == [body["current_version"]]
+    assert len(body["versions"][0]["lines"]) == LINES
+    assert queries <= 4
+
+
+async def test_status_update_reuses_checked_quote(api, db_sessions, quote):
+    db_sessions.queries.clear()
+    response = await api.put(f"/api/quotes/{quote['id']}/status", params={"status": "sent"})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "sent"
+    assert len(response.json()["versions"]) == VERSIONS
+    assert _count(db_sessions, "quote_lines") == 1
+
+    invalid = await api.put(f"/api/quotes/{quote['id']}/status", params={"status": "lost"})
+    assert invalid.status_code == 400
@@ -0,0 +1,128 @@
+"""Client Storage (storage/client.py) face au bucket simulé par httpx.MockTransport."""
+import logging
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.db import models
+from app.settings import settings
+from tests.test_photo_uploads import _jpeg
+
+
+async def _upload_photo(api, facade_id: str):
+    return await api.post(f"/api/photos/{facade_id}/upload", files={"file": ("facade.jpg", _jpeg(), "image/jpeg")})
+
+
+async def test_delete_many_removes_objects(storage, fake_storage):
+    bucket = settings.STORAGE_BUCKET
+    for name in ("a.jpg", "b.webp", "keep.jpg"):
+        await storage.upload(name, b"x", "image/jpeg")
+
+    await storage.delete_many(["a.jpg", "b.webp"])
+
+    assert set(fake_storage.objects) == {f"{bucket}/keep.jpg"}
+
+
+async def test_delete_many_raises_on_storage_error(storage, fake_storage):
+    fake_storage.fail.add("DELETE")
+    with pytest.raises(HTTPException) as error:
+        await storage.delete_many(["a.jpg"])
+    assert error.value.status_code == 500
+
+
+async def test_failed_upload_removes_already_sent_files(api, project, fake_storage):
+    fake_storage.fail_suffixes.add(".jpg")  # l'original échoue, les déclinaisons passent
+
+    response = await _upload_photo(api, project["facade_id"])
+
+    assert response.status_code == 500
+    assert fake_storage.calls_to("DELETE") == 1
+    assert not fake_storage.objects
+
+
+async def test_failed_cleanup_is_logged(api, project, fake_storage, caplog):
+    fake_storage.fail_suffixes.add(".jpg")
+    fake_storage.fail.add("DELETE")
+
+    with caplog.at_level(logging.WARNING, logger="app.api.photos"):
+        response = await _upload_photo(api, project["facade_id"])
+
+    assert response.status_code == 500
+    assert "Nettoyage Storage impossible" in caplog.text
+    assert len(fake_storage.objects) == 2  # déclinaisons orphelines, signalées dans les logs
+
+
+async def test_photo_kept_when_storage_delete_fails(api, project, fake_storage):
+    photo = (await _upload_photo(api, project["facade_id"])).json()
+    fake_storage.fail.add("DELETE")
+
+    assert (await api.delete(f"/api/photos/{photo['id']}")).status_code == 500
+    assert len(fake_storage.objects) == 3
+
+    fake_storage.fail.clear()
+    assert (await api.delete(f"/api/photos/{photo['id']}")).status_code == 204
+    assert not fake_storage.objects
+
+
+async def test_signed_urls_in_one_bulk_call_then_cached(storage, fake_storage):
+    paths = [f"c/p/f/{index}.jpg" for index in range(40)]
+
+    urls = await storage.create_signed_urls(paths)
+
+    assert fake_storage.signed == [paths]
+    assert set(urls) == set(paths)
+    assert urls[paths[0]] == (
+        f"{settings.SUPABASE_URL}/storage/v1/object/sign/{settings.STORAGE_BUCKET}/{paths[0]}?token=t"
+    )
+
+    # Deuxième appel : tout vient du cache ; seuls les nouveaux chemins partent à Storage
+    assert await storage.create_signed_urls(paths) == urls
+    more = await storage.create_signed_urls(paths[:5] + ["c/p/f/new.jpg"])
+    assert fake_storage.signed == [paths, ["c/p/f/new.jpg"]]
+    assert set(more) == set(paths[:5] + ["c/p/f/new.jpg"])
+    # Même cache pour la signature unitaire
+    assert await storage.create_signed_url(paths[0]) == urls[paths[0]]
+    assert fake_storage.calls_to("POST", "sign/") == 2
+
+
+async def test_signed_url_cache_depends_on_expiry(storage, fake_storage):
+    await storage.create_signed_urls(["a.jpg"], expires_in=3600)
+    await storage.create_signed_urls(["a.jpg"], expires_in=7200)
+    assert fake_storage.signed == [["a.jpg"], ["a.jpg"]]
+
+
+async def test_signed_urls_storage_error(storage, fake_storage):
+    fake_storage.fail.add("POST")
+    with pytest.raises(HTTPException) as error:
+        await storage.create_signed_urls(["a.jpg"])
+    assert error.value.status_code == 500
+    # Rien n'est mis en cache après une erreur
+    fake_storage.fail.clear()
+    await storage.create_signed_urls(["a.jpg"])
+    assert fake_storage.signed == [["a.jpg"]]
+
+
+async def test_photo_listing_signs_page_in_one_call(api, project, db_sessions, fake_storage):
+    async with db_sessions() as db:
+        db.add_all([
+            models.Photo(
+                facade_id=uuid.UUID(project["facade_id"]),
+                storage_path=f"c/p/f/{index}.jpg",
+                display_path=f"c/p/f/{index}_display.webp",
+                thumbnail_path=f"c/p/f/{index}_thumb.webp"
+            )
+            for index in range(40)
+        ])
+        await db.commit()
+
+    response = await api.get(f"/api/photos/facade/{project['facade_id']}")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 40
+    assert all(photo["signed_url"] and photo["thumbnail_url"] for photo in response.json())
+    assert len(fake_storage.signed) == 1
+    assert len(fake_storage.signed[0]) == 120
+
+    await api.get(f"/api/photos/facade/{project['facade_id']}")
+    assert len(fake_storage.signed) == 1
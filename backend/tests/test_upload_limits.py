@@ -0,0 +1,125 @@
+"""Plafond de taille et envoi en flux des photos (api/photos.py, storage/client.py)."""
+import asyncio
+import tempfile
+import tracemalloc
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from starlette.datastructures import UploadFile
+
+from app.settings import settings
+from app.storage.client import StorageClient, iter_upload_file
+from tests.test_photo_uploads import _jpeg
+
+MB = 1024 * 1024
+
+
+@pytest.fixture(autouse=True)
+def temp_dir(tmp_path, monkeypatch):
+    """Fichiers temporaires d'upload isolés, pour vérifier qu'il n'en reste aucun."""
+    directory = tmp_path / "spool"
+    directory.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(directory))
+    return directory
+
+
+async def _upload(api, facade_id: str, data: bytes):
+    return await api.post(f"/api/photos/{facade_id}/upload", files={"file": ("facade.jpg", data, "image/jpeg")})
+
+
+async def test_original_stored_identical_with_content_length(api, project, fake_storage, temp_dir):
+    data = _jpeg()
+
+    response = await _upload(api, project["facade_id"], data)
+
+    assert response.status_code == 201
+    (key,) = [key for key in fake_storage.objects if key.endswith(".jpg")]
+    assert fake_storage.objects[key] == (data, "image/jpeg")
+    assert fake_storage.headers[key]["content-length"] == str(len(data))
+    assert "transfer-encoding" not in fake_storage.headers[key]
+    assert not list(temp_dir.iterdir())
+
+
+async def test_upload_over_limit_is_rejected(api, project, fake_storage, temp_dir, monkeypatch):
+    data = _jpeg()
+    monkeypatch.setattr(settings, "PHOTO_MAX_UPLOAD_BYTES", len(data) - 1)
+
+    response = await _upload(api, project["facade_id"], data)
+
+    assert response.status_code == 413
+    assert not fake_storage.objects
+    assert not list(temp_dir.iterdir())
+
+
+async def test_batch_upload_over_limit_is_per_file(api, project, fake_storage, monkeypatch):
+    small, large = _jpeg(1, (400, 300)), _jpeg(2)
+    monkeypatch.setattr(settings, "PHOTO_MAX_UPLOAD_BYTES", len(small))
+
+    response = await api.post(f"/api/photos/{project['facade_id']}/upload/batch", files=[
+        ("files", ("small.jpg", small, "image/jpeg")), ("files", ("large.jpg", large, "image/jpeg"))
+    ])
+
+    assert response.status_code == 201
+    small_item, large_item = response.json()
+    assert small_item["photo"] is not None
+    assert large_item["photo"] is None and large_item["error"]
+    assert [content for key, (content, _) in fake_storage.objects.items() if key.endswith(".jpg")] == [small]
+
+
+async def test_limit_enforced_while_streaming_without_declared_size(tmp_path):
+    """Taille inconnue à l'avance (size=None) : arrêt dès que le cumul lu dépasse le plafond."""
+    path = tmp_path / "large.bin"
+    path.write_bytes(b"\0" * (3 * MB))
+    read = 0
+    with open(path, "rb") as f:
+        with pytest.raises(HTTPException) as error:
+            async for chunk in iter_upload_file(UploadFile(f, size=None), max_bytes=MB, chunk_size=256 * 1024):
+                read += len(chunk)
+    assert error.value.status_code == 413
+    assert read == MB
+
+
+class _DrainTransport(httpx.AsyncBaseTransport):
+    """Storage minimal qui consomme le corps en flux sans le garder (contrairement à MockTransport)."""
+
+    def __init__(self):
+        self.received = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        size = 0
+        async for chunk in request.stream:
+            size += len(chunk)
+        self.received.append((int(request.headers["content-length"]), size))
+        return httpx.Response(200, json={"Key": request.url.path})
+
+
+async def test_concurrent_large_uploads_are_streamed(tmp_path):
+    """20 originaux de 15 Mo envoyés en parallèle : la mémoire reste bien en deçà d'un seul fichier."""
+    size = 15 * MB
+    path = tmp_path / "original.jpg"
+    path.write_bytes(b"\xff" * size)
+    transport = _DrainTransport()
+    client = StorageClient(transport=transport)
+    files = [open(path, "rb") for _ in range(20)]
+    try:
+        tracemalloc.start()
+        await asyncio.gather(*(
+            client.upload(
+                f"c/p/f/{index}.jpg",
+                iter_upload_file(UploadFile(f, size=size), max_bytes=size),
+                "image/jpeg",
+                content_length=size
+            )
+            for index, f in enumerate(files)
+        ))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        for f in files:
+            f.close()
+        await client.aclose()
+
+    assert transport.received == [(size, size)] * 20
+    print(f"\n20 x 15 Mo : pic mémoire {peak / MB:.1f} Mo")
+    assert peak < size
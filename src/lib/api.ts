@@ -27,3 +27,33 @@ export async function apiFetch(
 
   return response
 }
+
+// Taille de page maximale des listes (MAX_PAGE_SIZE côté API)
+const MAX_PAGE_SIZE = 500
+
+/**
+ * Récupère une liste paginée complète en suivant l'en-tête X-Next-Cursor
+ */
+export async function fetchAllPages<T>(
+  endpoint: string,
+  options: RequestInit = {}
+): Promise<T[]> {
+  const items: T[] = []
+  const separator = endpoint.includes('?') ? '&' : '?'
+  let cursor: string | null = null
+
+  do {
+    const page = cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''
+    const response = await fetch(
+      `${API_URL}${endpoint}${separator}limit=${MAX_PAGE_SIZE}${page}`,
+      options
+    )
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}`)
+    }
+    items.push(...(await response.json()))
+    cursor = response.headers.get('X-Next-Cursor')
+  } while (cursor)
+
+  return items
+}
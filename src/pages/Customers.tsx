@@ -5,6 +5,7 @@ import { Input } from '../components/ui/input'
 import { Label } from '../components/ui/label'
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogDescription } from '../components/ui/dialog'
 import { API_URL } from '../config'
+import { fetchAllPages } from '../lib/api'
 
 interface Customer {
   id: string
@@ -33,15 +34,12 @@ export default function Customers() {
   const fetchCustomers = async () => {
     try {
       const token = localStorage.getItem('token')
-      const response = await fetch(`${API_URL}/api/customers`, {
+      const data = await fetchAllPages<Customer>('/api/customers', {
         headers: {
           'Authorization': `Bearer ${token}`,
         },
       })
-      if (response.ok) {
-        const data = await response.json()
-        setCustomers(data)
-      }
+      setCustomers(data)
     } catch (error) {
       console.error('Error fetching customers:', error)
     } finally {
@@ -6,6 +6,7 @@ import { Label } from '../components/ui/label'
 import { Badge } from '../components/ui/badge'
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogDescription } from '../components/ui/dialog'
 import { API_URL } from '../config'
+import { fetchAllPages } from '../lib/api'
 
 interface Customer {
   id: string
@@ -42,15 +43,12 @@ export default function Projects() {
   const fetchProjects = async () => {
     try {
       const token = localStorage.getItem('token')
-      const response = await fetch(`${API_URL}/api/projects`, {
+      const data = await fetchAllPages<Project>('/api/projects', {
         headers: {
           'Authorization': `Bearer ${token}`,
         },
       })
-      if (response.ok) {
-        const data = await response.json()
-        setProjects(data)
-      }
+      setProjects(data)
     } catch (error) {
       console.error('Error fetching projects:', error)
     } finally {
@@ -61,15 +59,12 @@ export default function Projects() {
   const fetchCustomers = async () => {
     try {
       const token = localStorage.getItem('token')
-      const response = await fetch(`${API_URL}/api/customers`, {
+      const data = await fetchAllPages<Customer>('/api/customers', {
         headers: {
           'Authorization': `Bearer ${token}`,
         },
       })
-      if (response.ok) {
-        const data = await response.json()
-        setCustomers(data)
-      }
+      setCustomers(data)
     } catch (error) {
       console.error('Error fetching customers:', error)
     }